@@ -0,0 +1,7 @@
+# python -m app → runner CLI (tanpa GUI)
+import sys
+
+from app.cli import main
+
+if __name__ == "__main__":  # worker ProcessPool (spawn) meng-import ulang modul ini
+    sys.exit(main())
@@ -0,0 +1,359 @@
+# app/barge_cache.py — cache hasil parse sheet Barge di disk (npz per kolom, tanpa pickle)
+from __future__ import annotations
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta
+from typing import IO, Any, Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+CACHE_VERSION = 1
+
+# Batas total ukuran cache; entri yang paling lama tidak dipakai dibuang dulu
+MAX_CACHE_BYTES = int(os.environ.get("FLF_CACHE_MAX_MB", "256")) * 1024 * 1024
+
+_EPOCH = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+
+# jenis nilai per sel
+_STR, _INT, _FLOAT, _BOOL, _DATETIME, _TIMEDELTA, _TIME = range(1, 8)
+
+
+def cache_dir() -> str:
+    """Folder cache per user (FLF_CACHE_DIR bisa menimpa)."""
+    env = os.environ.get("FLF_CACHE_DIR")
+    if env:
+        return env
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "FLF", "cache")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "flf")
+
+
+class Fingerprint(NamedTuple):
+    path: str
+    size: int
+    mtime_ns: int
+    sheet: str
+    digest: str
+
+
+@dataclass
+class ParsedSheet:
+    """
+    Isi sheet Barge yang sudah diparse, cukup untuk menjawab jendela baris mana pun:
+      - columns: {col_idx_0_based: array object sepanjang n_rows} untuk kolom yang diproyeksikan
+      - full_rows: {baris_0_based: map header} untuk semua baris yang memuat semua kolom wajib
+      - n_rows: baris terakhir yang tidak kosong + 1, width: lebar sheet
+    """
+    columns: Dict[int, np.ndarray]
+    full_rows: Dict[int, Dict[str, int]]
+    n_rows: int
+    width: int
+    fingerprint: Optional[Fingerprint] = field(default=None, compare=False)
+
+    def column(self, c: int) -> np.ndarray:
+        col = self.columns.get(c)
+        if col is None:
+            col = np.full(self.n_rows, np.nan, dtype=object)
+        return col
+
+
+class _Unencodable(Exception):
+    pass
+
+
+def short_hash(s: str) -> str:
+    """16 hex sha1 — kunci nama file / signature config (juga dipakai delta dan indeks bulan)."""
+    return hashlib.sha1(s.encode("utf-8")).hexdigest()[:16]
+
+
+def fingerprint(path: str, sheet: str) -> Fingerprint:
+    path = os.path.abspath(path)
+    st = os.stat(path)
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b""):
+            h.update(chunk)
+    return Fingerprint(path, st.st_size, st.st_mtime_ns, sheet, h.hexdigest())
+
+
+def entry_prefix(path: str, sheet: Optional[str] = None) -> str:
+    """Awal nama file cache untuk workbook (+ sheet); dipakai juga untuk reset per workbook/sheet."""
+    p = short_hash(os.path.normcase(os.path.abspath(path)))
+    return p if sheet is None else f"{p}-{short_hash(sheet)}"
+
+
+def _entry_path(fp: Fingerprint) -> str:
+    key = short_hash(json.dumps([CACHE_VERSION, *fp]))
+    return os.path.join(cache_dir(), f"{entry_prefix(fp.path, fp.sheet)}-{key}.npz")
+
+
+# ------------------------- encode / decode kolom -------------------------
+def _encode_column(col: np.ndarray) -> Dict[str, np.ndarray]:
+    n = len(col)
+    kind = np.zeros(n, dtype=np.uint8)
+    num = np.zeros(n, dtype=np.float64)
+    ival = np.zeros(n, dtype=np.int64)
+    strings: Dict[str, int] = {}
+    for i, v in enumerate(col):
+        t = type(v)
+        if t is float:
+            kind[i], num[i] = _FLOAT, v
+        elif t is str:
+            kind[i], ival[i] = _STR, strings.setdefault(v, len(strings))
+        elif t is int:
+            if not -(1 << 63) <= v < (1 << 63):
+                raise _Unencodable(v)
+            kind[i], ival[i] = _INT, v
+        elif t is bool:
+            kind[i], ival[i] = _BOOL, v
+        elif t is datetime and v.tzinfo is None:
+            kind[i], ival[i] = _DATETIME, (v - _EPOCH) // _US
+        elif t is timedelta:
+            kind[i], ival[i] = _TIMEDELTA, v // _US
+        elif t is time and v.tzinfo is None:
+            kind[i], ival[i] = _TIME, ((v.hour * 60 + v.minute) * 60 + v.second) * 1_000_000 + v.microsecond
+        else:
+            raise _Unencodable(v)
+    words = list(strings)
+    blob = "".join(words).encode("utf-8")
+    lengths = np.array([len(w) for w in words], dtype=np.int64)
+    return {
+        "kind": kind,
+        "num": num,
+        "ival": ival,
+        "str_blob": np.frombuffer(blob, dtype=np.uint8),
+        "str_len": lengths,
+    }
+
+
+def _decode_column(kind: np.ndarray, num: np.ndarray, ival: np.ndarray,
+                   str_blob: np.ndarray, str_len: np.ndarray) -> np.ndarray:
+    n = len(kind)
+    out = np.empty(n, dtype=object)
+    text = str_blob.tobytes().decode("utf-8")
+    ends = np.cumsum(str_len).tolist()
+    words = np.empty(len(ends), dtype=object)
+    words[:] = [text[e - k:e] for e, k in zip(ends, str_len.tolist())]
+
+    sel = np.flatnonzero(kind == _FLOAT)
+    out[sel] = num[sel].tolist()
+    sel = np.flatnonzero(kind == _STR)
+    out[sel] = words[ival[sel]]
+    for k, conv in (
+        (_INT, int),
+        (_BOOL, bool),
+        (_DATETIME, lambda x: _EPOCH + x * _US),
+        (_TIMEDELTA, lambda x: x * _US),
+        (_TIME, lambda x: (datetime.min + x * _US).time()),
+    ):
+        sel = np.flatnonzero(kind == k)
+        if len(sel):
+            out[sel] = [conv(x) for x in ival[sel].tolist()]
+    return out
+
+
+# ------------------------- simpan / muat -------------------------
+def _meta_of(fp: Fingerprint, parsed: ParsedSheet) -> Dict[str, Any]:
+    return {
+        "version": CACHE_VERSION,
+        "fingerprint": list(fp),
+        "n_rows": parsed.n_rows,
+        "width": parsed.width,
+        "columns": sorted(parsed.columns),
+        "full_rows": {str(r): m for r, m in parsed.full_rows.items()},
+    }
+
+
+def load(fp: Fingerprint) -> Optional[ParsedSheet]:
+    """Ambil entri cache untuk fingerprint ini, atau None. Entri rusak dihapus."""
+    entry = _entry_path(fp)
+    if not os.path.exists(entry):
+        return None
+    try:
+        with np.load(entry, allow_pickle=False) as z:
+            meta = json.loads(z["meta"].tobytes().decode("utf-8"))
+            if meta.get("version") != CACHE_VERSION or Fingerprint(*meta["fingerprint"]) != fp:
+                return None
+            columns = {
+                c: _decode_column(*(z[f"c{c}_{name}"] for name in ("kind", "num", "ival", "str_blob", "str_len")))
+                for c in meta["columns"]
+            }
+    except (OSError, ValueError, KeyError, TypeError):
+        remove_quiet(entry)
+        return None
+    try:
+        os.utime(entry)  # tandai baru dipakai (urutan LRU)
+    except OSError:
+        pass
+    return ParsedSheet(
+        columns=columns,
+        full_rows={int(r): m for r, m in meta["full_rows"].items()},
+        n_rows=meta["n_rows"],
+        width=meta["width"],
+        fingerprint=fp,
+    )
+
+
+def store(fp: Fingerprint, parsed: ParsedSheet, max_bytes: Optional[int] = None) -> bool:
+    """
+    Tulis entri cache (atomic: file sementara lalu os.replace), buang versi lama untuk path+sheet yang sama,
+    lalu terapkan batas ukuran. Return False kalau isi sheet tidak bisa disimpan tanpa pickle.
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    try:
+        for c, col in parsed.columns.items():
+            for name, arr in _encode_column(col).items():
+                arrays[f"c{c}_{name}"] = arr
+    except _Unencodable:
+        return False
+    meta = json.dumps(_meta_of(fp, parsed)).encode("utf-8")
+    arrays["meta"] = np.frombuffer(meta, dtype=np.uint8)
+
+    folder = cache_dir()
+    entry = _entry_path(fp)
+    atomic_write(entry, lambda fh: np.savez(fh, **arrays))
+
+    stale_prefix = entry_prefix(fp.path, fp.sheet) + "-"
+    for name in _entries():
+        full = os.path.join(folder, name)
+        if name.startswith(stale_prefix) and full != entry:
+            remove_quiet(full)
+    remove_entries(folder, stale_prefix, ".seen")
+    evict(max_bytes)
+    return True
+
+
+def load_or_build(
+    path: str, sheet: str, build: Callable[[], ParsedSheet], lazy: bool = False
+) -> Optional[ParsedSheet]:
+    """
+    Pakai cache kalau fingerprint cocok; kalau tidak, parse lewat build() lalu simpan.
+    lazy=True: versi file yang baru pertama kali diminta tidak diparse penuh — hanya ditandai (file .seen) dan
+    return None, caller cukup membaca jendelanya lewat streaming. Permintaan kedua untuk versi yang sama
+    baru membangun cache (file Barge berganti tiap hari; run sekali per versi tidak membayar parse penuh).
+    """
+    fp = fingerprint(path, sheet)
+    hit = load(fp)
+    if hit is not None:
+        return hit
+    if lazy and not os.path.exists(_marker_path(fp)):
+        _mark_seen(fp)
+        return None
+    parsed = build()
+    parsed.fingerprint = fp
+    try:
+        store(fp, parsed)
+    except OSError:
+        pass  # cache hanya optimasi; folder tidak bisa ditulis bukan error
+    return parsed
+
+
+def _marker_path(fp: Fingerprint) -> str:
+    return _entry_path(fp)[:-len(".npz")] + ".seen"
+
+
+def _mark_seen(fp: Fingerprint) -> None:
+    """Tandai versi file ini pernah diminta (satu penanda per path+sheet; penanda versi lama dibuang)."""
+    folder = cache_dir()
+    marker = _marker_path(fp)
+    remove_entries(folder, entry_prefix(fp.path, fp.sheet) + "-", ".seen")
+    try:
+        os.makedirs(folder, exist_ok=True)
+        with open(marker, "wb"):
+            pass
+    except OSError:
+        pass  # tanpa penanda, run berikutnya streaming lagi
+
+
+# ------------------------- eviction & invalidasi -------------------------
+def _entries() -> List[str]:
+    try:
+        return [n for n in os.listdir(cache_dir()) if n.endswith(".npz")]
+    except OSError:
+        return []
+
+
+def evict(max_bytes: Optional[int] = None) -> int:
+    """Buang entri yang paling lama tidak dipakai sampai total ukuran <= max_bytes. Return jumlah yang dibuang."""
+    limit = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    folder = cache_dir()
+    stats = []
+    for name in _entries():
+        full = os.path.join(folder, name)
+        try:
+            st = os.stat(full)
+        except OSError:
+            continue
+        stats.append((st.st_mtime_ns, st.st_size, full))
+    total = sum(size for _, size, _ in stats)
+    removed = 0
+    for _, size, full in sorted(stats):
+        if total <= limit:
+            break
+        if remove_quiet(full):
+            total -= size
+            removed += 1
+    return removed
+
+
+def invalidate(path: Optional[str] = None, sheet: Optional[str] = None) -> int:
+    """
+    Hapus cache secara manual: semua entri, semua sheet dari satu workbook, atau satu sheet saja.
+    Return jumlah entri yang dihapus (penanda lazy ikut dihapus, tidak dihitung).
+    """
+    prefix = "" if path is None else entry_prefix(path, sheet) + "-"
+    remove_entries(cache_dir(), prefix, ".seen")
+    return remove_entries(cache_dir(), prefix, ".npz")
+
+
+def cache_size() -> int:
+    folder = cache_dir()
+    total = 0
+    for name in _entries():
+        try:
+            total += os.path.getsize(os.path.join(folder, name))
+        except OSError:
+            pass
+    return total
+
+
+# ------------------------- file bersama (juga dipakai delta & month_index) -------------------------
+def remove_quiet(path: str) -> bool:
+    """Hapus file; False (tanpa exception) kalau tidak ada / tidak bisa dihapus."""
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+def atomic_write(target: str, write: Callable[[IO[bytes]], None]) -> None:
+    """
+    Tulis file lewat file sementara di folder yang sama lalu os.replace: pembaca tidak pernah melihat file
+    setengah jadi, dan isi lama tetap utuh kalau write() gagal. Folder dibuat kalau belum ada.
+    """
+    folder = os.path.dirname(os.path.abspath(target))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            write(fh)
+        os.replace(tmp, target)
+    except BaseException:
+        remove_quiet(tmp)
+        raise
+
+
+def remove_entries(folder: str, prefix: str, suffix: str) -> int:
+    """Hapus file di folder yang namanya diawali prefix (lihat entry_prefix) dan diakhiri suffix. Return jumlahnya."""
+    try:
+        names = [n for n in os.listdir(folder) if n.endswith(suffix) and n.startswith(prefix)]
+    except OSError:
+        return 0
+    return sum(remove_quiet(os.path.join(folder, n)) for n in names)
@@ -0,0 +1,212 @@
+# app/cli.py — runner tanpa GUI (tanpa import Qt), untuk dijadwalkan di server
+from __future__ import annotations
+import argparse
+import json
+import math
+import sys
+from dataclasses import asdict, fields
+from typing import Any, Dict, List, Mapping, Optional
+
+from .config import DEFAULT_BARGE_SHEET, RunOptions
+
+# Kode keluar
+EXIT_OK = 0          # semua job jalan dan tertulis (atau dry-run)
+EXIT_FAILED = 1      # pipeline error, tidak ada yang tersimpan
+EXIT_USAGE = 2       # argumen / file JSON tidak valid
+EXIT_PARTIAL = 3     # jalan, tapi ada job yang gagal atau tidak menghasilkan totals
+
+_OPTION_FIELDS = {f.name for f in fields(RunOptions)}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="python -m app",
+        description="Jalankan integrasi FLF (Barge → Master) tanpa GUI. Output: JSON totals + logs.",
+    )
+    p.add_argument("--config", metavar="JSON",
+                   help="file JSON berisi field RunOptions: satu objek, list objek, atau {\"jobs\": [...]} (batch)")
+    p.add_argument("--master", dest="master_path", help="workbook master (.xlsx)")
+    p.add_argument("--barge", dest="barge_path", help="workbook Barge (.xlsx)")
+    p.add_argument("--sheet", dest="barge_sheet", help=f"sheet Barge (default: {DEFAULT_BARGE_SHEET!r})")
+    p.add_argument("--year", dest="target_year", type=int, help="tahun target (menentukan sheet master)")
+    p.add_argument("--start-row", dest="start_row", type=int, help="baris awal di sheet Barge (1-based)")
+    p.add_argument("--row-count", dest="row_count", type=int, help="jumlah baris (0 = sampai akhir)")
+    p.add_argument("--month", dest="month", metavar="MON",
+                   help="bulan target, mis. Aug-25: baris diambil dari indeks blok bulan (--start-row/--row-count diabaikan)")
+    p.add_argument("--only-completed", dest="only_completed", action="store_true", default=None,
+                   help="hanya baris Status = Complete")
+    p.add_argument("--dry-run", dest="dry_run", action="store_true", default=None, help="jangan tulis master")
+    p.add_argument("--no-clear", dest="clear_before_write", action="store_false", default=None,
+                   help="jangan kosongkan baris bulan sebelum menulis")
+    p.add_argument("--no-cache", dest="use_cache", action="store_false", default=None,
+                   help="jangan pakai cache parse Barge")
+    p.add_argument("--incremental", dest="incremental", action="store_true", default=None,
+                   help="hanya proses baris Barge baru/berubah sejak run incremental terakhir (bukan untuk --parallel)")
+    p.add_argument("--trace-memory", dest="trace_memory", action="store_true", default=None,
+                   help="ukur puncak alokasi memori per tahap (tracemalloc; run lebih lambat)")
+    p.add_argument("--profile", dest="profile_path", metavar="FILE",
+                   help="simpan statistik cProfile run ke FILE (.pstats)")
+    p.add_argument("--parallel", metavar="N", type=int, nargs="?", const=0, default=None,
+                   help="perlakukan semua job sebagai unit ingest: dibaca paralel di N proses (default: jumlah core), "
+                        "totals bulan yang sama dijumlahkan, lalu ditulis sekali ke master")
+    p.add_argument("--watch", action="store_true",
+                   help="jalan terus: setiap file Barge job berubah, tunggu sampai tenang lalu jalankan job-nya "
+                        "(incremental; Ctrl+C untuk berhenti)")
+    p.add_argument("--debounce", metavar="SEC", type=float, default=2.0,
+                   help="--watch: detik tanpa perubahan sebelum run (default: 2)")
+    p.add_argument("--poll", metavar="SEC", type=float, nargs="?", const=1.0, default=None,
+                   help="--watch: cek size/mtime tiap SEC detik, bukan inotify (mis. untuk share jaringan)")
+    p.add_argument("--metrics", metavar="FILE", help="--watch: tulis jumlah run + latency ke FILE (JSON) setiap run")
+    p.add_argument("--output", "-o", metavar="FILE", help="tulis JSON ke file (default: stdout)")
+    p.add_argument("--quiet", "-q", action="store_true", help="jangan cetak progress ke stderr")
+    return p
+
+
+def _options_from(obj: Dict[str, Any], overrides: Dict[str, Any]) -> RunOptions:
+    if not isinstance(obj, dict):
+        raise ValueError(f"job must be a JSON object, got {type(obj).__name__}")
+    unknown = set(obj) - _OPTION_FIELDS
+    if unknown:
+        raise ValueError(f"unknown option(s): {', '.join(sorted(unknown))}")
+    merged = {"barge_sheet": DEFAULT_BARGE_SHEET, "row_count": 0}
+    merged.update(obj)
+    merged.update(overrides)
+    if merged.get("month"):
+        merged.setdefault("start_row", 1)  # jendela dari indeks bulan
+    missing = [k for k in ("master_path", "barge_path", "target_year", "start_row") if merged.get(k) is None]
+    if missing:
+        raise ValueError(f"missing option(s): {', '.join(missing)}")
+    return RunOptions(**merged)
+
+
+def load_jobs(args: argparse.Namespace) -> List[RunOptions]:
+    """Susun daftar RunOptions dari --config (opsional) + argumen (argumen menimpa isi JSON)."""
+    overrides = {k: v for k, v in vars(args).items() if k in _OPTION_FIELDS and v is not None}
+    if not args.config:
+        return [_options_from({}, overrides)]
+    with open(args.config, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict) and "jobs" in data:
+        data = data["jobs"]
+    items = data if isinstance(data, list) else [data]
+    if not items:
+        raise ValueError("config has no jobs")
+    return [_options_from(item, overrides) for item in items]
+
+
+def _jsonable(x: Any) -> Any:
+    # NaN/inf tidak valid di JSON → null
+    if isinstance(x, float) and not math.isfinite(x):
+        return None
+    if isinstance(x, Mapping):  # dict biasa dan TotalsMatrix
+        return {str(k): _jsonable(v) for k, v in x.items()}
+    if isinstance(x, (list, tuple)):
+        return [_jsonable(v) for v in x]
+    return x
+
+
+def _job_ok(totals: Mapping[str, Mapping[str, float]], logs: List[str]) -> bool:
+    return bool(totals) and not any(line.startswith("[ERROR]") for line in logs)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    def progress(msg: str) -> None:
+        if not args.quiet:
+            print(msg, file=sys.stderr, flush=True)
+
+    try:
+        jobs = load_jobs(args)
+    except (OSError, ValueError, TypeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    if args.watch:
+        return _watch(jobs, args, progress)
+
+    # import berat (pandas/openpyxl) baru setelah argumen valid
+    from .main_logic import preview_pipeline, run_batch, run_parallel, run_pipeline
+    from .perf import RunReport
+
+    if args.parallel is not None:
+        # unit ingest: satu totals gabungan per sheet master, bukan per job
+        report: Dict[str, Any] = {"ok": False, "options": [asdict(opts) for opts in jobs], "totals": {}, "logs": []}
+        try:
+            merged, logs = run_parallel(jobs, progress=progress, max_workers=args.parallel or None)
+        except Exception as e:
+            report["error"] = f"{type(e).__name__}: {e}"
+            code = EXIT_FAILED
+        else:
+            report.update(ok=bool(merged), totals=merged, logs=logs)
+            code = EXIT_OK if merged else EXIT_PARTIAL
+        _emit(report, args.output)
+        return code
+
+    report = {"ok": False, "jobs": [], "logs": []}
+    perf = RunReport(trace_memory=jobs[0].trace_memory)
+    diff = None
+    try:
+        if len(jobs) == 1 and jobs[0].dry_run:
+            # dry-run satu job: master hanya dibaca, diff per sel ikut di JSON
+            totals, diff, logs = preview_pipeline(jobs[0], progress=progress, perf=perf)
+            results, batch_logs = [(totals, logs)], []
+        elif len(jobs) == 1:
+            totals, logs = run_pipeline(jobs[0], progress=progress, perf=perf)
+            results, batch_logs = [(totals, logs)], []
+        else:
+            results, batch_logs = run_batch(jobs, progress=progress, perf=perf)
+    except Exception as e:
+        report["error"] = f"{type(e).__name__}: {e}"
+        code = EXIT_FAILED
+    else:
+        report["jobs"] = [
+            {"options": asdict(opts), "ok": _job_ok(totals, logs), "totals": totals, "logs": logs}
+            for opts, (totals, logs) in zip(jobs, results)
+        ]
+        if diff is not None:
+            report["jobs"][0]["diff"] = [d._asdict() for d in diff]
+        report["logs"] = batch_logs
+        report["ok"] = all(job["ok"] for job in report["jobs"])
+        code = EXIT_OK if report["ok"] else EXIT_PARTIAL
+    report["perf"] = perf.to_dict()
+
+    _emit(report, args.output)
+    return code
+
+
+def _watch(jobs: List[RunOptions], args: argparse.Namespace, progress) -> int:
+    from .watch import Watcher
+
+    watcher = Watcher(
+        jobs,
+        debounce=args.debounce,
+        poll_interval=args.poll or 1.0,
+        use_inotify=args.poll is None,
+        progress=progress,
+        metrics_path=args.metrics,
+    )
+    try:
+        import signal
+        signal.signal(signal.SIGTERM, lambda *_: watcher.stop())  # service manager / kill → berhenti rapi
+    except (AttributeError, ValueError):
+        pass
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    progress(f"[WATCH] Stopped after {watcher.metrics.runs} run(s).")
+    return EXIT_OK if not watcher.metrics.failed else EXIT_PARTIAL
+
+
+def _emit(report: Dict[str, Any], output: Optional[str]) -> None:
+    text = json.dumps(_jsonable(report), indent=2, ensure_ascii=False)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
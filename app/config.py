@@ -63,6 +63,11 @@ class RunOptions:
     only_completed: bool = False
     dry_run: bool = False
     clear_before_write: bool = True
+    use_cache: bool = True  # pakai cache parse Barge di disk (lihat barge_cache.py)
+    trace_memory: bool = False  # tracemalloc per tahap (lebih lambat; lihat perf.py)
+    profile_path: str | None = None  # simpan statistik cProfile run ini ke file .pstats
+    incremental: bool = False  # hanya proses baris Barge baru/berubah sejak run terakhir (lihat delta.py)
+    month: str | None = None  # mis. "Aug-25": baris diambil dari indeks blok bulan, start_row/row_count diabaikan (lihat month_index.py)
 
 def fmt_money(val: float) -> str:
     return f"{float(val):,.0f}"
@@ -0,0 +1,54 @@
+# app/control.py — pembatalan kooperatif + progress numerik untuk satu run pipeline (tanpa import berat)
+from __future__ import annotations
+import threading
+import time
+from typing import Callable, Optional
+
+
+class Cancelled(Exception):
+    """Run dihentikan lewat RunControl.cancel(). Master tidak pernah tersimpan sebagian."""
+
+
+class RunControl:
+    """
+    Diteruskan ke read_barge_rows / aggregate_barge / apply_to_master (seperti RunReport):
+      - cancel() boleh dipanggil dari thread mana pun (mis. tombol Cancel di GUI);
+        fungsi pipeline memanggil check() di antara chunk → Cancelled.
+      - step(stage, done, total) melaporkan progress numerik ke on_progress(stage, done, total)
+        (total 0 = tidak diketahui). Panggilan yang lebih rapat dari min_interval dilewati, kecuali
+        stage berganti atau stage selesai (done >= total).
+    Penulisan master: check() terakhir tepat sebelum file master diganti (os.replace); sesudah itu
+    pembatalan tidak berlaku lagi.
+    """
+
+    def __init__(
+        self,
+        on_progress: Optional[Callable[[str, int, int], None]] = None,
+        min_interval: float = 0.1,
+    ) -> None:
+        self._event = threading.Event()
+        self._on_progress = on_progress
+        self._min_interval = min_interval
+        self._last = 0.0
+        self._stage: Optional[str] = None
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def check(self) -> None:
+        if self._event.is_set():
+            raise Cancelled("Run cancelled.")
+
+    def step(self, stage: str, done: int, total: int = 0) -> None:
+        """Laporkan progress lalu check()."""
+        if self._on_progress is not None:
+            now = time.monotonic()
+            final = total > 0 and done >= total
+            if final or stage != self._stage or now - self._last >= self._min_interval:
+                self._stage, self._last = stage, now
+                self._on_progress(stage, done, total)
+        self.check()
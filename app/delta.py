@@ -0,0 +1,109 @@
+# app/delta.py — state mode incremental: hash per baris + totals run terakhir per (workbook Barge, sheet)
+from __future__ import annotations
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from . import barge_cache
+from .totals import TotalsMatrix
+from .xlsx_stream import SheetCheckpoint
+
+STATE_VERSION = 2
+
+
+def state_dir() -> str:
+    return os.path.join(barge_cache.cache_dir(), "delta")
+
+
+def state_path(path: str, sheet: str) -> str:
+    # satu file per workbook+sheet; jendela/tahun/opsi lain dicek lewat signature
+    return os.path.join(state_dir(), f"{barge_cache.entry_prefix(path, sheet)}.npz")
+
+
+@dataclass
+class DeltaState:
+    """
+    Hasil run incremental terakhir untuk satu sheet Barge:
+      - signature: opsi + config yang memengaruhi totals (beda → state diabaikan)
+      - checkpoint: sidik isi <sheetData> (lihat XlsxBook.read_tail)
+      - keep_idx/header_row/start0/stop: hasil deteksi header & jendela baris [start0, stop)
+      - totals: TotalsMatrix hasil aggregate_barge (urutan bulan ikut tersimpan)
+      - row0/row_hash/row_month: per baris sesudah filter — posisi, hash isi (termasuk kolom No), kode bulan
+        (indeks ke months; -1 = bulan tidak terbaca)
+    """
+    signature: Dict[str, Any]
+    checkpoint: SheetCheckpoint
+    keep_idx: Dict[str, int]
+    header_row: int
+    header_month_key: Optional[str]
+    start0: int
+    stop: int
+    totals: TotalsMatrix
+    months: List[str] = field(default_factory=list)
+    row0: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    row_hash: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.uint64))
+    row_month: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int32))
+
+    def month_hashes(self) -> Dict[str, np.ndarray]:
+        """{bulan: hash baris-baris bulan itu, urut posisi}."""
+        return {m: self.row_hash[self.row_month == i] for i, m in enumerate(self.months)}
+
+
+def load(path: str, sheet: str) -> Optional[DeltaState]:
+    entry = state_path(path, sheet)
+    if not os.path.exists(entry):
+        return None
+    try:
+        with np.load(entry, allow_pickle=False) as z:
+            meta = json.loads(z["meta"].tobytes().decode("utf-8"))
+            if meta.get("version") != STATE_VERSION:
+                return None
+            return DeltaState(
+                signature=meta["signature"],
+                checkpoint=SheetCheckpoint(*meta["checkpoint"]),
+                keep_idx=meta["keep_idx"],
+                header_row=meta["header_row"],
+                header_month_key=meta["header_month_key"],
+                start0=meta["start0"],
+                stop=meta["stop"],
+                totals=TotalsMatrix.from_arrays(z, prefix="totals_"),
+                months=meta["months"],
+                row0=z["row0"],
+                row_hash=z["row_hash"],
+                row_month=z["row_month"],
+            )
+    except (OSError, ValueError, KeyError, TypeError):
+        barge_cache.remove_quiet(entry)
+        return None
+
+
+def save(path: str, sheet: str, state: DeltaState) -> None:
+    """Simpan state run ini; run incremental berikutnya dibandingkan terhadapnya."""
+    meta = {
+        "version": STATE_VERSION,
+        "signature": state.signature,
+        "checkpoint": list(state.checkpoint),
+        "keep_idx": state.keep_idx,
+        "header_row": state.header_row,
+        "header_month_key": state.header_month_key,
+        "start0": state.start0,
+        "stop": state.stop,
+        "months": state.months,
+    }
+    barge_cache.atomic_write(state_path(path, sheet), lambda fh: np.savez(
+        fh,
+        meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+        row0=state.row0.astype(np.int64),
+        row_hash=state.row_hash.astype(np.uint64),
+        row_month=state.row_month.astype(np.int32),
+        **state.totals.to_arrays(prefix="totals_"),
+    ))
+
+
+def reset(path: Optional[str] = None, sheet: Optional[str] = None) -> int:
+    """Hapus state (semua, satu workbook, atau satu sheet) → run incremental berikutnya mulai dari nol."""
+    prefix = "" if path is None else barge_cache.entry_prefix(path, sheet)
+    return barge_cache.remove_entries(state_dir(), prefix, ".npz")
@@ -1,39 +1,63 @@
 # app/main_gui_modern.py — PyQt5 (Refactor: ramah pemula)
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Callable, Iterable, List, Tuple
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Tuple
 
 from PyQt5 import QtWidgets, QtCore, QtGui
 from functools import partial
 # Pastikan resources.qrc sudah di-compile menjadi ui/resources_rc.py
 # Contoh: pyrcc5 resources.qrc -o ui/resources_rc.py
 import ui.resources_rc  # noqa: F401
-from app.popup import confirm_summary
+from app.popup import confirm_diff, confirm_summary
+from app.control import Cancelled, RunControl
+from app import session
+
+if TYPE_CHECKING:
+    from app.xlsx_stream import SheetInfo
 
 # Import dari modul Anda sendiri
+# (app.main_logic → pandas/openpyxl TIDAK di-import di sini: jendela tampil dulu, lalu prewarm di background)
 from app.config import MASTER_SHEET_NAMES, DEFAULT_BARGE_SHEET, RunOptions
-from app.main_logic import run_pipeline
 
-from openpyxl import load_workbook
 import os
+import sys
 import inspect
+import time
+
+
+def run_pipeline(opts: RunOptions, progress=lambda *_: None, control: RunControl | None = None):
+    """Proxy ke app.main_logic.run_pipeline; modulnya di-import saat dipakai (biasanya sudah dipanaskan prewarm)."""
+    from app.main_logic import run_pipeline as _run
+    return _run(opts, progress=progress, control=control)
+
+
+def preview_pipeline(opts: RunOptions, progress=lambda *_: None, control: RunControl | None = None):
+    """Proxy ke app.main_logic.preview_pipeline (master hanya dibaca). Return ((totals, diff), logs) untuk Worker."""
+    from app.main_logic import preview_pipeline as _preview
+    totals, diff, logs = _preview(opts, progress=progress, control=control)
+    return (totals, diff), logs
+
+
+def write_totals(opts: RunOptions, totals, progress=lambda *_: None, control: RunControl | None = None):
+    """Proxy ke app.main_logic.write_totals: tulis totals hasil preview setelah dikonfirmasi."""
+    from app.main_logic import write_totals as _write
+    return totals, _write(opts, totals, progress=progress, control=control)
+
+
+def month_block_index(barge_path: str, sheet: str, year: int, control: RunControl | None = None):
+    """Proxy ke app.main_logic.month_block_index (pilihan Month di form). Return (index, logs) untuk Worker."""
+    from app.main_logic import month_block_index as _index
+    return _index(barge_path, sheet, year, control=control)
 
-# === Tambahan untuk reset runtime saat End ===
-import importlib
-import app.config as cfg
-import app.mapping as mapping
-import app.main_logic as logic
 
 def reset_runtime_state() -> None:
-    """Reload modul & bersihkan override volatile supaya state tidak nempel antar-run."""
-    try:
-        importlib.reload(cfg)
-        importlib.reload(mapping)
-        importlib.reload(logic)
-        if hasattr(cfg, "FORCE_MONTH_OVERRIDE"):
-            cfg.FORCE_MONTH_OVERRIDE = ""
-    except Exception:
-        pass
+    """
+    Bersihkan override volatile supaya tidak nempel antar-run (lihat app/session.py).
+    Modul tidak di-reload: cache hangat (sheet Barge terparse, indeks master, FLF resolver) tetap dipakai
+    run berikutnya selama file-nya tidak berubah.
+    """
+    session.current().reset()
 
 # =============================
 # Konstanta UI untuk konsistensi
@@ -51,6 +75,8 @@ YEAR_WIDTH = 125
 SHEET_WIDTH = 110
 START_WIDTH = 80
 COUNT_WIDTH = 80
+MONTH_WIDTH = COUNT_WIDTH + 16 + START_WIDTH  # selebar Row Count + Start Row (OPT_HSPACE)
+MANUAL_ROWS = "Rows"  # item pertama combo Month: pakai Start Row / Row Count
 
 
 
@@ -62,6 +88,26 @@ OPT_RIGHT_MARGIN_EXTRA = BUTTON_WIDTH  # supaya rata dengan tombol Browse
 OPT_VSPACE = 10
 OPT_HSPACE = 16 # jarak antar kotak dalam satu baris
 
+# Log run
+LOG_MAX_LINES = 5000     # baris tertua dibuang otomatis (maximumBlockCount)
+LOG_FLUSH_MS = 100       # baris yang antre ditulis ke widget sekaligus, paling sering sekali per interval
+PROGRESS_EMIT_MS = 100   # pesan progress dari Worker yang lebih rapat dari ini digabung jadi satu sinyal
+STEP_EMIT_MS = 100       # progress numerik (progress bar) paling sering sekali per interval, kecuali ganti tahap
+
+# Gambar latar (BackgroundLabel)
+BG_SIZE_BUCKET = 32      # px; hasil scale di-cache per ukuran yang dibulatkan ke atas kelipatan ini
+BG_SETTLE_MS = 150       # scale halus sekali setelah resize berhenti selama ini
+BG_CACHE_SIZE = 4        # jumlah pixmap hasil scale yang disimpan (LRU)
+
+# Label progress bar per tahap RunControl.step()
+STAGE_LABELS = {
+    "read": "Reading Barge",
+    "aggregate": "Aggregating",
+    "diff": "Comparing with master",
+    "write": "Writing master",
+    "ingest": "Ingesting",
+}
+
 
 # =============================
 # Utilitas kecil
@@ -87,39 +133,136 @@ def browse_excel(parent: QtWidgets.QWidget, title: str) -> str:
     return path or ""
 
 
-def read_sheetnames(xlsx_path: str) -> List[str]:
-    """Ambil daftar sheet dari workbook; jika gagal, kembalikan list kosong."""
+def probe_sheets(xlsx_path: str) -> List["SheetInfo"]:
+    """Metadata sheet (nama, used range, perkiraan jumlah baris) tanpa memuat workbook; gagal → list kosong."""
     try:
-        wb = load_workbook(xlsx_path, read_only=True, data_only=True)
-        return list(wb.sheetnames)
+        from app.xlsx_stream import probe_workbook
+        return probe_workbook(xlsx_path)
     except Exception:
         return []
 
 
+def read_sheetnames(xlsx_path: str) -> List[str]:
+    """Ambil daftar sheet dari workbook; jika gagal, kembalikan list kosong."""
+    return [info.name for info in probe_sheets(xlsx_path)]
+
+
+class _FirstPaintWatcher(QtCore.QObject):
+    """Panggil callback sekali, setelah event paint pertama widget selesai diproses."""
+
+    def __init__(self, widget: QtWidgets.QWidget, callback: Callable[[], None]) -> None:
+        super().__init__(widget)
+        self._callback: Callable[[], None] | None = callback
+        widget.installEventFilter(self)
+
+    def eventFilter(self, obj, event) -> bool:  # type: ignore[override]
+        if event.type() == QtCore.QEvent.Paint and self._callback is not None:
+            callback, self._callback = self._callback, None
+            obj.removeEventFilter(self)
+            QtCore.QTimer.singleShot(0, callback)  # jalan setelah paint ini selesai
+        return False
+
+
+def call_after_first_paint(widget: QtWidgets.QWidget, callback: Callable[[], None]) -> None:
+    _FirstPaintWatcher(widget, callback)
+
+
 # =============================
 # Worker thread
 # =============================
+class _ProgressBatcher:
+    """
+    Callback progress untuk thread worker: pesan yang datang < interval sejak emit terakhir ditampung,
+    lalu dikirim bersama (dipisah newline) di emit berikutnya / flush(). Tidak ada pesan yang dibuang.
+    """
+
+    def __init__(self, emit: Callable[[str], None], interval_ms: int = PROGRESS_EMIT_MS) -> None:
+        self._emit = emit
+        self._interval = interval_ms / 1000.0
+        self._buf: List[str] = []
+        self._last = 0.0
+
+    def __call__(self, msg: str) -> None:
+        self._buf.append(str(msg))
+        if time.monotonic() - self._last >= self._interval:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buf:
+            text, self._buf = "\n".join(self._buf), []
+            self._emit(text)
+        self._last = time.monotonic()
+
+
 class Worker(QtCore.QThread):
-    """Thread untuk menjalankan pipeline agar UI tidak freeze."""
+    """
+    Thread untuk menjalankan pipeline agar UI tidak freeze.
+    Runner yang menerima `control` mendapat RunControl: progress numerik lewat sinyal `step`,
+    dan cancel() menghentikannya di chunk berikutnya (sinyal `cancelled`, master tidak berubah).
+    """
 
     progress = QtCore.pyqtSignal(str)
+    step = QtCore.pyqtSignal(str, int, int)  # tahap, selesai, total (0 = tidak diketahui)
     finished = QtCore.pyqtSignal(object, object)  # totals, logs
     failed = QtCore.pyqtSignal(str)
+    cancelled = QtCore.pyqtSignal()
 
     def __init__(self, runner: Callable[..., Tuple[object, object]], parent=None) -> None:
         super().__init__(parent)
         self._runner = runner
+        self.control = RunControl(on_progress=self.step.emit, min_interval=STEP_EMIT_MS / 1000.0)
+
+    def cancel(self) -> None:
+        """Aman dipanggil dari thread GUI."""
+        self.control.cancel()
 
     def run(self) -> None:  # type: ignore[override]
+        params = inspect.signature(self._runner).parameters
+        kwargs = {"control": self.control} if "control" in params else {}
+        batcher = None
         try:
             # Jika runner mendukung argumen progress, berikan sinyal progress.emit
-            if "progress" in inspect.signature(self._runner).parameters:
-                totals, logs = self._runner(progress=self.progress.emit)
-            else:
-                totals, logs = self._runner()
-            self.finished.emit(totals, logs)
+            if "progress" in params:
+                batcher = kwargs["progress"] = _ProgressBatcher(self.progress.emit)
+            totals, logs = self._runner(**kwargs)
+        except Cancelled:
+            self.cancelled.emit()
+            return
         except Exception as e:
             self.failed.emit(str(e))
+            return
+        finally:
+            if batcher is not None:
+                batcher.flush()
+        self.finished.emit(totals, logs)
+
+
+class _StageEta:
+    """Perkiraan sisa waktu dari laju tahap yang sedang jalan (tiap tahap punya satuan sendiri)."""
+
+    def __init__(self) -> None:
+        self._stage: str | None = None
+        self._t0 = 0.0
+        self._d0 = 0
+
+    def update(self, stage: str, done: int, total: int) -> float | None:
+        now = time.monotonic()
+        if stage != self._stage:
+            self._stage, self._t0, self._d0 = stage, now, done
+            return None
+        if total <= 0 or done <= self._d0 or now - self._t0 < 0.5:
+            return None
+        return (now - self._t0) * (total - done) / (done - self._d0)
+
+
+def _step_text(stage: str, done: int, total: int, eta: float | None) -> str:
+    label = STAGE_LABELS.get(stage, stage)
+    if total <= 0:
+        return f"{label} … {done:,}"
+    text = f"{label} {done:,}/{total:,}"
+    if eta is not None and done < total:
+        text += f" — ~{eta:.0f}s left" if eta < 90 else f" — ~{eta / 60:.0f} min left"
+    return text
 
 
 def done_popup(parent: QtWidgets.QWidget, ok: bool = True) -> None:
@@ -130,43 +273,162 @@ def done_popup(parent: QtWidgets.QWidget, ok: bool = True) -> None:
     mb.exec_()
 
 
+# =============================
+# Log run: plain text, dibatasi, ditulis per batch
+# =============================
+class _SeverityHighlighter(QtGui.QSyntaxHighlighter):
+    """Warna per baris dari isinya (ERROR/FAILED merah, [WARN] oranye) — tanpa HTML per baris."""
+
+    def __init__(self, doc: QtGui.QTextDocument) -> None:
+        super().__init__(doc)
+        self._error = QtGui.QTextCharFormat()
+        self._error.setForeground(QtGui.QColor("#b91c1c"))
+        self._warn = QtGui.QTextCharFormat()
+        self._warn.setForeground(QtGui.QColor("#d97706"))
+
+    def highlightBlock(self, text: str) -> None:  # type: ignore[override]
+        up = text.upper()
+        if "ERROR" in up or "FAILED" in up:
+            self.setFormat(0, len(text), self._error)
+        elif up.startswith("[WARN]"):
+            self.setFormat(0, len(text), self._warn)
+
+
+class LogView(QtWidgets.QPlainTextEdit):
+    """
+    Pengganti QTextEdit untuk log run. append() hanya menaruh teks di antrean; antrean ditulis
+    sekaligus (satu appendPlainText) paling sering tiap LOG_FLUSH_MS, dan hanya LOG_MAX_LINES baris
+    terakhir yang disimpan — ribuan baris log tidak membuat UI macet.
+    """
+
+    def __init__(self, parent=None, objectName: str = "logArea", max_lines: int = LOG_MAX_LINES) -> None:
+        super().__init__(parent, objectName=objectName)
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setMaximumBlockCount(max_lines)
+        self._pending: List[str] = []
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(LOG_FLUSH_MS)
+        self._timer.timeout.connect(self.flush)
+        self._highlighter = _SeverityHighlighter(self.document())
+
+    def append(self, text: str) -> None:
+        """Satu entri log (teks polos; boleh berisi beberapa baris)."""
+        self._pending.append(str(text))
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def append_lines(self, lines: Iterable[object]) -> None:
+        self._pending.extend(str(x) for x in lines)
+        if self._pending and not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Tulis antrean sekarang (appendPlainText tetap auto-scroll kalau posisi sudah di bawah)."""
+        self._timer.stop()
+        if self._pending:
+            text, self._pending = "\n".join(self._pending), []
+            self.appendPlainText(text)
+
+    def clear(self) -> None:  # type: ignore[override]
+        self._pending = []
+        self._timer.stop()
+        super().clear()
+
+
 # =============================
 # Komponen background penuh jendela
 # =============================
 class BackgroundLabel(QtWidgets.QLabel):
-    """Label yang menampilkan gambar latar dan otomatis di-scale."""
+    """
+    Label yang menampilkan gambar latar dan otomatis di-scale.
+      - tiap resource di-decode sekali per proses; set_image ke gambar yang sedang tampil tidak berbuat apa-apa;
+      - hasil scale disimpan per (gambar, ukuran dibulatkan ke atas BG_SIZE_BUCKET px), LRU BG_CACHE_SIZE,
+        jadi pindah halaman / resize kecil memakai pixmap yang sudah ada;
+      - selama resize dipakai FastTransformation (hanya kalau bucket berubah), lalu SmoothTransformation
+        sekali setelah resize berhenti BG_SETTLE_MS.
+    """
+
+    _sources: Dict[str, QtGui.QPixmap] = {}  # path resource → pixmap ukuran asli (dipakai semua instance)
 
     def __init__(self, parent=None) -> None:
         super().__init__(parent)
+        self._path: str | None = None
         self._pix: QtGui.QPixmap | None = None
+        self._scaled: "OrderedDict[Tuple[str, int, int], QtGui.QPixmap]" = OrderedDict()
+        self._shown: Tuple[str, int, int] | None = None
+        self._settle = QtCore.QTimer(self)
+        self._settle.setSingleShot(True)
+        self._settle.setInterval(BG_SETTLE_MS)
+        self._settle.timeout.connect(lambda: self._update(smooth=True))
         self.setScaledContents(False)
 
     def set_image(self, path: str) -> None:
-        pix = QtGui.QPixmap(path)
-        if not pix.isNull():
-            self._pix = pix
-            self._update()
+        if path == self._path:
+            return
+        pix = self._sources.get(path)
+        if pix is None:
+            pix = QtGui.QPixmap(path)
+            if pix.isNull():
+                return
+            self._sources[path] = pix
+        self._path, self._pix = path, pix
+        self._update(smooth=True)
 
     def resizeEvent(self, e) -> None:  # type: ignore[override]
         super().resizeEvent(e)
-        self._update()
+        self._update(smooth=False)
+
+    def _bucket(self) -> Tuple[int, int]:
+        b = BG_SIZE_BUCKET
+        return -(-max(self.width(), 1) // b) * b, -(-max(self.height(), 1) // b) * b
 
-    def _update(self) -> None:
-        if self._pix:
-            self.setPixmap(
-                self._pix.scaled(
-                    self.size(),
-                    QtCore.Qt.KeepAspectRatioByExpanding,
-                    QtCore.Qt.SmoothTransformation,
-                )
-            )
+    def _update(self, smooth: bool) -> None:
+        if self._pix is None or self._path is None:
+            return
+        key = (self._path, *self._bucket())
+        hit = self._scaled.get(key)
+        if hit is not None:
+            self._scaled.move_to_end(key)
+            self._settle.stop()
+            if self._shown != key:
+                self._shown = key
+                self.setPixmap(hit)
+            return
+        if not smooth:
+            # resize masih berjalan: scale cepat (sekali per bucket), versi halus menyusul lewat timer
+            self._settle.start()
+            if self._shown != key:
+                self._shown = key
+                self.setPixmap(self._scale(key, QtCore.Qt.FastTransformation))
+            return
+        pix = self._scale(key, QtCore.Qt.SmoothTransformation)
+        self._scaled[key] = pix
+        while len(self._scaled) > BG_CACHE_SIZE:
+            self._scaled.popitem(last=False)
+        self._shown = key
+        self.setPixmap(pix)
+
+    def _scale(self, key: Tuple[str, int, int], mode) -> QtGui.QPixmap:
+        return self._pix.scaled(QtCore.QSize(key[1], key[2]), QtCore.Qt.KeepAspectRatioByExpanding, mode)
 
 
 # =============================
 # Halaman Form → Run/Log (factory)
 # =============================
 
-def build_flf_page(kind_label: str, runner_func: Callable[..., Tuple[object, object]], key: str) -> QtWidgets.QWidget:
+def build_flf_page(
+    kind_label: str,
+    runner_func: Callable[..., Tuple[object, object]],
+    key: str,
+    write_func: Callable[..., Tuple[object, object]] | None = None,
+) -> QtWidgets.QWidget:
+    """
+    runner_func(opts, progress) → (totals, logs) dijalankan di Worker.
+    Kalau write_func diberikan, runner_func adalah langkah preview → ((totals, diff), logs):
+    diff ditampilkan dulu (confirm_diff), dan write_func(opts, totals, progress) baru jalan kalau disetujui.
+    """
     page = QtWidgets.QWidget(objectName=f"{key}Page")
     page.setAttribute(QtCore.Qt.WA_StyledBackground, True)
 
@@ -270,6 +532,8 @@ def build_flf_page(kind_label: str, runner_func: Callable[..., Tuple[object, obj
     year_edit.setText(str(max(MASTER_SHEET_NAMES.keys())))
 
     combo_sheet = QtWidgets.QComboBox(); combo_sheet.addItem(DEFAULT_BARGE_SHEET)
+    combo_month = QtWidgets.QComboBox(); combo_month.addItem(MANUAL_ROWS)
+    combo_month.setToolTip("Pilih bulan → baris diambil dari indeks blok bulan sheet Barge")
     spin_start = QtWidgets.QSpinBox();  spin_start.setRange(1, 1_000_000); spin_start.setValue(246)
     spin_count = QtWidgets.QSpinBox();  spin_count.setRange(0, 1_000_000); spin_count.setValue(29)
 
@@ -306,7 +570,8 @@ def build_flf_page(kind_label: str, runner_func: Callable[..., Tuple[object, obj
     cb_clear.setChecked(True)
     cb_clear.setFixedHeight(CTRL_HEIGHT)
 
-    grid.addWidget(cb_clear, 1, 0, 1, 2)
+    grid.addWidget(cb_clear, 1, 0, 1, 2, QtCore.Qt.AlignBottom)
+    grid.addWidget(cell_top("Month", combo_month, MONTH_WIDTH), 1, 2, 1, 2)
 
     vbox.addLayout(row_sheet)
 
@@ -341,12 +606,19 @@ def build_flf_page(kind_label: str, runner_func: Callable[..., Tuple[object, obj
     power_btn.setFocusPolicy(QtCore.Qt.NoFocus)         # tanpa outline fokus
     run_v.addWidget(power_btn, 0, QtCore.Qt.AlignHCenter | QtCore.Qt.AlignTop)
 
+    bar = QtWidgets.QProgressBar(objectName="runProgress")
+    bar.setTextVisible(True)
+    bar.setVisible(False)
+    run_v.addWidget(bar)
+
     # Hapus tombol Start; End jadi biru
-    log = QtWidgets.QTextEdit(objectName="logArea"); log.setReadOnly(True)
+    log = LogView(objectName="logArea")
     run_v.addWidget(log, 1)
 
     end_row = QtWidgets.QHBoxLayout(); end_row.addStretch(1)
+    btn_cancel = QtWidgets.QPushButton("Cancel"); btn_cancel.setEnabled(False)
     btn_end = QtWidgets.QPushButton("End"); btn_end.setEnabled(False); btn_end.setProperty("class", "primary")
+    end_row.addWidget(btn_cancel)
     end_row.addWidget(btn_end)
     run_v.addLayout(end_row)
 
@@ -367,12 +639,100 @@ def build_flf_page(kind_label: str, runner_func: Callable[..., Tuple[object, obj
         if path:
             line_edit.setText(path)
 
+    sheet_info: dict[str, "SheetInfo"] = {}  # nama sheet → SheetInfo dari probe (untuk batas Start Row / Row Count)
+
+    def apply_sheet_limits(name: str) -> None:
+        info = sheet_info.get(name)
+        max_row = info.max_row if info is not None else None
+        if max_row:
+            spin_start.setMaximum(max_row)
+            spin_count.setMaximum(max(0, max_row - spin_start.value() + 1))
+            hint = f"Sheet '{name}': {info.used_range} (~{max_row:,} rows)"
+        else:
+            spin_start.setMaximum(1_000_000)
+            spin_count.setMaximum(1_000_000)
+            hint = ""
+        spin_start.setToolTip(hint)
+        spin_count.setToolTip(hint)
+
+    def on_start_row_changed(_value: int) -> None:
+        info = sheet_info.get(combo_sheet.currentText())
+        if info is not None and info.max_row:
+            spin_count.setMaximum(max(0, info.max_row - spin_start.value() + 1))
+
+    combo_sheet.currentTextChanged.connect(apply_sheet_limits)
+    spin_start.valueChanged.connect(on_start_row_changed)
+
+    def parse_year() -> int:
+        # parse tahun dari year_edit (fallback ke nilai default jika kosong)
+        try:
+            return int(year_edit.text().strip())
+        except Exception:
+            return max(MASTER_SHEET_NAMES.keys())  # fallback aman
+
+    # --- Month: indeks blok bulan dibangun di background setiap file/sheet/tahun berubah
+    page._month_index = None
+    page._index_worker = None
+    page._index_busy = False
+    page._index_stale = False
+
+    def reset_months(text: str = MANUAL_ROWS) -> None:
+        page._month_index = None
+        combo_month.clear()
+        combo_month.addItem(text)
+        combo_month.setEnabled(text == MANUAL_ROWS)
+
+    def refresh_months(*_args) -> None:
+        if page._index_busy:
+            page._index_stale = True  # diulang setelah indeks yang sedang dibangun selesai
+            return
+        path, sheet = le_barge.text().strip(), combo_sheet.currentText().strip()
+        if not (path.lower().endswith(".xlsx") and os.path.exists(path) and sheet):
+            reset_months()
+            return
+        reset_months("Indexing …")
+        page._index_busy, page._index_stale = True, False
+        worker = Worker(partial(month_block_index, path, sheet, parse_year()), page)
+        worker.finished.connect(on_months)
+        worker.failed.connect(lambda _e: on_months(None, []))
+        page._index_worker = worker
+        worker.start()
+
+    def on_months(index, _logs) -> None:
+        page._index_busy = False
+        if page._index_stale:
+            refresh_months()
+            return
+        reset_months()
+        if index is not None and index.blocks:
+            page._month_index = index
+            combo_month.addItems(index.months)
+
+    def on_month_changed(_i: int) -> None:
+        index = page._month_index
+        blocks = index.find(combo_month.currentText()) if index is not None and combo_month.currentIndex() > 0 else []
+        spin_start.setEnabled(not blocks)
+        spin_count.setEnabled(not blocks)
+        if blocks:
+            spin_start.setValue(blocks[0].start_row)
+            spin_count.setValue(blocks[0].row_count)
+        hint = ", ".join(f"rows {b.start_row}..{b.start_row + b.row_count - 1}" for b in blocks)
+        combo_month.setToolTip(hint or "Pilih bulan → baris diambil dari indeks blok bulan sheet Barge")
+
+    combo_sheet.currentTextChanged.connect(refresh_months)
+    year_edit.editingFinished.connect(refresh_months)
+    combo_month.currentIndexChanged.connect(on_month_changed)
+
     def fill_sheets(combo: QtWidgets.QComboBox, path: str) -> None:
+        infos = probe_sheets(path)
+        sheet_info.clear()
+        sheet_info.update({info.name: info for info in infos})
+        sheets = [info.name for info in infos]
         combo.clear()
-        sheets = read_sheetnames(path)
         combo.addItems(sheets or [DEFAULT_BARGE_SHEET])
         if sheets and DEFAULT_BARGE_SHEET in sheets:
             combo.setCurrentText(DEFAULT_BARGE_SHEET)
+        apply_sheet_limits(combo.currentText())
 
 
     def on_pick_barge():
@@ -384,23 +744,18 @@ def build_flf_page(kind_label: str, runner_func: Callable[..., Tuple[object, obj
 
 
     def build_options() -> RunOptions:
-        # parse tahun dari year_edit (fallback ke nilai default jika kosong)
-        txt = year_edit.text().strip()
-        try:
-            yr = int(txt)
-        except Exception:
-            yr = max(MASTER_SHEET_NAMES.keys())  # fallback aman
-
+        month = combo_month.currentText() if page._month_index is not None and combo_month.currentIndex() > 0 else None
         return RunOptions(
             master_path=le_master.text().strip(),
             barge_path=le_barge.text().strip(),
             barge_sheet=combo_sheet.currentText().strip() or DEFAULT_BARGE_SHEET,
-            target_year=yr,
+            target_year=parse_year(),
             start_row=spin_start.value(),
             row_count=spin_count.value(),
             only_completed=True,
             dry_run=False,
             clear_before_write=cb_clear.isChecked(),
+            month=month,
         )
 
 
@@ -418,13 +773,17 @@ def build_flf_page(kind_label: str, runner_func: Callable[..., Tuple[object, obj
         if not validate_paths(master, barge):
             return
         opts = build_options()
+        rows = (
+            f"Month        : {opts.month} ({combo_month.toolTip()})\n" if opts.month else
+            f"Start Row    : {opts.start_row}\n"
+            f"Row Count    : {opts.row_count}\n"
+        )
         summary = (
             f"Master       : {opts.master_path}\n"
             f"Barge        : {opts.barge_path}\n"
             f"Year         : {opts.target_year}\n"
             f"Barge Sheet  : {opts.barge_sheet}\n"
-            f"Start Row    : {opts.start_row}\n"
-            f"Row Count    : {opts.row_count}\n"
+            f"{rows}"
             f"Clear Row?   : {opts.clear_before_write}\n"
         )
 
@@ -442,43 +801,104 @@ def build_flf_page(kind_label: str, runner_func: Callable[..., Tuple[object, obj
         # Pakai partial, jangan lambda
         return partial(runner_func, opts)
 
+    eta = _StageEta()
+
+    def on_step(stage: str, done: int, total: int) -> None:
+        if total > 0:
+            bar.setRange(0, total)
+            bar.setValue(min(done, total))
+        else:
+            bar.setRange(0, 0)  # total tidak diketahui → animasi sibuk
+        bar.setFormat(_step_text(stage, done, total, eta.update(stage, done, total)))
+
+    def running(worker: Worker) -> None:
+        page._worker = worker
+        worker.progress.connect(lambda s: log.append(s))
+        worker.step.connect(on_step)
+        worker.cancelled.connect(on_cancelled)
+        worker.failed.connect(lambda e: (stopped(), done_popup(page, ok=False)))
+        bar.setRange(0, 0)
+        bar.setFormat("Starting …")
+        bar.setVisible(True)
+        btn_cancel.setEnabled(True)
+        worker.start()
+
+    def stopped() -> None:
+        bar.setVisible(False)
+        btn_cancel.setEnabled(False)
+        btn_end.setEnabled(True)
+
+    def on_cancelled() -> None:
+        log.append("Cancelled — master not changed.")
+        log.flush()
+        stopped()
+
+    def on_cancel_clicked() -> None:
+        worker = getattr(page, "_worker", None)
+        if worker is not None and worker.isRunning():
+            btn_cancel.setEnabled(False)
+            bar.setFormat("Cancelling …")
+            worker.cancel()
+
+    btn_cancel.clicked.connect(on_cancel_clicked)
+
     def on_start() -> None:
         power_btn.setEnabled(False)
         log.append("Processing data...")
         worker = Worker(runner_builder(), page)
-        page._worker = worker
-        worker.progress.connect(lambda s: log.append(s))
 
-        def done(totals, logs):
+        def show_details(logs) -> None:
             if logs:
-                log.append("")          # baris kosong pemisah
-                log.append("Details")   # tidak bold, tidak berwarna
-                for line in logs:
-                    s = str(line)
-                    up = s.upper()
-                    if "ERROR" in up or "FAILED" in up:
-                        # hanya error yang merah
-                        log.append(f"<span style='color:#b91c1c;'>{s}</span>")
-                    else:
-                        # baris normal: tanpa warna/format
-                        log.append(s)
+                # baris kosong pemisah + "Details"; warna error/warning dari LogView (tanpa HTML)
+                log.append_lines(["", "Details", *logs])
 
+        def done(totals, logs):
+            show_details(logs)
             log.append("Execution completed.")  # tidak bold/warna
+            log.flush()  # tampil dulu sebelum popup modal
+            stopped()
             done_popup(page, ok=True)
-            btn_end.setEnabled(True)
 
-        worker.finished.connect(done)
-        worker.failed.connect(lambda e: (done_popup(page, ok=False), btn_end.setEnabled(True)))
-        worker.start()
+        def previewed(result, logs):
+            # langkah 1 selesai: master belum disentuh; tampilkan diff, tulis hanya kalau disetujui
+            totals, diff = result
+            show_details(logs)
+            log.flush()
+            if not diff:
+                done(totals, [])
+                return
+            bar.setVisible(False)
+            btn_cancel.setEnabled(False)
+            if not confirm_diff(page, diff):
+                on_cancelled()
+                return
+            log.append("")
+            log.append("Writing to master...")
+            writer = Worker(partial(write_func, page._opts, totals), page)
+            writer.finished.connect(done)
+            running(writer)
+
+        worker.finished.connect(done if write_func is None else previewed)
+        running(worker)
 
     # klik ikon power = mulai
     power_btn.clicked.connect(on_start)
 
     # End → reset runtime, balik ke form, bersihkan log, hidupkan ikon power lagi
     def on_end_clicked() -> None:
-        # putus worker
-        if hasattr(page, "_worker"):
-            page._worker = None
+        # hentikan worker yang masih jalan dulu (QThread tidak boleh dilepas selagi berjalan);
+        # sinyalnya diblok supaya popup/log dari run lama tidak muncul setelah reset
+        for attr in ("_worker", "_index_worker"):
+            worker = getattr(page, attr, None)
+            if worker is not None:
+                worker.blockSignals(True)
+                if worker.isRunning():
+                    worker.cancel()
+                    worker.wait()
+                setattr(page, attr, None)
+        page._index_busy = page._index_stale = False
+        bar.setVisible(False)
+        btn_cancel.setEnabled(False)
         # reset modul/state & opsi
         reset_runtime_state()
         if hasattr(page, "_opts"):
@@ -486,6 +906,7 @@ def build_flf_page(kind_label: str, runner_func: Callable[..., Tuple[object, obj
         # clear form agar submit ulang → state fresh
         le_barge.clear()
         le_master.clear()
+        sheet_info.clear()
         combo_sheet.clear()
         combo_sheet.addItem(DEFAULT_BARGE_SHEET)
         switch_to_form()
@@ -564,7 +985,7 @@ def create_window() -> QtWidgets.QDialog:
     _ = QtWidgets.QVBoxLayout(home)
 
     # Hanya Monthly
-    monthly = build_flf_page("FLF Monthly", run_pipeline, key="Monthly")
+    monthly = build_flf_page("FLF Monthly", preview_pipeline, key="Monthly", write_func=write_totals)
 
     for p in (home, monthly):
         pages.addWidget(p)
@@ -1,7 +1,14 @@
 from __future__ import annotations
 from collections import defaultdict
-from typing import Dict, Tuple, Any, Optional, List
+from typing import Dict, Tuple, Any, Optional, List, Iterable, NamedTuple
+import json
+import multiprocessing
+import os
 import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from openpyxl import load_workbook
@@ -18,7 +25,20 @@ from .config import (
     FORCE_MONTH_FROM_HEADER,
     MASTER_SHEET_NAMES,
 )
-from .mapping import canonicalize, MASTER_KEYS
+from . import barge_cache, delta, month_index, session
+from .control import Cancelled, RunControl
+from .month_index import MonthBlock, MonthBlockIndex
+from .mapping import canonicalize, MASTER_KEYS, SYNONYMS_RAW
+from .numparse import parse_amounts, to_float as _to_float
+from .perf import RunReport, finish_report, profiled
+from .totals import TotalsLike, TotalsMatrix
+from .xlsx_patch import PatchUnsafe, WorkbookPatcher
+from .xlsx_stream import XlsxBook, RawCell, SheetCheckpoint
+
+# log kalau job/unit tidak menghasilkan sel untuk ditulis (run_pipeline, run_batch, run_parallel)
+_NO_TOTALS_WARN = (
+    "[WARN] No totals aggregated — cek Status filter, parsing 'ActualLoaded', mapping 'FLFNominate', atau format bulan."
+)
 
 
 # ------------------------- helpers -------------------------
@@ -46,6 +66,43 @@ def month_string_to_master_key(month_cell: Any, year: int) -> str:
     return dt.strftime(MASTER_MONTH_FORMAT)
 
 
+_MONTH_LETTERS = re.compile(r"[A-Za-z]+")
+
+
+def resolve_month_keys(values: pd.Series | Iterable[Any], year: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    month_string_to_master_key untuk satu kolom (teks, datetime, angka): tiap nilai berbeda diparse
+    sekali, semua teks sekaligus lewat operasi string pandas. Return (key per baris, mask_ok);
+    baris yang tidak terbaca (kosong, tanpa nama bulan, 29 Feb ke tahun non-kabisat, ...) → False di mask.
+    Hasilnya sama dengan memanggil month_string_to_master_key per baris.
+    """
+    col = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    codes, reps = _factorize_exact(col)
+    keys = np.full(len(reps), None, dtype=object)
+    text_at: List[int] = []
+    for i, v in enumerate(reps):
+        if pd.isna(v):
+            continue
+        if isinstance(v, (datetime, pd.Timestamp)):
+            try:
+                keys[i] = month_string_to_master_key(v, year)
+            except Exception:
+                pass
+        else:
+            text_at.append(i)  # angka/teks lain: str(v) seperti versi per sel
+    if text_at:
+        try:
+            key_of = {m: datetime(year, m, 1).strftime(MASTER_MONTH_FORMAT) for m in set(MONTH_NAME_MAP.values())}
+        except ValueError:
+            key_of = {}  # tahun di luar jangkauan datetime → semua teks gagal, sama seperti per sel
+        letters = pd.Series([str(reps[i]) for i in text_at], dtype=object).str.findall(_MONTH_LETTERS)
+        month = letters.str.join("").str[:3].str.lower().map(MONTH_NAME_MAP).map(key_of)
+        hit = month.notna().to_numpy()
+        keys[np.asarray(text_at)[hit]] = month[hit].to_numpy(dtype=object)
+    ok = np.array([k is not None for k in keys], dtype=bool)
+    return keys[codes], ok[codes]
+
+
 BARGE_HEADER_ALIASES = {
     "No": ["NO", "NO."],
     "Month": ["MONTH", "MON"],
@@ -58,69 +115,133 @@ BARGE_HEADER_ALIASES = {
 REQUIRED_BARGE_KEYS = {"No", "Month", "Status", "ActualLoaded", "LoadingFacilities", "FLFNominate"}
 
 
-def _detect_barge_columns(df, hint_row: Optional[int] = None) -> Dict[str, int]:
+class _HeaderMatcher:
+    """
+    Semua alias header dalam satu regex (lookahead, jadi alias yang tumpang-tindih
+    seperti 'NO' di dalam 'FLF NOMINATE' tetap terhitung — sama dengan `a in txt`).
+    Tiap sel cukup dinormalisasi (strip/upper) dan dicocokkan sekali.
+    """
+
+    def __init__(self, aliases: Dict[str, List[str]]) -> None:
+        self.keys = list(aliases)
+        owners: Dict[str, set] = defaultdict(set)
+        for key, alist in aliases.items():
+            for a in alist:
+                owners[a].add(key)
+        # alias yang lebih panjang dulu; alias lain yang jadi prefix-nya ikut match di posisi yang sama
+        ordered = sorted(owners, key=len, reverse=True)
+        self._keys_of = {
+            a: frozenset(k for b in owners if a.startswith(b) for k in owners[b]) for a in ordered
+        }
+        self._rx = re.compile("(?=(" + "|".join(re.escape(a) for a in ordered) + "))")
+        self._order = {k: i for i, k in enumerate(self.keys)}
+
+    def keys_in(self, txt: str) -> set:
+        found: set = set()
+        for a in self._rx.findall(txt):
+            found |= self._keys_of[a]
+        return found
+
+    def _ordered_map(self, hits: Dict[str, int]) -> Dict[str, int]:
+        # urutan kunci = urutan penemuan (kolom kiri → kanan, lalu urutan alias)
+        return dict(sorted(hits.items(), key=lambda kv: (kv[1], self._order[kv[0]])))
+
+    def row_map(self, cells: Iterable[Tuple[int, Any]]) -> Dict[str, int]:
+        """cells: (col_idx, nilai) urut kolom. Return {key: kolom paling kiri yang cocok}."""
+        hits: Dict[str, int] = {}
+        for c, val in cells:
+            if val is None or (isinstance(val, float) and val != val):
+                continue
+            txt = str(val).strip().upper()
+            if not txt:
+                continue
+            for key in self.keys_in(txt):
+                if key not in hits:
+                    hits[key] = c
+        return self._ordered_map(hits)
+
+    def full_rows(self, block: pd.DataFrame, required: set) -> Dict[int, Dict[str, int]]:
+        """Versi vektor untuk DataFrame: {label_baris: map} hanya untuk baris yang memuat semua `required`."""
+        vals = block.to_numpy(dtype=object)
+        mask = pd.notna(vals)
+        rr, cc = np.nonzero(mask)
+        if not len(rr):
+            return {}
+        txt = pd.Series(vals[mask]).astype(str).str.strip().str.upper()
+        found = txt.str.findall(self._rx)
+        hits = pd.DataFrame({"r": rr, "c": cc, "a": found}).explode("a").dropna(subset=["a"])
+        if hits.empty:
+            return {}
+        hits["k"] = hits["a"].map(self._keys_of)
+        hits = hits.explode("k")
+        first = hits.groupby(["r", "k"], sort=False)["c"].min()
+        per_row = first.groupby(level="r").size()
+        labels = block.index
+        out: Dict[int, Dict[str, int]] = {}
+        for r in per_row.index[per_row.to_numpy() >= len(required)]:
+            m = {k: int(c) for k, c in first.loc[r].items()}
+            if required.issubset(m):
+                out[int(labels[r])] = self._ordered_map(m)
+        return out
+
+
+def _pick_header(
+    full_rows: Dict[int, Dict[str, int]],
+    hint_row: Optional[int],
+    rows_seen: int,
+) -> Optional[Tuple[Dict[str, int], int]] | bool:
+    """
+    Pilih header dari baris-baris yang sudah lengkap (semua REQUIRED_BARGE_KEYS).
+    Jendela dicek berurutan (lihat _header_scan_windows); baris pertama yang lengkap di jendela pertama menang.
+    Return (map, header_row) kalau sudah pasti, None kalau semua jendela habis tanpa header,
+    False kalau masih perlu baris lagi (rows_seen = jumlah baris yang sudah dilihat).
+    """
+    for r0, r1 in _header_scan_windows(hint_row, 1 << 62):
+        hit = next((r for r in sorted(full_rows) if r0 <= r < r1), None)
+        if hit is not None:
+            # baris dilihat berurutan, jadi tidak ada baris lengkap lain yang lebih awal di jendela ini
+            return dict(full_rows[hit]), hit
+        if rows_seen < r1:
+            return False
+    return None
+
+
+_HEADER_MATCHER = _HeaderMatcher(BARGE_HEADER_ALIASES)
+
+
+def _detect_barge_columns(df, hint_row: Optional[int] = None, n_rows: Optional[int] = None) -> Dict[str, int]:
     """
     Cari baris header terbaik di jendela sekitar hint_row.
     Fallback: awal sheet (0..400), lalu lebih dalam (0..1200), lalu mapping lama dari config.
     Mengembalikan map {logical_name: col_index_0_based} dan kunci tambahan '_header_row'.
+    df boleh berisi sebagian baris saja (index = nomor baris absolut 0-based);
+    n_rows = jumlah baris sheet sebenarnya (default: label terakhir + 1).
     """
-    # def _normalize_block(block: pd.DataFrame) -> pd.DataFrame:
-    #     return block.fillna("").astype(str).applymap(lambda s: s.strip().upper())
-
-    def _normalize_block(block: pd.DataFrame) -> pd.DataFrame:
-        return (
-        block
-        .fillna("")
-        .astype(str)
-        .applymap(lambda s: s.strip().upper())
-    )
+    if n_rows is None:
+        n_rows = int(df.index[-1]) + 1 if len(df) else 0
 
-    def best_map_in(range_df: pd.DataFrame) -> Tuple[Dict[str, int], int]:
-        # return (map_kolom, indeks_baris_dalam_range)
-        norm = _normalize_block(range_df)
-        best_row = -1
-        best_map: Dict[str, int] = {}
-        for r, row in norm.iterrows():
-            m: Dict[str, int] = {}
-            for c, txt in enumerate(row.tolist()):
-                if not txt:
-                    continue
-                for key, aliases in BARGE_HEADER_ALIASES.items():
-                    if key in m:
-                        continue
-                    # utamakan exact match; jika tidak ada, izinkan contains
-                    if any(txt == a or a in txt for a in aliases):
-                        m[key] = c
-            if len(m) > len(best_map):
-                best_map, best_row = m, r
-                if REQUIRED_BARGE_KEYS.issubset(best_map.keys()):
-                    break
-        return best_map, best_row
-
-    # Susun jendela scan: sekitar Start Row → awal sheet → lebih dalam
-    windows: List[Tuple[int, int]] = []
-    n = len(df)
-    if hint_row is not None:
-        windows.append((max(0, hint_row - 50), min(n, hint_row + 200)))
-    windows += [(0, min(400, n)), (0, min(1200, n))]
+    # setiap baris di gabungan jendela di-scan sekali saja
+    labels = df.index.to_numpy()
+    region = np.zeros(len(labels), dtype=bool)
+    for r0, r1 in _header_scan_windows(hint_row, n_rows):
+        region |= (labels >= r0) & (labels < r1)
+    full = _HEADER_MATCHER.full_rows(df[region], REQUIRED_BARGE_KEYS) if region.any() else {}
+    picked = _pick_header(full, hint_row, rows_seen=1 << 62)
+    if picked:
+        m, header_row = picked
+        m["_header_row"] = header_row  # info tambahan
+        return m
+    return _fallback_barge_columns(df.shape[1])
 
-    for r0, r1 in windows:
-        sub = df.iloc[r0:r1]
-        m, row_in_sub = best_map_in(sub)
-        if not m:
-            continue
-        miss = REQUIRED_BARGE_KEYS - set(m)
-        if not miss:
-            m["_header_row"] = r0 + row_in_sub  # info tambahan
-            return m
 
+def _fallback_barge_columns(width: int) -> Dict[str, int]:
     # Fallback terakhir: mapping huruf kolom lama
     from .config import BARGE_COLUMNS
     from openpyxl.utils import column_index_from_string as __col
     m2: Dict[str, int] = {}
     for name, letter in BARGE_COLUMNS.items():
         idx = __col(letter) - 1
-        if idx < df.shape[1]:
+        if idx < width:
             m2[name] = idx
     miss = REQUIRED_BARGE_KEYS - set(m2)
     if miss:
@@ -129,199 +250,524 @@ def _detect_barge_columns(df, hint_row: Optional[int] = None) -> Dict[str, int]:
     return m2
 
 
-def read_barge_rows(opts: RunOptions) -> tuple[pd.DataFrame, str | None]:
-    df = pd.read_excel(opts.barge_path, sheet_name=opts.barge_sheet, header=None, engine="openpyxl")
+def _header_scan_windows(hint_row: Optional[int], n: int) -> List[Tuple[int, int]]:
+    # Susun jendela scan: sekitar Start Row → awal sheet → lebih dalam
+    windows: List[Tuple[int, int]] = []
+    if hint_row is not None:
+        windows.append((max(0, hint_row - 50), min(n, hint_row + 200)))
+    windows += [(0, min(400, n)), (0, min(1200, n))]
+    return windows
+
+
+_TEXT_TYPES = ("s", "str", "inlineStr")
+_CHECK_EVERY = 2048  # baris antar RunControl.step() di loop streaming
+
+
+def _read_sheet_window(
+    book: XlsxBook,
+    sheet: str,
+    hint_row: int,
+    start_row0: int,
+    row_count: int,
+    control: RunControl | None = None,
+) -> tuple[pd.DataFrame, Dict[str, int], int, Dict[int, Dict[int, Any]]]:
+    """
+    Satu kali jalan streaming atas XML sheet:
+      - baris di area scan header dinilai langsung (hanya sel teks yang di-resolve),
+        header diputuskan begitu jendela scan memungkinkan,
+      - baris data yang lewat sebelum header pasti disimpan mentah (RawCell) dulu,
+      - setelah itu hanya kolom header yang disimpan untuk jendela data
+        (+ 50 baris scan header-month), lalu berhenti.
+    Return (view_terproyeksi, keep_idx, header_row, baris_scan_month).
+    """
+    control = control or RunControl()
+    windows = _header_scan_windows(hint_row, 1 << 62)
+
+    full_rows: Dict[int, Dict[str, int]] = {}
+    pending: Dict[int, List[RawCell]] = {}
+    keep_idx: Dict[str, int] | None = None
+    wanted: set = set()
+    header_row = -1
+    start0 = end0 = scan_end = 0
+    kept: Dict[int, Dict[int, Any]] = {}
+    last_nonempty = -1
+    max_col = -1
+
+    dim = book.dimension(sheet)
+    width_hint = dim[3] + 1 if dim else 0
+
+    def total_rows() -> int:
+        # progress: baris sheet menurut <dimension>, dipotong di akhir jendela kalau row_count diisi
+        n = dim[2] + 1 if dim else 0
+        if keep_idx is not None and row_count > 0:
+            n = min(n, scan_end) if n else scan_end
+        return n
+
+    def settle(picked) -> None:
+        nonlocal keep_idx, wanted, header_row, start0, end0, scan_end
+        if picked:
+            keep_idx, header_row = picked
+        else:
+            keep_idx = _fallback_barge_columns(max(width_hint, max_col + 1))
+            header_row = keep_idx.pop("_header_row", -1)
+        wanted = set(keep_idx.values())
+        start0 = start_row0
+        if header_row >= 0 and start0 <= header_row:
+            start0 = header_row + 1
+        end0 = start0 + row_count if row_count > 0 else (1 << 62)
+        scan_end = max(end0, start0 + 50)
+        # proyeksikan baris mentah yang sempat di-buffer
+        for r, cells in pending.items():
+            if start0 <= r < scan_end:
+                kept[r] = {cell[0]: book.value(cell) for cell in cells if cell[0] in wanted}
+        pending.clear()
+
+    for i, (r, cells) in enumerate(book.iter_rows(sheet)):
+        if not i % _CHECK_EVERY:
+            total = total_rows()
+            control.step("read", min(r, total) if total else r, total)
+        if keep_idx is None:
+            picked = _pick_header(full_rows, hint_row, rows_seen=r)
+            if picked is not False:
+                settle(picked)
+        nonempty = [cell for cell in cells if cell[2] is not None]
+        if keep_idx is not None and r >= scan_end:
+            # sudah lewat jendela; cukup pastikan sheet memang punya baris sesudahnya
+            if nonempty:
+                last_nonempty = r
+            if last_nonempty >= end0:
+                break
+            continue
+        if not nonempty:
+            continue
+        last_nonempty = r
+        if keep_idx is None:
+            max_col = max(max_col, nonempty[-1][0])
+            if any(r0 <= r < r1 for r0, r1 in windows):
+                m = _HEADER_MATCHER.row_map((cell[0], book.value(cell)) for cell in nonempty if cell[1] in _TEXT_TYPES)
+                if REQUIRED_BARGE_KEYS.issubset(m):
+                    full_rows[r] = m
+            if r >= start_row0:
+                pending[r] = nonempty
+        elif start0 <= r < scan_end:
+            kept[r] = {cell[0]: book.value(cell) for cell in nonempty if cell[0] in wanted}
+
+    if keep_idx is None:
+        settle(_pick_header(full_rows, hint_row, rows_seen=1 << 62))
+    assert keep_idx is not None
+
+    # baris yang benar-benar ada di sheet (pandas memotong baris kosong di ekor)
+    n_rows = last_nonempty + 1
+    stop = min(end0, n_rows)
+    index = range(start0, max(stop, start0))
+    cols = list(keep_idx.values())
+    view = pd.DataFrame(
+        [[kept.get(r, {}).get(c, np.nan) for c in cols] for r in index],
+        index=pd.RangeIndex(index.start, index.stop),
+        columns=list(keep_idx.keys()),
+        dtype=object,
+    ).infer_objects()
+    scan_rows = {r: kept[r] for r in range(start0, min(start0 + 50, n_rows)) if r in kept}
+    return view, keep_idx, header_row, scan_rows
 
-    # >>> deteksi kolom berdasarkan header (pakai hint dari Start Row)
-    keep_idx = _detect_barge_columns(df, hint_row=opts.start_row - 1)
-    header_row = keep_idx.pop("_header_row", -1)  # buang kunci helper, simpan nilainya
 
-    view = df.iloc[:, list(keep_idx.values())].copy()
-    view.columns = list(keep_idx.keys())
+def _fallback_column_set() -> set:
+    return {excel_col_to_idx(letter) - 1 for letter in BARGE_COLUMNS.values()}
 
-    # start/end slice
-    start0 = max(opts.start_row - 1, 0)
-    # kalau user start di atas header, geser ke bawah header
+
+def _parse_full_sheet(book: XlsxBook, sheet: str, control: RunControl | None = None) -> barge_cache.ParsedSheet:
+    """
+    Parse seluruh sheet sekali untuk cache: semua baris header lengkap (di posisi mana pun)
+    dan nilai kolom yang mungkin dipakai — kolom fallback dari config ditambah kolom setiap header
+    lengkap, mulai dari baris header itu (jendela data selalu sesudah header yang dipilih).
+    """
+    full_rows: Dict[int, Dict[str, int]] = {}
+    wanted = _fallback_column_set()
+    values: Dict[int, Dict[int, Any]] = defaultdict(dict)
+    last_nonempty = -1
+    max_col = -1
+    keys_of_text: Dict[str, frozenset] = {}  # teks sel berulang di baris data; cocokkan alias sekali per teks
+    control = control or RunControl()
+
+    dim = book.dimension(sheet)
+    total = dim[2] + 1 if dim else 0
+    for i, (r, cells) in enumerate(book.iter_rows(sheet)):
+        if not i % _CHECK_EVERY:
+            control.step("read", min(r, total) if total else r, total)
+        nonempty = [cell for cell in cells if cell[2] is not None]
+        if not nonempty:
+            continue
+        last_nonempty = r
+        max_col = max(max_col, nonempty[-1][0])
+        texts = [(cell[0], book.value(cell)) for cell in nonempty if cell[1] in _TEXT_TYPES]
+        found: set = set()
+        for _, v in texts:
+            if isinstance(v, str):
+                keys = keys_of_text.get(v)
+                if keys is None:
+                    keys = keys_of_text[v] = frozenset(_HEADER_MATCHER.keys_in(v.strip().upper()))
+                found |= keys
+        if REQUIRED_BARGE_KEYS.issubset(found):
+            m = _HEADER_MATCHER.row_map(texts)
+            if REQUIRED_BARGE_KEYS.issubset(m):
+                full_rows[r] = m
+                wanted |= set(m.values())
+        text_vals = dict(texts)
+        for cell in nonempty:
+            c = cell[0]
+            if c in wanted:
+                values[c][r] = text_vals[c] if c in text_vals else book.value(cell)
+
+    n_rows = last_nonempty + 1
+    columns: Dict[int, np.ndarray] = {}
+    for c in sorted(wanted):
+        col = np.full(n_rows, np.nan, dtype=object)
+        for r, v in values.get(c, {}).items():
+            col[r] = v
+        columns[c] = col
+    width = max(dim[3] + 1 if dim else 0, max_col + 1)
+    return barge_cache.ParsedSheet(columns=columns, full_rows=full_rows, n_rows=n_rows, width=width)
+
+
+def _window_from_parsed(
+    parsed: barge_cache.ParsedSheet,
+    hint_row: int,
+    start_row0: int,
+    row_count: int,
+) -> tuple[pd.DataFrame, Dict[str, int], int, Dict[int, Dict[int, Any]]]:
+    """Sama dengan _read_sheet_window, tapi dari sheet yang sudah diparse (cache)."""
+    picked = _pick_header(parsed.full_rows, hint_row, rows_seen=1 << 62)
+    if picked:
+        keep_idx, header_row = picked
+    else:
+        keep_idx = _fallback_barge_columns(parsed.width)
+        header_row = keep_idx.pop("_header_row", -1)
+    start0 = start_row0
     if header_row >= 0 and start0 <= header_row:
         start0 = header_row + 1
+    end0 = start0 + row_count if row_count > 0 else (1 << 62)
+    stop = max(min(end0, parsed.n_rows), start0)
+
+    view = pd.DataFrame(
+        {name: parsed.column(c)[start0:stop] for name, c in keep_idx.items()},
+        index=pd.RangeIndex(start0, stop),
+        columns=list(keep_idx.keys()),
+    ).infer_objects()
+    cols = set(keep_idx.values())
+    scan_rows = {
+        r: {c: parsed.column(c)[r] for c in cols}
+        for r in range(start0, min(start0 + 50, parsed.n_rows))
+    }
+    return view, keep_idx, header_row, scan_rows
 
-    end0 = start0 + opts.row_count if opts.row_count > 0 else None
 
-    # deteksi header month (scan beberapa baris ke depan)
+def read_barge_rows(
+    opts: RunOptions,
+    perf: RunReport | None = None,
+    job: int | None = None,
+    control: RunControl | None = None,
+) -> tuple[pd.DataFrame, str | None]:
+    perf = perf or RunReport(enabled=False)
+    view, _, _, header_month_key = _read_barge_window(opts, perf, job, control)
+
+    if opts.only_completed:
+        with perf.stage("filter", job) as st:
+            view = filter_completed(view)
+            st.rows = len(view)
+
+    return view, header_month_key
+
+
+def _read_barge_window(
+    opts: RunOptions, perf: RunReport, job: int | None = None, control: RunControl | None = None
+) -> tuple[pd.DataFrame, Dict[str, int], int, str | None]:
+    """Jendela baris Barge sebelum filter Status. Return (view, keep_idx, header_row, header_month_key)."""
+    control = control or RunControl()
+    window = dict(
+        hint_row=opts.start_row - 1,
+        start_row0=max(opts.start_row - 1, 0),
+        row_count=opts.row_count,
+    )
+    # deteksi header ikut di tahap ini: di jalur streaming dinilai sambil membaca baris
+    with perf.stage("read", job) as st:
+        parsed = None
+        if opts.use_cache:
+            # sheet diparse penuh sekali per versi file; run berikutnya (start row/row count/tahun lain) dari cache.
+            # Versi file yang baru pertama kali diminta: jendela saja lewat streaming, cache dibangun pada permintaan
+            # kedua (lazy) — kecuali jendela sampai akhir sheet: streaming toh membaca semua baris.
+            def build() -> barge_cache.ParsedSheet:
+                with XlsxBook(opts.barge_path) as book:
+                    return _parse_full_sheet(book, opts.barge_sheet, control)
+            lazy = opts.row_count > 0
+            # sesi yang sama: ParsedSheet langsung dari memori selama file tidak berubah (tanpa hash file/baca npz)
+            parsed = session.current().parsed_sheet(
+                opts.barge_path, opts.barge_sheet,
+                lambda: barge_cache.load_or_build(opts.barge_path, opts.barge_sheet, build, lazy=lazy),
+            )
+        if parsed is not None:
+            view, keep_idx, header_row, scan_rows = _window_from_parsed(parsed, **window)
+        else:
+            with XlsxBook(opts.barge_path) as book:
+                view, keep_idx, header_row, scan_rows = _read_sheet_window(book, opts.barge_sheet, **window, control=control)
+        st.rows = len(view)
+    control.step("read", 1, 1)
+
+    # deteksi header month (scan beberapa baris ke depan): kandidat pertama (Month, lalu No, per baris) yang terbaca
     header_month_key = None
     try:
-        for r in range(start0, min((start0 + 50), len(df))):
+        cands = []
+        for r in sorted(scan_rows):
             for key in ("Month", "No"):
                 cidx = keep_idx.get(key)
                 if cidx is None:
                     continue
-                cand = df.iat[r, cidx]
+                cand = scan_rows[r].get(cidx)
                 if cand is None or (isinstance(cand, float) and pd.isna(cand)):
                     continue
-                try:
-                    header_month_key = month_string_to_master_key(cand, opts.target_year)
-                    break
-                except Exception:
-                    continue
-            if header_month_key:
-                break
+                cands.append(cand)
+        if cands:
+            keys, ok = resolve_month_keys(cands, opts.target_year)
+            hit = np.flatnonzero(ok)
+            header_month_key = keys[hit[0]] if len(hit) else None
     except Exception:
         header_month_key = None
 
-    # slice baris yang diproses
-    view = view.iloc[start0:end0]
+    return view, keep_idx, header_row, header_month_key
 
-    # filter status (ketat)
-    if opts.only_completed and "Status" in view.columns:
-        status = view["Status"].astype(str).str.strip().str.upper()
-        view = view[status.isin({"COMPLETE", "COMPLETED"})]
 
-    return view, header_month_key
+def filter_completed(view: pd.DataFrame) -> pd.DataFrame:
+    """Filter status (ketat): hanya baris Status = Complete/Completed. Tanpa kolom Status → apa adanya."""
+    if "Status" not in view.columns:
+        return view
+    status = view["Status"].astype(str).str.strip().str.upper()
+    return view[status.isin({"COMPLETE", "COMPLETED"})]
+
+
+def _manual_month_override() -> str:
+    # override sesi (GUI/service, lihat session.py) > FORCE_MONTH_OVERRIDE di config (kalau kamu tambahkan)
+    override = session.current().month_override.strip()
+    if override:
+        return override
+    try:
+        from .config import FORCE_MONTH_OVERRIDE  # type: ignore
+        return (FORCE_MONTH_OVERRIDE or "").strip()
+    except Exception:
+        return ""
+
+
+def _row_month_keys(
+    view: pd.DataFrame,
+    target_year: int,
+    header_month_key: str | None = None,
+) -> Tuple[np.ndarray, np.ndarray] | None:
+    """
+    Bulan master per baris seperti dipakai aggregate_barge. Return (keys, mask_ok), atau None kalau
+    bulan tidak bisa ditentukan sama sekali (tidak ada kolom Month dan tidak dipaksa).
+    """
+    # prioritas bulan: manual override > header dari baris start (jika FORCE_MONTH_FROM_HEADER=True) > per-baris
+    forced_key = _manual_month_override() or (header_month_key if FORCE_MONTH_FROM_HEADER else "")
+    n = len(view)
+    if forced_key:
+        return np.full(n, forced_key, dtype=object), np.ones(n, dtype=bool)
+    if "Month" in view.columns:
+        return resolve_month_keys(view["Month"], target_year)
+    return None
 
 
 def aggregate_barge(
     view: pd.DataFrame,
     target_year: int,
-    header_month_key: str | None = None
-) -> Dict[str, Dict[str, float]]:
+    header_month_key: str | None = None,
+    start: TotalsLike | None = None,
+    control: RunControl | None = None,
+) -> TotalsMatrix:
     """
-    Kembalikan dict: { 'Aug-25': {'Apollo': total, 'Zeus': total, ... }, ... }
+    Kembalikan TotalsMatrix bulan × FLF; sebagai dict: { 'Aug-25': {'Apollo': total, 'Zeus': total, ... }, ... }
     Aturan gabungan:
       - COMPOUND_FLF_MODE == "split": bagi rata ke target valid
       - "first": hanya target pertama
       - selain itu: duplicate (nilai penuh ke semua target valid)
+    start: totals dari baris-baris SEBELUM view (mode incremental). Baris view dijumlahkan di atasnya dengan
+    urutan yang sama seperti satu run penuh, jadi hasilnya identik.
+    control: dicek di antara tahap (bulan, angka, FLF, penjumlahan) → Cancelled.
     """
+    control = control or RunControl()
+    base = TotalsMatrix.coerce(start)
+    n = len(view)
+    if n == 0:
+        return base
 
-    # --- optional manual override dari config (kalau kamu tambahkan)
-    try:
-        from .config import FORCE_MONTH_OVERRIDE  # type: ignore
-        manual_override = (FORCE_MONTH_OVERRIDE or "").strip()
-    except Exception:
-        manual_override = ""
+    months = _row_month_keys(view, target_year, header_month_key)
+    if months is None:
+        return base
+    month_keys, month_ok = months
+    control.step("aggregate", 1, 4)
 
-    # prioritas bulan: manual override > header dari baris start (jika FORCE_MONTH_FROM_HEADER=True) > per-baris
-    forced_key = manual_override or (header_month_key if FORCE_MONTH_FROM_HEADER else "")
+    if "ActualLoaded" in view.columns:
+        amounts, amount_bad = parse_amounts(view["ActualLoaded"])
+        amount_ok = ~amount_bad
+    else:
+        amounts, amount_ok = np.zeros(n, dtype=np.float64), np.ones(n, dtype=bool)
+    control.step("aggregate", 2, 4)
 
-    by_month: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    # --- FLF: canonicalize sekali per ejaan, hasilnya (kode kolom target, pembagi)
+    flf_index = {k: i for i, k in enumerate(MASTER_KEYS)}
 
-    for _, row in view.iterrows():
-        # tentukan month key
-        try:
-            if forced_key:
-                month_key = forced_key
-            else:
-                month_key = month_string_to_master_key(row.get("Month"), target_year)
-        except Exception:
-            continue
+    def _expand(raw) -> Tuple[List[int], int]:
+        targets = [t for t in canonicalize(str(raw).strip()) if t in MASTER_KEYS]
+        if COMPOUND_FLF_MODE == "split" and len(targets) > 1:
+            return [flf_index[t] for t in targets], len(targets)
+        if COMPOUND_FLF_MODE == "first" and targets:
+            return [flf_index[targets[0]]], 1
+        return [flf_index[t] for t in targets], 1
 
-        raw_flf = str(row.get("FLFNominate", "")).strip()
-        actual = row.get("ActualLoaded", 0)
+    flf_col = view["FLFNominate"] if "FLFNominate" in view.columns else pd.Series([""] * n, dtype=object)
+    codes, uniques = _factorize_exact(flf_col)
+    expanded = [_expand(u) for u in uniques]
+    n_targets = np.array([len(t) for t, _ in expanded], dtype=np.int64)[codes]
+    control.step("aggregate", 3, 4)
 
-        # parse angka
-        try:
-            val = _to_float(actual)
-        except Exception:
-            continue
+    rows = np.flatnonzero(month_ok & amount_ok & (n_targets > 0))
+    if not len(rows):
+        return base
 
-        # mapping FLF
-        targets = [t for t in canonicalize(raw_flf) if t in MASTER_KEYS]
-        if not targets:
-            continue
+    # --- explode berbobot: satu baris per (baris, target), urutan baris dipertahankan
+    flat = np.array([t for targets, _ in expanded for t in targets], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum([len(t) for t, _ in expanded])[:-1]]).astype(np.int64)
+    reps = n_targets[rows]
+    row_idx = np.repeat(rows, reps)
+    within = np.arange(len(row_idx)) - np.repeat(np.cumsum(reps) - reps, reps)
+    flf_codes = flat[offsets[codes[row_idx]] + within]
+    divisor = np.array([d for _, d in expanded], dtype=np.float64)[codes[row_idx]]
+    values = amounts[row_idx] / divisor
 
-        if COMPOUND_FLF_MODE == "split" and len(targets) > 1:
-            share = val / len(targets)
-            for t in targets:
-                by_month[month_key][t] += share
-        elif COMPOUND_FLF_MODE == "first":
-            by_month[month_key][targets[0]] += val
-        else:
-            for t in targets:
-                by_month[month_key][t] += val
+    # --- satu group-by (bulan × FLF) langsung ke matriks totals (bulan `start` dulu, lalu bulan baru);
+    #     np.add.at menjumlah berurutan seperti loop lama
+    m_codes, m_uniques = pd.factorize(month_keys[row_idx], sort=False)
+    axis = base.months + [m for m in m_uniques if m not in base]
+    pos = {m: i for i, m in enumerate(axis)}
+    m_rows = np.array([pos[m] for m in m_uniques], dtype=np.intp)[m_codes]
+    grid, present = (a.copy() for a in base._aligned(axis))
+    np.add.at(grid, (m_rows, flf_codes), values)
+    present[m_rows, flf_codes] = True
+    control.step("aggregate", 4, 4)
 
-    return by_month
+    return TotalsMatrix(axis, grid, present, MASTER_KEYS)
 
 
-def _to_float(x) -> float:
-    if isinstance(x, (int, float)):
-        return float(x)
-    s = str(x).strip().replace("\u00A0", " ")  # non-breaking space → space
-    s = s.replace(" ", "")                     # buang spasi
-    # Jika ada titik & koma: anggap titik = pemisah ribuan, koma = desimal
-    if "." in s and "," in s:
-        s = s.replace(".", "").replace(",", ".")
-    else:
-        # Hanya koma → tentukan apakah ribuan atau desimal
-        if "," in s:
-            part = s.split(",")[-1]
-            # jika 3 digit di belakang koma, ini ribuan (1,234) ⇒ hilangkan koma
-            if len(part) == 3:
-                s = s.replace(",", "")
-            else:
-                s = s.replace(",", ".")
-        # Hanya titik → biarkan (asumsikan US style 1234.56)
-    s = re.sub(r"[^0-9.]", "", s)  # sisakan digit & titik
-    return float(s) if s else 0.0
+def _factorize_exact(col: pd.Series) -> Tuple[np.ndarray, list]:
+    """
+    pd.factorize, tapi None/NaN/NaT tidak disatukan (tiap jenis NA dapat kode sendiri),
+    karena helper per-sel bisa beda hasil: _to_float(None) → 0.0, _to_float(nan) → nan.
+    """
+    codes, uniques = pd.factorize(col)
+    reps = list(uniques)
+    na = codes < 0
+    if na.any():
+        na_kinds: Dict[type, int] = {}
+        for i in np.flatnonzero(na):
+            v = col.iat[i]
+            if type(v) not in na_kinds:
+                na_kinds[type(v)] = len(reps)
+                reps.append(v)
+            codes[i] = na_kinds[type(v)]
+    return codes, reps
 
 
-def find_master_row(ws, month_key: str) -> int | None:
-    month_col = excel_col_to_idx(MASTER_COLUMNS["Month/Year"])
-    for r in range(1, ws.max_row + 1):
-        cell = ws.cell(r, month_col).value
-        if cell is None:
-            continue
-        if isinstance(cell, str):
-            if cell.strip().lower() == month_key.lower():
-                return r
-        elif isinstance(cell, datetime):
-            if cell.strftime(MASTER_MONTH_FORMAT).lower() == month_key.lower():
-                return r
+def _master_month_key(cell: Any) -> str | None:
+    if isinstance(cell, str):
+        return cell.strip().lower()
+    if isinstance(cell, datetime):
+        return cell.strftime(MASTER_MONTH_FORMAT).lower()
     return None
 
-def apply_to_master(
-    master_path,
-    sheet_name: str,
-    totals: Dict[str, Dict[str, float]],
-    dry_run: bool = False,
-    clear_before_write: bool = True,
-    clear_value: float | None = 0.0,  # ← biarin; nanti kita panggil dengan None
-) -> list:
 
+class MasterMonthIndex:
     """
-    Tulis hasil agregasi ke workbook master.
-    Jika clear_before_write=True: kosongkan semua kolom FLF di baris bulan tsb dulu,
-    lalu tulis angka baru (REPLACE).
+    Indeks {month_key_lower: [baris, ...]} untuk kolom Month/Year di satu sheet master,
+    dibangun sekali (satu kali lewat kolom) lalu dipakai untuk semua bulan.
     """
-    wb = load_workbook(master_path)
-    if sheet_name not in wb.sheetnames:
-        raise ValueError(f"Sheet {sheet_name!r} not found in master.")
 
-    ws = wb[sheet_name]
+    def __init__(self, rows: Dict[str, List[int]]) -> None:
+        self.rows = rows
+
+    @classmethod
+    def from_values(cls, cells: Iterable[Tuple[int, Any]]) -> "MasterMonthIndex":
+        """cells: (nomor_baris, nilai) dari kolom Month/Year, urut baris."""
+        rows: Dict[str, List[int]] = defaultdict(list)
+        for r, cell in cells:
+            key = _master_month_key(cell)
+            if key:
+                rows[key].append(r)
+        return cls(dict(rows))
+
+    @classmethod
+    def from_worksheet(cls, ws) -> "MasterMonthIndex":
+        month_col = excel_col_to_idx(MASTER_COLUMNS["Month/Year"])
+        col = ws.iter_rows(min_row=1, max_row=ws.max_row, min_col=month_col, max_col=month_col, values_only=True)
+        return cls.from_values((r, cell) for r, (cell,) in enumerate(col, start=1))
+
+    def find(self, month_key: str) -> int | None:
+        """Baris pertama untuk bulan ini (sama seperti scan lama), atau None."""
+        hits = self.rows.get(month_key.lower())
+        return hits[0] if hits else None
+
+    def duplicates(self) -> Dict[str, List[int]]:
+        return {k: v for k, v in self.rows.items() if len(v) > 1}
+
+
+def find_master_row(ws, month_key: str) -> int | None:
+    return MasterMonthIndex.from_worksheet(ws).find(month_key)
+
+def _as_float_or_zero(x) -> float:
+    try:
+        return float(str(x).replace(",", ""))
+    except Exception:
+        return 0.0
+
+
+def _plan_master_writes(
+    sheet_name: str,
+    totals: TotalsLike,
+    months: "MasterMonthIndex",
+    read,
+    dry_run: bool,
+    clear_before_write: bool,
+    clear_value: float | None,
+) -> Tuple[list, Dict[Tuple[int, int], float | None]]:
+    """
+    Susun log + daftar tulis {(row, col): nilai} tanpa menyentuh workbook.
+    read(r, c) mengembalikan nilai sel saat ini (semantik openpyxl).
+    """
     logs: list = []
+    writes: Dict[Tuple[int, int], float | None] = {}
 
     # indeks semua kolom FLF kecuali kolom Month/Year
     col_index = {k: excel_col_to_idx(v) for k, v in MASTER_COLUMNS.items() if k != "Month/Year"}
 
-    def _as_float_or_zero(x) -> float:
-        try:
-            return float(str(x).replace(",", ""))
-        except Exception:
-            return 0.0
+    def current(r: int, c: int):
+        return writes[(r, c)] if (r, c) in writes else read(r, c)
 
     for month_key, flf_totals in sorted(totals.items()):
-        r = find_master_row(ws, month_key)
+        r = months.find(month_key)
         if r is None:
             logs.append(f"[WARN] Month '{month_key}' not found in master sheet '{sheet_name}'. Skipped.")
             continue
+        dup = months.rows[month_key.lower()]
+        if len(dup) > 1:
+            logs.append(
+                f"[WARN] Month '{month_key}' appears in rows {', '.join(map(str, dup))} of sheet "
+                f"'{sheet_name}'. Using row {r}."
+            )
 
         # --- CLEAR row bulan ini dulu (opsional)
         if clear_before_write:
             for flf_name, c in col_index.items():
-                cell = ws.cell(r, c)
-                old_val = _as_float_or_zero(cell.value)
+                old_val = _as_float_or_zero(current(r, c))
                 new_v = None if clear_value is None else float(clear_value)  # ← ini yang bikin kosong
-                
+
                 if not dry_run:
-                    cell.value = new_v
+                    writes[(r, c)] = new_v
                 logs.append(f"[{month_key}] {flf_name}: cleared (was {fmt_money(old_val)})")
 
         # lalu tulis angka baru
@@ -330,44 +776,971 @@ def apply_to_master(
             if not c:
                 logs.append(f"[WARN] Unknown FLF column '{flf_name}' in master. Skipped.")
                 continue
-            cell = ws.cell(r, c)
-            old_val = _as_float_or_zero(cell.value)
+            old_val = _as_float_or_zero(current(r, c))
             logs.append(f"[{month_key}] {flf_name}: set to {fmt_money(new_val)} (was {fmt_money(old_val)})")
             if not dry_run:
-                cell.value = float(new_val)
+                writes[(r, c)] = float(new_val)
+
+    return logs, writes
+
+
+class MasterJob(NamedTuple):
+    """Satu set totals yang akan ditulis ke satu sheet master."""
+    sheet_name: str
+    totals: TotalsLike
+    dry_run: bool = False
+    clear_before_write: bool = True
+    clear_value: float | None = 0.0
+
+
+def _apply_jobs_with_patch(master_path, jobs: List[MasterJob], control: RunControl) -> Tuple[List[list], list]:
+    month_col = excel_col_to_idx(MASTER_COLUMNS["Month/Year"])
+    job_logs: List[list] = []
+    months_of: Dict[str, MasterMonthIndex] = {}
+    sess, before = session.current(), session.file_stamp(master_path)
+    with WorkbookPatcher(master_path) as wp:
+        for i, job in enumerate(jobs):
+            control.step("write", i, len(jobs) + 1)  # +1: simpan
+            sp = wp.sheet(job.sheet_name)
+            if job.sheet_name not in months_of:
+                months_of[job.sheet_name] = sess.master_months(
+                    master_path, job.sheet_name, lambda: MasterMonthIndex.from_values(sp.column_values(month_col))
+                )
+            logs, writes = _plan_master_writes(
+                job.sheet_name, job.totals, months_of[job.sheet_name], sp.value,
+                job.dry_run, job.clear_before_write, job.clear_value,
+            )
+            if job.dry_run:
+                logs.append("[DRY-RUN] No changes written.")
+            for (r, c), v in writes.items():
+                sp.set(r, c, v)  # PatchUnsafe → fallback openpyxl
+            job_logs.append(logs)
+        if all(job.dry_run for job in jobs):
+            return job_logs, []
+        control.step("write", len(jobs), len(jobs) + 1)
+        wp.save(check=control.check)
+    sess.master_saved(master_path, before)
+    control.step("write", len(jobs) + 1, len(jobs) + 1)
+    return job_logs, [f"[OK] Saved changes to: {master_path}"]
+
+
+def _apply_jobs_with_openpyxl(master_path, jobs: List[MasterJob], control: RunControl) -> Tuple[List[list], list]:
+    sess, before = session.current(), session.file_stamp(master_path)
+    wb = load_workbook(master_path)
+    job_logs: List[list] = []
+    months_of: Dict[str, MasterMonthIndex] = {}
+    for i, job in enumerate(jobs):
+        control.step("write", i, len(jobs) + 1)
+        if job.sheet_name not in wb.sheetnames:
+            raise ValueError(f"Sheet {job.sheet_name!r} not found in master.")
+        ws = wb[job.sheet_name]
+        if job.sheet_name not in months_of:
+            months_of[job.sheet_name] = sess.master_months(
+                master_path, job.sheet_name, lambda: MasterMonthIndex.from_worksheet(ws)
+            )
+        logs, writes = _plan_master_writes(
+            job.sheet_name, job.totals, months_of[job.sheet_name], lambda r, c: ws.cell(r, c).value,
+            job.dry_run, job.clear_before_write, job.clear_value,
+        )
+        for (r, c), v in writes.items():
+            ws.cell(r, c).value = v
+        if job.dry_run:
+            logs.append("[DRY-RUN] No changes written.")
+        job_logs.append(logs)
 
-    if not dry_run:
-        wb.save(master_path)
-        logs.append(f"[OK] Saved changes to: {master_path}")
+    if all(job.dry_run for job in jobs):
+        return job_logs, []
+    control.step("write", len(jobs), len(jobs) + 1)
+    _save_workbook_atomic(wb, master_path, control.check)
+    sess.master_saved(master_path, before)
+    control.step("write", len(jobs) + 1, len(jobs) + 1)
+    return job_logs, [f"[OK] Saved changes to: {master_path}"]
+
+
+def _save_workbook_atomic(wb, path, check) -> None:
+    """wb.save ke file sementara di folder yang sama, check(), lalu os.replace — sama seperti jalur patch."""
+    fd, tmp = tempfile.mkstemp(prefix=".~flf", suffix=".xlsx", dir=os.path.dirname(os.path.abspath(path)))
+    os.close(fd)
+    try:
+        wb.save(tmp)
+        check()
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class CellDiff(NamedTuple):
+    """Satu sel master yang akan ditulis: nilai lama → baru (None = kosong), delta = baru − lama."""
+    month: str
+    flf: str
+    cell: str       # mis. "D14"
+    old: float | None
+    new: float | None
+    delta: float
+
+    @property
+    def changed(self) -> bool:
+        return self.old != self.new
+
+
+def _read_master_months(
+    book: XlsxBook, sheet_name: str, wanted: set
+) -> Tuple[MasterMonthIndex, Dict[Tuple[int, int], Any]]:
+    """
+    Satu kali streaming sheet master (read-only): kolom Month/Year untuk indeks bulan, dan sel kolom FLF
+    hanya di baris bulan yang ada di `wanted` (key lower). Nilai sel: kosong → None; formula → nilai cache-nya.
+    """
+    if sheet_name not in book.sheetnames:
+        raise ValueError(f"Sheet {sheet_name!r} not found in master.")
+    month_c0 = excel_col_to_idx(MASTER_COLUMNS["Month/Year"]) - 1
+    flf_c0 = {excel_col_to_idx(v) - 1 for k, v in MASTER_COLUMNS.items() if k != "Month/Year"}
+    months: List[Tuple[int, Any]] = []
+    values: Dict[Tuple[int, int], Any] = {}
+    for r0, cells in book.iter_rows(sheet_name):
+        month = next((cell for cell in cells if cell[0] == month_c0), None)
+        if month is None:
+            continue
+        month_val = book.value(month)
+        months.append((r0 + 1, month_val))
+        if _master_month_key(month_val) not in wanted:
+            continue
+        for cell in cells:
+            if cell[0] in flf_c0:
+                v = book.value(cell)
+                values[(r0 + 1, cell[0] + 1)] = None if isinstance(v, float) and v != v else v
+    return MasterMonthIndex.from_values(months), values
+
+
+def diff_master(
+    master_path, jobs: List[MasterJob], control: RunControl | None = None
+) -> Tuple[List[List[CellDiff]], List[list]]:
+    """
+    Dry-run tanpa menulis apa pun: master dibuka read-only (streaming), hanya kolom bulan dan sel FLF
+    di baris bulan yang dipakai yang dibaca. Job dinilai berurutan seperti apply_jobs_to_master
+    (job belakangan melihat tulisan job sebelumnya).
+    Return (diff per job, log per job dengan format yang sama seperti run sungguhan + baris [DRY-RUN]).
+    """
+    control = control or RunControl()
+    wanted: Dict[str, set] = defaultdict(set)
+    for job in jobs:
+        wanted[job.sheet_name].update(m.lower() for m in job.totals)
+    flf_of = {excel_col_to_idx(v): k for k, v in MASTER_COLUMNS.items() if k != "Month/Year"}
+
+    read: Dict[str, Tuple[MasterMonthIndex, Dict[Tuple[int, int], Any]]] = {}
+    with XlsxBook(master_path) as book:
+        for i, name in enumerate(wanted):
+            control.step("diff", i, len(wanted))
+            read[name] = _read_master_months(book, name, wanted[name])
+    control.step("diff", len(wanted), len(wanted))
+
+    diffs: List[List[CellDiff]] = []
+    job_logs: List[list] = []
+    for job in jobs:
+        months, values = read[job.sheet_name]
+        args = (job.sheet_name, job.totals, months, lambda r, c: values.get((r, c)))
+        logs = _plan_master_writes(*args, True, job.clear_before_write, job.clear_value)[0]  # teks log dry-run lama
+        writes = _plan_master_writes(*args, False, job.clear_before_write, job.clear_value)[1]
+        row_month = {months.find(m): m for m in job.totals}
+        diff: List[CellDiff] = []
+        for (r, c), new in writes.items():
+            old_raw = values.get((r, c))
+            old = None if old_raw is None else _as_float_or_zero(old_raw)
+            diff.append(CellDiff(
+                row_month[r], flf_of[c], f"{MASTER_COLUMNS[flf_of[c]]}{r}", old, new, (new or 0.0) - (old or 0.0),
+            ))
+            values[(r, c)] = new  # job berikutnya melihat nilai ini
+        diffs.append(diff)
+        job_logs.append(logs + ["[DRY-RUN] No changes written."])
+    return diffs, job_logs
+
+
+def apply_jobs_to_master(
+    master_path, jobs: List[MasterJob], backend: str = "auto", control: RunControl | None = None
+) -> Tuple[List[list], list]:
+    """
+    Tulis beberapa job ke master dengan sekali buka & sekali simpan.
+    Job diterapkan berurutan (job belakangan melihat hasil job sebelumnya, seperti run terpisah berturut-turut);
+    tulisan per sheet master terkumpul dan tiap XML sheet di-patch sekali.
+    Return (log per job, log batch: catatan fallback + baris simpan). Master tidak disimpan kalau semua job dry-run;
+    kalau semua job dry-run, master hanya dibaca (diff_master).
+    control: pembatalan dicek per job dan sampai tepat sebelum file master diganti; Cancelled → master tidak berubah.
+    """
+    control = control or RunControl()
+    if jobs and all(job.dry_run for job in jobs):
+        return diff_master(master_path, jobs, control)[1], []
+    if backend in ("auto", "patch"):
+        try:
+            return _apply_jobs_with_patch(master_path, jobs, control)
+        except PatchUnsafe as e:
+            if backend == "patch":
+                raise
+            note = f"[INFO] In-place patch not possible ({e}); using openpyxl."
+            job_logs, batch_logs = _apply_jobs_with_openpyxl(master_path, jobs, control)
+            return job_logs, [note] + batch_logs
+    return _apply_jobs_with_openpyxl(master_path, jobs, control)
+
+
+def apply_to_master(
+    master_path,
+    sheet_name: str,
+    totals: TotalsLike,
+    dry_run: bool = False,
+    clear_before_write: bool = True,
+    clear_value: float | None = 0.0,  # ← biarin; nanti kita panggil dengan None
+    backend: str = "auto",
+    control: RunControl | None = None,
+) -> list:
+
+    """
+    Tulis hasil agregasi ke workbook master.
+    Jika clear_before_write=True: kosongkan semua kolom FLF di baris bulan tsb dulu,
+    lalu tulis angka baru (REPLACE).
+    backend: "patch" = ubah sel langsung di XML sheet (member zip lain disalin apa adanya),
+             "openpyxl" = load_workbook/save penuh, "auto" = patch, fallback openpyxl kalau tidak aman.
+    """
+    job = MasterJob(sheet_name, totals, dry_run, clear_before_write, clear_value)
+    (logs,), batch_logs = apply_jobs_to_master(master_path, [job], backend=backend, control=control)
+    # catatan fallback tetap di baris pertama, baris simpan di akhir
+    notes = [x for x in batch_logs if x.startswith("[INFO]")]
+    return notes + logs + [x for x in batch_logs if not x.startswith("[INFO]")]
+
+
+# ------------------------- mode incremental -------------------------
+def _delta_signature(opts: RunOptions) -> Dict[str, Any]:
+    """Semua yang memengaruhi totals selain isi sheet; beda sedikit saja → state lama tidak dipakai."""
+    return {
+        "path": os.path.normcase(os.path.abspath(opts.barge_path)),
+        "sheet": opts.barge_sheet,
+        "start_row": opts.start_row,
+        "row_count": opts.row_count,
+        "target_year": opts.target_year,
+        "only_completed": opts.only_completed,
+        "compound_mode": COMPOUND_FLF_MODE,
+        "force_month_from_header": FORCE_MONTH_FROM_HEADER,
+        "month_override": _manual_month_override(),
+        "mapping": barge_cache.short_hash(json.dumps([MASTER_KEYS, sorted(SYNONYMS_RAW.items())])),
+    }
+
+
+def _row_hashes(view: pd.DataFrame) -> np.ndarray:
+    """
+    Hash isi per baris (uint64). Tidak tergantung dtype hasil infer_objects: angka bulat di kolom float
+    sama dengan int di kolom object, NaN/NaT/None disamakan.
+    """
+    text: Dict[str, np.ndarray] = {}
+    for name in view.columns:
+        col = view[name]
+        if pd.api.types.is_float_dtype(col.dtype):
+            arr = col.to_numpy()
+            obj = arr.astype(object)
+            whole = np.isfinite(arr) & (np.floor(arr) == arr) & (np.abs(arr) < 2.0 ** 53)
+            obj[whole] = arr[whole].astype(np.int64).astype(object)
+        else:
+            obj = col.to_numpy(dtype=object, copy=True)  # jangan ubah view milik pemanggil
+        obj[pd.isna(obj)] = None
+        text[name] = obj.astype(str)
+    return pd.util.hash_pandas_object(pd.DataFrame(text, index=view.index), index=False).to_numpy()
+
+
+def _month_codes(view: pd.DataFrame, target_year: int, header_month_key: str | None) -> Tuple[np.ndarray, list]:
+    """Kode bulan per baris (-1 = bulan tidak terbaca) + daftar bulan, urut kemunculan."""
+    months = _row_month_keys(view, target_year, header_month_key)
+    if months is None:
+        return np.full(len(view), -1, dtype=np.int32), []
+    keys, ok = months
+    codes, uniques = pd.factorize(np.where(ok, keys, None), sort=False)
+    return codes.astype(np.int32), list(uniques)
+
+
+def _delta_append(book: XlsxBook, opts: RunOptions, state: delta.DeltaState) -> Tuple[delta.DeltaState, int] | None:
+    """
+    Jalur cepat: hanya ada baris baru di akhir sheet. Baris lama tidak dibaca sama sekali; baris baru
+    dijumlahkan di atas totals tersimpan. Return (state_baru, jumlah_baris_baru), atau None kalau tidak berlaku.
+    """
+    if state.header_row < 0:
+        return None  # header fallback tergantung lebar sheet
+    try:
+        tail = book.read_tail(opts.barge_sheet, state.checkpoint)
+    except ValueError:
+        return None
+    if tail is None:
+        return None
+    rows, cp = tail
+    nonempty = [(r, cells) for r, cells in rows if any(cell[2] is not None for cell in cells)]
+    # baris baru di area scan header / header month bisa mengubah hasil deteksi → jalur lengkap
+    limit = max(state.start0 + 50, max(r1 for _, r1 in _header_scan_windows(opts.start_row - 1, 1 << 62)))
+    if nonempty and (nonempty[0][0] < limit or nonempty[0][0] < state.stop):
+        return None
+
+    end0 = state.start0 + opts.row_count if opts.row_count > 0 else (1 << 62)
+    stop = min(end0, nonempty[-1][0] + 1) if nonempty and state.stop < end0 else state.stop
+    wanted = set(state.keep_idx.values())
+    kept = {
+        r: {cell[0]: book.value(cell) for cell in cells if cell[0] in wanted and cell[2] is not None}
+        for r, cells in nonempty if state.stop <= r < stop
+    }
+    cols = list(state.keep_idx.values())
+    view = pd.DataFrame(
+        [[kept.get(r, {}).get(c, np.nan) for c in cols] for r in range(state.stop, stop)],
+        index=pd.RangeIndex(state.stop, stop),
+        columns=list(state.keep_idx.keys()),
+        dtype=object,
+    ).infer_objects()
+    if opts.only_completed:
+        view = filter_completed(view)
+
+    totals = aggregate_barge(view, opts.target_year, state.header_month_key, start=state.totals)
+    codes, uniques = _month_codes(view, opts.target_year, state.header_month_key)
+    months = list(state.months)
+    remap: List[int] = []
+    for m in uniques:
+        if m not in months:
+            months.append(m)
+        remap.append(months.index(m))
+    remap_arr = np.array(remap + [-1], dtype=np.int32)  # kode -1 tetap -1
+    new_state = replace(
+        state,
+        checkpoint=cp,
+        stop=stop,
+        totals=totals,
+        months=months,
+        row0=np.concatenate([state.row0, view.index.to_numpy(dtype=np.int64)]),
+        row_hash=np.concatenate([state.row_hash, _row_hashes(view)]),
+        row_month=np.concatenate([state.row_month, remap_arr[codes]]),
+    )
+    return new_state, len(view)
+
+
+def _delta_full(
+    opts: RunOptions,
+    cp: SheetCheckpoint,
+    state: delta.DeltaState | None,
+    perf: RunReport,
+    control: RunControl | None = None,
+) -> Tuple[delta.DeltaState, List[str]]:
+    """
+    Jalur lengkap: baca seluruh jendela, bandingkan hash baris per bulan dengan state lama,
+    lalu hitung ulang hanya bulan yang barisnya berubah/bertambah/hilang. Return (state_baru, bulan_dihitung_ulang).
+    """
+    view, keep_idx, header_row, header_month_key = _read_barge_window(opts, perf, control=control)
+    start0, stop = view.index.start, view.index.stop  # RangeIndex jendela sebelum filter
+    if opts.only_completed:
+        with perf.stage("filter") as st:
+            view = filter_completed(view)
+            st.rows = len(view)
+    with perf.stage("aggregate") as st:
+        totals, changed, codes, months, hashes = _delta_recompute(opts, view, header_month_key, keep_idx, header_row, state)
+        st.rows, st.cells = len(view), totals.cells
+
+    new_state = delta.DeltaState(
+        signature=_delta_signature(opts),
+        checkpoint=cp,
+        keep_idx=keep_idx,
+        header_row=header_row,
+        header_month_key=header_month_key,
+        start0=start0,
+        stop=stop,
+        totals=totals,
+        months=months,
+        row0=view.index.to_numpy(dtype=np.int64),
+        row_hash=hashes,
+        row_month=codes,
+    )
+    return new_state, changed
+
+
+def _delta_recompute(
+    opts: RunOptions,
+    view: pd.DataFrame,
+    header_month_key: str | None,
+    keep_idx: Dict[str, int],
+    header_row: int,
+    state: delta.DeltaState | None,
+) -> Tuple[TotalsMatrix, List[str], np.ndarray, List[str], np.ndarray]:
+    """Totals jendela penuh; bulan yang hash barisnya sama dengan state lama diambil dari state."""
+    codes, months = _month_codes(view, opts.target_year, header_month_key)
+    hashes = _row_hashes(view)
+
+    reusable = (
+        state is not None and state.keep_idx == keep_idx and state.header_row == header_row
+        and state.header_month_key == header_month_key
+    )
+    old = state.month_hashes() if reusable else {}
+    changed = [m for i, m in enumerate(months) if m not in old or not np.array_equal(old[m], hashes[codes == i])]
+    if len(changed) == len(months) or not reusable:
+        totals = aggregate_barge(view, opts.target_year, header_month_key)
     else:
-        logs.append("[DRY-RUN] No changes written.")
-    return logs
+        sub = view[np.isin(codes, [months.index(m) for m in changed])]
+        fresh = aggregate_barge(sub, opts.target_year, header_month_key)
+        kept = state.totals.select(m for m in months if m not in changed)
+        totals = TotalsMatrix.merge([fresh, kept]).select(months)  # bulan tidak tumpang-tindih
+    return totals, changed, codes, months, hashes
+
+
+def aggregate_incremental(
+    opts: RunOptions,
+    perf: RunReport | None = None,
+    control: RunControl | None = None,
+) -> Tuple[TotalsMatrix, int, str | None, list]:
+    """
+    Mode incremental (RunOptions.incremental): state per workbook+sheet menyimpan checkpoint byte sheet,
+    hash per baris, dan totals terakhir (lihat delta.py).
+      - hanya ada baris baru di akhir → hanya baris itu yang di-parse dan dijumlahkan ke totals lama,
+      - baris lama berubah/terhapus/tersisip → seluruh jendela dibaca, tapi hanya bulan yang berubah dihitung ulang,
+      - opsi/config berbeda atau state belum ada → run penuh.
+    Totals selalu sama dengan run penuh. Return (totals, baris_diproses, header_month_key, logs).
+    """
+    perf = perf or RunReport(enabled=False)
+    logs: List[str] = []
+    state = delta.load(opts.barge_path, opts.barge_sheet)
+    if state is not None and state.signature != _delta_signature(opts):
+        logs.append("[INFO] Incremental state was built with other options; recomputing all months.")
+        state = None
+    before = os.stat(opts.barge_path)
+
+    with XlsxBook(opts.barge_path) as book:
+        appended = None
+        if state is not None:
+            with perf.stage("append") as st:  # parse baris baru + jumlahkan ke totals lama
+                appended = _delta_append(book, opts, state)
+                st.rows = appended[1] if appended else None
+        if appended is not None:
+            new_state, n_rows = appended
+            logs.append(f"[INFO] Incremental: {n_rows} new row(s) appended; earlier rows not re-read.")
+        else:
+            # checkpoint diambil SEBELUM membaca nilai; kalau file berubah di antaranya, state tidak disimpan
+            with perf.stage("checkpoint"):
+                cp = book.sheet_checkpoint(opts.barge_sheet)
+
+    if appended is None:
+        new_state, changed = _delta_full(opts, cp, state, perf, control)
+        n_rows = len(new_state.row0)
+        if state is None:
+            logs.append("[INFO] Incremental: no previous state; full run.")
+        else:
+            logs.append(f"[INFO] Incremental: rows changed; recomputed {len(changed)} month(s)"
+                        + (f": {', '.join(changed)}" if changed else "") + ".")
+
+    after = os.stat(opts.barge_path)
+    if (before.st_size, before.st_mtime_ns) == (after.st_size, after.st_mtime_ns):
+        try:
+            delta.save(opts.barge_path, opts.barge_sheet, new_state)
+        except OSError as e:
+            logs.append(f"[WARN] Incremental state not saved: {e}")
+    else:
+        logs.append("[WARN] Barge file changed while reading; incremental state not saved.")
+
+    return new_state.totals, n_rows, new_state.header_month_key, logs
+
 
+# ------------------------- indeks blok bulan -------------------------
+def _month_index_signature(barge_path: str, sheet: str, target_year: int) -> Dict[str, Any]:
+    """Yang memengaruhi header/blok bulan selain isi sheet; beda → indeks dibangun ulang."""
+    return {
+        "path": os.path.normcase(os.path.abspath(barge_path)),
+        "sheet": sheet,
+        "target_year": target_year,
+        "config": barge_cache.short_hash(json.dumps(
+            [BARGE_HEADER_ALIASES, sorted(MONTH_NAME_MAP.items()), MASTER_MONTH_FORMAT]
+        )),
+    }
 
-def run_pipeline(opts: RunOptions, progress=lambda *_: None) -> Tuple[Dict[str, Dict[str, float]], list]:
-    progress(f"Reading barge '{opts.barge_sheet}' rows {opts.start_row}..{opts.start_row + max(opts.row_count-1,0)}")
-    view, header_month_key = read_barge_rows(opts)
-    progress(f"Rows after filter: {len(view)} | header_month={header_month_key or '-'}")
 
-    totals = aggregate_barge(view, opts.target_year, header_month_key=header_month_key)
-    n_months = len(totals); n_cells = sum(len(x) for x in totals.values())
+def _month_blocks(
+    rows: np.ndarray, keys: np.ndarray, ok: np.ndarray, stop: int, blocks: Iterable[MonthBlock] = ()
+) -> List[MonthBlock]:
+    """
+    Blok bulan dari baris 0-based (urut) + bulan per baris (resolve_month_keys), melanjutkan `blocks`.
+    Blok dimulai di baris pertama yang bulannya terbaca dan berakhir tepat sebelum blok berikutnya
+    (blok terakhir: `stop`), jadi baris yang bulannya kosong/tidak terbaca ikut blok sebelumnya.
+    """
+    out = list(blocks)
+    rows, keys = rows[ok], keys[ok]
+    if len(rows):
+        starts = np.concatenate([[0], np.flatnonzero(keys[1:] != keys[:-1]) + 1])
+        for s in starts:
+            month, start0 = str(keys[s]), int(rows[s])
+            if out and out[-1].month == month:
+                continue  # lanjutan blok terakhir (baris baru di akhir sheet)
+            if out:
+                out[-1] = out[-1]._replace(stop0=start0)
+            out.append(MonthBlock(month, start0, start0))
+    if out:
+        out[-1] = out[-1]._replace(stop0=max(stop, out[-1].stop0))
+    return out
+
+
+def _month_index_full(
+    barge_path: str,
+    sheet: str,
+    target_year: int,
+    cp: SheetCheckpoint,
+    use_cache: bool,
+    perf: RunReport,
+    control: RunControl | None,
+) -> MonthBlockIndex:
+    """Bangun indeks dari seluruh sheet (lewat cache parse kalau use_cache, jadi run per bulan sesudahnya murah)."""
+    opts = RunOptions("", barge_path, sheet, target_year, start_row=1, row_count=0, use_cache=use_cache)
+    view, keep_idx, header_row, _ = _read_barge_window(opts, perf, control=control)
+    blocks: List[MonthBlock] = []
+    if "Month" in view.columns:
+        keys, ok = resolve_month_keys(view["Month"], target_year)
+        blocks = _month_blocks(view.index.to_numpy(dtype=np.int64), keys, ok, int(view.index.stop))
+    return MonthBlockIndex(
+        signature=_month_index_signature(barge_path, sheet, target_year),
+        fingerprint=[],
+        checkpoint=cp,
+        keep_idx={k: int(v) for k, v in keep_idx.items()},
+        header_row=int(header_row),
+        stop=int(view.index.stop),
+        blocks=blocks,
+    )
+
+
+def _month_index_append(
+    book: XlsxBook, sheet: str, target_year: int, index: MonthBlockIndex
+) -> MonthBlockIndex | None:
+    """Hanya ada baris baru di akhir sheet → baca baris itu saja dan perpanjang/tambah blok. None = bangun ulang."""
+    if index.header_row < 0:
+        return None  # header fallback tergantung lebar sheet
+    try:
+        tail = book.read_tail(sheet, index.checkpoint)
+    except ValueError:
+        return None
+    if tail is None:
+        return None
+    rows, cp = tail
+    nonempty = [(r, cells) for r, cells in rows if any(cell[2] is not None for cell in cells)]
+    # baris baru di area scan header bisa mengubah hasil deteksi → bangun ulang
+    limit = max(r1 for _, r1 in _header_scan_windows(0, 1 << 62))
+    if nonempty and (nonempty[0][0] < limit or nonempty[0][0] < index.stop):
+        return None
+
+    col = index.keep_idx.get("Month")
+    rows0: List[int] = []
+    values: List[Any] = []
+    for r, cells in nonempty:
+        for cell in cells:
+            if cell[0] == col and cell[2] is not None:
+                rows0.append(r)
+                values.append(book.value(cell))
+                break
+    keys, ok = resolve_month_keys(values, target_year)
+    stop = nonempty[-1][0] + 1 if nonempty else index.stop
+    return replace(
+        index,
+        checkpoint=cp,
+        stop=stop,
+        blocks=_month_blocks(np.array(rows0, dtype=np.int64), keys, ok, stop, index.blocks),
+    )
+
+
+def month_block_index(
+    barge_path: str,
+    sheet: str,
+    target_year: int,
+    use_cache: bool = True,
+    perf: RunReport | None = None,
+    control: RunControl | None = None,
+) -> Tuple[MonthBlockIndex, list]:
+    """
+    Indeks blok bulan sheet Barge (lihat month_index.py), disimpan per workbook+sheet:
+      - file tidak berubah (size/mtime) → indeks tersimpan dipakai tanpa membuka workbook,
+      - hanya ada baris baru di akhir → hanya baris itu yang dibaca (checkpoint seperti mode incremental),
+      - selain itu (baris lama berubah, tahun/config lain, belum ada) → dibangun dari seluruh sheet.
+    Return (indeks, logs).
+    """
+    perf = perf or RunReport(enabled=False)
+    logs: List[str] = []
+    index = month_index.load(barge_path, sheet)
+    if index is not None and index.signature != _month_index_signature(barge_path, sheet, target_year):
+        index = None
+    before = os.stat(barge_path)
+    stamp = [before.st_size, before.st_mtime_ns]
+    if index is not None and index.fingerprint == stamp:
+        return index, logs
+
+    with XlsxBook(barge_path) as book:
+        fresh = None
+        if index is not None:
+            with perf.stage("index") as st:
+                fresh = _month_index_append(book, sheet, target_year, index)
+                st.rows = fresh.stop - index.stop if fresh else None
+        if fresh is None:
+            # checkpoint diambil SEBELUM membaca nilai; kalau file berubah di antaranya, indeks tidak disimpan
+            cp = book.sheet_checkpoint(sheet)
+    if fresh is not None:
+        logs.append(f"[INFO] Month index: {fresh.stop - index.stop} appended row(s) indexed.")
+    else:
+        fresh = _month_index_full(barge_path, sheet, target_year, cp, use_cache, perf, control)
+        logs.append(f"[INFO] Month index built: {len(fresh.months)} month(s) in {len(fresh.blocks)} block(s).")
+    fresh = replace(fresh, fingerprint=stamp)
+
+    after = os.stat(barge_path)
+    if (before.st_size, before.st_mtime_ns) == (after.st_size, after.st_mtime_ns):
+        try:
+            month_index.save(barge_path, sheet, fresh)
+        except OSError as e:
+            logs.append(f"[WARN] Month index not saved: {e}")
+    else:
+        logs.append("[WARN] Barge file changed while reading; month index not saved.")
+    return fresh, logs
+
+
+def _month_windows(
+    opts: RunOptions, perf: RunReport, control: RunControl | None = None
+) -> Tuple[List[RunOptions], list]:
+    """
+    opts.month → satu RunOptions per blok bulan itu (start_row/row_count dari indeks, month=None);
+    tanpa month → [opts]. Bulan tidak ada di sheet → ValueError.
+    """
+    if not opts.month:
+        return [opts], []
+    index, logs = month_block_index(opts.barge_path, opts.barge_sheet, opts.target_year, opts.use_cache, perf, control)
+    blocks = index.find(opts.month)
+    if not blocks:
+        # 'August', 'aug 2025', ... → kunci master seperti kolom Month
+        keys, ok = resolve_month_keys([opts.month], opts.target_year)
+        blocks = index.find(keys[0]) if ok[0] else []
+    if not blocks:
+        raise ValueError(
+            f"Month {opts.month!r} not found in barge sheet '{opts.barge_sheet}' "
+            f"(available: {', '.join(index.months) or '-'})."
+        )
+    return [replace(opts, start_row=b.start_row, row_count=b.row_count, month=None) for b in blocks], logs
+
+
+def _window_label(opts: RunOptions) -> str:
+    if opts.month:
+        return f"month {opts.month}"
+    return f"rows {opts.start_row}..{opts.start_row + max(opts.row_count-1,0)}"
+
+
+def _aggregate_windows(
+    windows: List[RunOptions], perf: RunReport, control: RunControl | None = None, job: int | None = None
+) -> Tuple[TotalsMatrix, int, str | None]:
+    """Baca + filter + agregasi beberapa jendela ke satu totals. Return (totals, baris, header_month_key pertama)."""
+    totals: TotalsMatrix | None = None
+    n_rows, header_month_key = 0, None
+    for w in windows:
+        view, hm = read_barge_rows(w, perf, job=job, control=control)
+        with perf.stage("aggregate", job) as st:
+            totals = aggregate_barge(view, w.target_year, header_month_key=hm, start=totals, control=control)
+            st.rows, st.cells = len(view), totals.cells
+        n_rows += len(view)
+        header_month_key = header_month_key or hm
+    return totals, n_rows, header_month_key
+
+
+def _aggregate_job(
+    opts: RunOptions, windows: List[RunOptions], perf: RunReport, control: RunControl, job: int | None = None
+) -> Tuple[TotalsMatrix, int, str | None, list]:
+    """
+    Agregasi satu job (run tunggal maupun batch): lewat state incremental kalau opts.incremental dan
+    jendelanya satu blok, selain itu semua jendela dibaca. Return (totals, baris, header_month_key, catatan log).
+    """
+    if opts.incremental and len(windows) == 1:
+        return aggregate_incremental(windows[0], perf, control)
+    notes = []
+    if opts.incremental:
+        notes.append(f"[INFO] Month {opts.month} spans {len(windows)} blocks; incremental mode skipped.")
+    totals, n_rows, header_month_key = _aggregate_windows(windows, perf, control, job=job)
+    return totals, n_rows, header_month_key, notes
+
+
+def run_pipeline(
+    opts: RunOptions,
+    progress=lambda *_: None,
+    perf: RunReport | None = None,
+    control: RunControl | None = None,
+) -> Tuple[TotalsMatrix, list]:
+    """
+    Baca → filter → agregasi → tulis master untuk satu job.
+    Waktu/memori per tahap dicatat di `perf` (kirim RunReport sendiri untuk mengambil laporan terstruktur);
+    ringkasannya ditambahkan ke logs sebagai baris [PERF].
+    `control` (RunControl): progress numerik per tahap + pembatalan (Cancelled; master tidak tersentuh).
+    """
+    perf = perf or RunReport(trace_memory=opts.trace_memory)
+    control = control or RunControl()
+    with profiled(perf, opts.profile_path):
+        totals, logs = _run_pipeline(opts, progress, perf, control)
+    return totals, logs + finish_report(perf)
+
+
+def _aggregate_for(
+    opts: RunOptions, progress, perf: RunReport, control: RunControl
+) -> Tuple[TotalsMatrix, list]:
+    """Baca + filter + agregasi satu job. Return (totals, catatan log)."""
+    progress(f"Reading barge '{opts.barge_sheet}' {_window_label(opts)}")
+    windows, notes = _month_windows(opts, perf, control)
+    if opts.month:
+        for line in notes:
+            progress(line)
+        progress(f"Month {opts.month}: " + ", ".join(_window_label(w) for w in windows))
+    totals, n_rows, header_month_key, job_notes = _aggregate_job(opts, windows, perf, control)
+    for line in job_notes:
+        progress(line)
+    notes = notes + job_notes
+    counted = "Rows processed" if opts.incremental and len(windows) == 1 else "Rows after filter"
+    progress(f"{counted}: {n_rows} | header_month={header_month_key or '-'}")
+    n_months = len(totals); n_cells = totals.cells
     progress(f"Aggregated months: {n_months} | cells to write: {n_cells}")
 
     if n_cells == 0:
-        warn = "[WARN] No totals aggregated — cek Status filter, parsing 'ActualLoaded', mapping 'FLFNominate', atau format bulan."
+        warn = _NO_TOTALS_WARN
         progress(warn)
-        return totals, [warn]
-    
+        notes = notes + [warn]
+    return totals, notes
+
+
+def _master_job(opts: RunOptions, totals: TotalsMatrix, dry_run: bool) -> MasterJob:
     sheet_name = MASTER_SHEET_NAMES.get(opts.target_year, str(opts.target_year))
-    progress(f"Writing to master sheet '{sheet_name}' (dry_run={opts.dry_run}) …")
-    logs = apply_to_master(
-        opts.master_path,
-        sheet_name,
-        totals,
-        dry_run=opts.dry_run,
-        clear_before_write=opts.clear_before_write,
-        clear_value=None,  # ← KOSONGKAN sel saat clear
-    )
+    return MasterJob(sheet_name, totals, dry_run, opts.clear_before_write, None)  # None → KOSONGKAN sel saat clear
+
+
+def _run_pipeline(
+    opts: RunOptions, progress, perf: RunReport, control: RunControl
+) -> Tuple[TotalsMatrix, list]:
+    totals, notes = _aggregate_for(opts, progress, perf, control)
+    if not totals.cells:
+        return totals, notes
+    return totals, notes + _write_stage(opts, totals, progress, perf, opts.dry_run, control)
+
+
+def _write_stage(opts: RunOptions, totals, progress, perf: RunReport, dry_run: bool, control: RunControl) -> list:
+    job = _master_job(opts, totals, dry_run)
+    progress(f"Writing to master sheet '{job.sheet_name}' (dry_run={dry_run}) …")
+    with perf.stage("write") as st:
+        logs = apply_to_master(
+            opts.master_path,
+            job.sheet_name,
+            totals,
+            dry_run=dry_run,
+            clear_before_write=job.clear_before_write,
+            clear_value=job.clear_value,
+            control=control,
+        )
+        st.cells = totals.cells
+    progress("Done.")
+    return logs
+
+
+def preview_pipeline(
+    opts: RunOptions,
+    progress=lambda *_: None,
+    perf: RunReport | None = None,
+    control: RunControl | None = None,
+) -> Tuple[TotalsMatrix, List[CellDiff], list]:
+    """
+    Langkah 1 dari alur "cek dulu, baru tulis" (GUI): baca + agregasi seperti run_pipeline, lalu hitung
+    diff terhadap master secara read-only (diff_master). Master tidak disentuh.
+    Return (totals, diff per sel, logs). Tulis dengan write_totals(opts, totals) setelah dikonfirmasi.
+    """
+    perf = perf or RunReport(trace_memory=opts.trace_memory)
+    control = control or RunControl()
+    with profiled(perf, opts.profile_path):
+        totals, logs = _aggregate_for(opts, progress, perf, control)
+        diff: List[CellDiff] = []
+        if totals.cells:
+            job = _master_job(opts, totals, dry_run=True)
+            progress(f"Comparing with master sheet '{job.sheet_name}' (read-only) …")
+            with perf.stage("diff") as st:
+                (diff,), (job_logs,) = diff_master(opts.master_path, [job], control)
+                st.cells = len(diff)
+            logs = logs + job_logs
+            progress(f"Cells that would change: {sum(d.changed for d in diff)} of {len(diff)}")
+    return totals, diff, logs + finish_report(perf)
+
+
+def write_totals(
+    opts: RunOptions,
+    totals: TotalsLike,
+    progress=lambda *_: None,
+    perf: RunReport | None = None,
+    control: RunControl | None = None,
+) -> list:
+    """Langkah 2: tulis totals hasil preview_pipeline ke master (Barge tidak dibaca ulang)."""
+    perf = perf or RunReport(trace_memory=opts.trace_memory)
+    control = control or RunControl()
+    totals = TotalsMatrix.coerce(totals)
+    return _write_stage(opts, totals, progress, perf, opts.dry_run, control) + finish_report(perf)
+
+
+def run_batch(
+    jobs: List[RunOptions],
+    progress=lambda *_: None,
+    perf: RunReport | None = None,
+    control: RunControl | None = None,
+) -> Tuple[List[Tuple[TotalsMatrix, list]], list]:
+    """
+    Banyak job (sheet Barge, tahun, jendela baris) terhadap SATU master, mis. saat tutup bulan.
+    Semua job dibaca & diagregasi dulu, lalu master dibuka dan disimpan tepat sekali.
+    Job yang gagal dibaca dicatat di log-nya sendiri dan dilewati; error di master membatalkan semuanya
+    (tidak ada yang tersimpan).
+    Job dengan incremental=True dibaca lewat state incremental-nya (satu state per workbook+sheet Barge).
+    Return ([(totals, logs) per job, urutan sama dengan input], log batch).
+    Tahap per job dicatat di `perf` dengan nomor job; trace_memory/profile_path diambil dari job pertama.
+    """
+    if not jobs:
+        return [], []
+    masters = {os.path.normcase(os.path.abspath(j.master_path)) for j in jobs}
+    if len(masters) > 1:
+        raise ValueError("All batch jobs must target the same master workbook.")
+    perf = perf or RunReport(trace_memory=jobs[0].trace_memory)
+    control = control or RunControl()
+    with profiled(perf, jobs[0].profile_path):
+        results, batch_logs = _run_batch(jobs, progress, perf, control)
+    return results, batch_logs + finish_report(perf)
+
+
+def _run_batch(
+    jobs: List[RunOptions],
+    progress,
+    perf: RunReport,
+    control: RunControl,
+) -> Tuple[List[Tuple[TotalsMatrix, list]], list]:
+
+    results: List[Tuple[TotalsMatrix, list]] = []
+    pending: List[Tuple[int, MasterJob]] = []
+    for i, opts in enumerate(jobs, 1):
+        tag = f"[{i}/{len(jobs)}]"
+        progress(f"{tag} Reading barge '{opts.barge_sheet}' {_window_label(opts)}")
+        try:
+            windows, _ = _month_windows(opts, perf, control)
+            totals, n_rows, _, notes = _aggregate_job(opts, windows, perf, control, job=i)
+        except Cancelled:
+            raise
+        except Exception as e:
+            err = f"[ERROR] {opts.barge_sheet} {_window_label(opts)}: {e}"
+            progress(f"{tag} {err}")
+            results.append((TotalsMatrix.empty(), [err]))
+            continue
+        for line in notes:
+            progress(f"{tag} {line}")
+        n_cells = totals.cells
+        progress(f"{tag} Rows: {n_rows} | months: {len(totals)} | cells to write: {n_cells}")
+        if n_cells == 0:
+            results.append((totals, notes + [_NO_TOTALS_WARN]))
+            continue
+        sheet_name = MASTER_SHEET_NAMES.get(opts.target_year, str(opts.target_year))
+        results.append((totals, notes))
+        pending.append((len(results) - 1, MasterJob(sheet_name, totals, opts.dry_run, opts.clear_before_write, None)))
+
+    if not pending:
+        progress("Done (nothing to write).")
+        return results, []
+
+    sheets = sorted({job.sheet_name for _, job in pending})
+    progress(f"Writing {len(pending)} job(s) to master sheet(s) {', '.join(sheets)} …")
+    with perf.stage("write") as st:
+        job_logs, batch_logs = apply_jobs_to_master(jobs[0].master_path, [job for _, job in pending], control=control)
+        st.cells = sum(job.totals.cells for _, job in pending)
+    for (i, _), logs in zip(pending, job_logs):
+        results[i][1].extend(logs)
+
+    progress("Done.")
+    return results, batch_logs
+
+
+# ------------------------- ingest paralel -------------------------
+def _ingest_unit(opts: RunOptions) -> Tuple[TotalsMatrix, int, str | None]:
+    """
+    Worker ProcessPoolExecutor: baca + agregasi satu unit (file, sheet, jendela baris).
+    Return (totals — dua array kecil, murah di-pickle, jumlah baris, header month).
+    """
+    perf = RunReport(enabled=False)
+    windows, _ = _month_windows(opts, perf)
+    return _aggregate_windows(windows, perf)
+
+
+def merge_totals(parts: Iterable[TotalsLike]) -> TotalsMatrix:
+    """
+    Jumlahkan totals parsial (satu penjumlahan array per bagian, lihat TotalsMatrix.merge).
+    Penjumlahan mengikuti urutan `parts` (bukan urutan worker selesai), jadi hasil float selalu sama
+    untuk input yang sama.
+    """
+    return TotalsMatrix.merge(parts)
+
+
+def run_parallel(
+    units: List[RunOptions],
+    progress=lambda *_: None,
+    max_workers: int | None = None,
+    control: RunControl | None = None,
+) -> Tuple[Dict[str, TotalsMatrix], list]:
+    """
+    Ingest banyak unit (mis. laporan beberapa site, satu tab per tahun) di ProcessPoolExecutor,
+    lalu totals per sheet master dijumlahkan dan ditulis dengan sekali buka/simpan master.
+    Beda dengan run_batch: unit dengan bulan yang sama DIJUMLAHKAN, bukan saling menimpa.
+    master_path/dry_run/clear_before_write diambil dari unit pertama (semua unit harus ke master yang sama).
+    Unit yang gagal membatalkan semuanya sebelum master disentuh (total parsial tidak pernah ditulis).
+    Worker memakai config dari file (override runtime di proses ini tidak ikut).
+    control: dicek per unit selesai (unit yang sedang jalan di worker tetap diselesaikan) dan saat tulis master.
+    Return ({sheet_master: totals}, logs).
+    """
+    if not units:
+        return {}, []
+    control = control or RunControl()
+    masters = {os.path.normcase(os.path.abspath(u.master_path)) for u in units}
+    if len(masters) > 1:
+        raise ValueError("All ingestion units must target the same master workbook.")
+
+    n = len(units)
+    workers = max(1, min(max_workers or os.cpu_count() or 1, n))
+    results: List[Tuple[TotalsMatrix, int, str | None] | None] = [None] * n
+    progress(f"Ingesting {n} unit(s) with {workers} worker process(es) …")
+
+    def label(u: RunOptions) -> str:
+        return f"{os.path.basename(u.barge_path)} '{u.barge_sheet}' {_window_label(u)}"
+
+    if workers == 1:
+        for i, u in enumerate(units):
+            control.step("ingest", i, n)
+            results[i] = _ingest_unit(u)
+            progress(f"[{i + 1}/{n}] {label(u)}: {results[i][1]} rows")
+        control.step("ingest", n, n)
+    else:
+        # spawn: aman dipanggil dari proses GUI yang punya thread (fork + thread Qt bisa deadlock)
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = {pool.submit(_ingest_unit, u): i for i, u in enumerate(units)}
+            done = 0
+            try:
+                for fut in as_completed(futures):
+                    i = futures[fut]
+                    results[i] = fut.result()
+                    done += 1
+                    progress(f"[{done}/{n}] {label(units[i])}: {results[i][1]} rows")
+                    control.step("ingest", done, n)
+            except BaseException:
+                for fut in futures:
+                    fut.cancel()
+                raise
+
+    logs: list = []
+    by_sheet: Dict[str, List[TotalsMatrix]] = {}
+    for u, res in zip(units, results):
+        assert res is not None
+        totals, n_rows, header_month_key = res
+        logs.append(f"[INFO] {label(u)}: {n_rows} rows, {len(totals)} month(s), header_month={header_month_key or '-'}")
+        sheet_name = MASTER_SHEET_NAMES.get(u.target_year, str(u.target_year))
+        by_sheet.setdefault(sheet_name, []).append(totals)
+
+    merged = {sheet: merge_totals(parts) for sheet, parts in by_sheet.items()}
+    merged = {sheet: tot for sheet, tot in merged.items() if tot.cells}
+    if not merged:
+        warn = _NO_TOTALS_WARN
+        progress(warn)
+        return merged, logs + [warn]
 
+    first = units[0]
+    jobs = [MasterJob(sheet, tot, first.dry_run, first.clear_before_write, None) for sheet, tot in merged.items()]
+    progress(f"Writing merged totals to master sheet(s) {', '.join(merged)} (dry_run={first.dry_run}) …")
+    job_logs, batch_logs = apply_jobs_to_master(first.master_path, jobs, control=control)
+    for lines in job_logs:
+        logs.extend(lines)
+    logs.extend(batch_logs)
     progress("Done.")
-    return totals, logs
+    return merged, logs
@@ -1,5 +1,6 @@
 import re
-from typing import List
+from collections import OrderedDict, deque
+from typing import Dict, List, Set, Tuple
 
 MASTER_KEYS = [
     "Apollo","Zeus","Mara","August","Eagle","WHS","Bulk Java","Ratu Dewata","Labor","Green Calypso", "FC Sumber"
@@ -37,25 +38,100 @@ def normalize_token(s: str) -> str:
 
 SYNONYMS = { normalize_token(k): v for k, v in SYNONYMS_RAW.items() }
 
+class _KeyAutomaton:
+    """Aho-Corasick sederhana atas master key yang sudah dinormalisasi (A-Z)."""
+
+    def __init__(self, patterns: List[Tuple[str, int]]) -> None:
+        self.goto: List[Dict[str, int]] = [{}]
+        self.out: List[Set[int]] = [set()]
+        for pat, ident in patterns:
+            node = 0
+            for ch in pat:
+                if ch not in self.goto[node]:
+                    self.goto.append({}); self.out.append(set())
+                    self.goto[node][ch] = len(self.goto) - 1
+                node = self.goto[node][ch]
+            self.out[node].add(ident)
+        # fail link (BFS)
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] |= self.out[self.fail[nxt]]
+
+    def find(self, text: str) -> Set[int]:
+        found: Set[int] = set()
+        node = 0
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            found |= self.out[node]
+        return found
+
+
+class FlfResolver:
+    """
+    canonicalize dengan memo: hasil per string mentah disimpan di LRU terbatas,
+    fallback substring memakai satu automaton atas MASTER_KEYS yang sudah dinormalisasi.
+    """
+
+    def __init__(self, master_keys: List[str] = MASTER_KEYS, synonyms=SYNONYMS, maxsize: int = 4096) -> None:
+        self.master_keys = list(master_keys)
+        self.synonyms = synonyms
+        self.maxsize = maxsize
+        self._auto = _KeyAutomaton([(normalize_token(k), i) for i, k in enumerate(self.master_keys)])
+        self._cache: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _resolve_token(self, token: str) -> Tuple[str, ...]:
+        # via synonyms
+        if token in self.synonyms:
+            v = self.synonyms[token]
+            return tuple(v) if isinstance(v, list) else (v,)
+        # fallback: substring terhadap master keys (urutan MASTER_KEYS, tanpa duplikat)
+        uniq: List[str] = []
+        for i in sorted(self._auto.find(token)):
+            if self.master_keys[i] not in uniq:
+                uniq.append(self.master_keys[i])
+        return tuple(uniq)
+
+    def resolve(self, raw: str) -> List[str]:
+        if not raw:
+            return []
+        hit = self._cache.get(raw)
+        if hit is not None:
+            self.hits += 1
+            self._cache.move_to_end(raw)
+            return list(hit)
+        self.misses += 1
+        res = self._resolve_token(normalize_token(raw))
+        self._cache[raw] = res
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return list(res)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._cache), "maxsize": self.maxsize}
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self.hits = self.misses = 0
+
+
+_RESOLVER = FlfResolver()
+
+
+def get_resolver() -> FlfResolver:
+    return _RESOLVER
+
+
 def canonicalize(raw: str) -> List[str]:
-    if not raw:
-        return []
-    token = normalize_token(raw)
-
-    # via synonyms
-    if token in SYNONYMS:
-        v = SYNONYMS[token]
-        return v if isinstance(v, list) else [v]
-
-    # fallback: substring terhadap master keys
-    matches = []
-    for k in MASTER_KEYS:
-        if normalize_token(k) in token:
-            matches.append(k)
-
-    # buang duplikat, pertahankan urutan
-    seen, uniq = set(), []
-    for m in matches:
-        if m not in seen:
-            uniq.append(m); seen.add(m)
-    return uniq
+    return _RESOLVER.resolve(raw)
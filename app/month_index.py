@@ -0,0 +1,109 @@
+# app/month_index.py — indeks blok bulan sheet Barge: baris header + rentang baris tiap bulan per (workbook, sheet)
+from __future__ import annotations
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from . import barge_cache
+from .xlsx_stream import SheetCheckpoint
+
+INDEX_VERSION = 1
+
+
+def index_dir() -> str:
+    return os.path.join(barge_cache.cache_dir(), "months")
+
+
+def index_path(path: str, sheet: str) -> str:
+    # satu file per workbook+sheet; tahun/config dicek lewat signature, isi file lewat fingerprint/checkpoint
+    return os.path.join(index_dir(), f"{barge_cache.entry_prefix(path, sheet)}.json")
+
+
+class MonthBlock(NamedTuple):
+    """Baris berurutan satu bulan: [start0, stop0) 0-based, dari baris pertama bulan ini s.d. sebelum blok berikutnya."""
+    month: str
+    start0: int
+    stop0: int
+
+    @property
+    def start_row(self) -> int:
+        return self.start0 + 1
+
+    @property
+    def row_count(self) -> int:
+        return self.stop0 - self.start0
+
+
+@dataclass
+class MonthBlockIndex:
+    """
+    Hasil indeks satu sheet Barge:
+      - signature: tahun target + config yang memengaruhi header/bulan (beda → dibangun ulang)
+      - fingerprint: [size, mtime_ns] workbook saat indeks terakhir diperbarui (sama → dipakai tanpa membuka file)
+      - checkpoint: sidik isi <sheetData> (lihat XlsxBook.read_tail) untuk menambah baris baru saja
+      - keep_idx/header_row: hasil deteksi header (_detect_barge_columns) dari awal sheet
+      - stop: baris terakhir yang dibaca + 1 (0-based)
+      - blocks: blok bulan urut baris; satu bulan bisa punya beberapa blok kalau diselingi bulan lain
+    """
+    signature: Dict[str, Any]
+    fingerprint: List[Any]
+    checkpoint: SheetCheckpoint
+    keep_idx: Dict[str, int]
+    header_row: int
+    stop: int
+    blocks: List[MonthBlock] = field(default_factory=list)
+
+    @property
+    def months(self) -> List[str]:
+        """Bulan yang ada, urut kemunculan."""
+        return list(dict.fromkeys(b.month for b in self.blocks))
+
+    def find(self, month: str) -> List[MonthBlock]:
+        """Blok untuk bulan ini ('Aug-25', tidak peka huruf besar/kecil)."""
+        key = month.strip().lower()
+        return [b for b in self.blocks if b.month.lower() == key]
+
+
+def load(path: str, sheet: str) -> Optional[MonthBlockIndex]:
+    entry = index_path(path, sheet)
+    if not os.path.exists(entry):
+        return None
+    try:
+        with open(entry, "r", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta.get("version") != INDEX_VERSION:
+            return None
+        return MonthBlockIndex(
+            signature=meta["signature"],
+            fingerprint=meta["fingerprint"],
+            checkpoint=SheetCheckpoint(*meta["checkpoint"]),
+            keep_idx=meta["keep_idx"],
+            header_row=meta["header_row"],
+            stop=meta["stop"],
+            blocks=[MonthBlock(*b) for b in meta["blocks"]],
+        )
+    except (OSError, ValueError, KeyError, TypeError):
+        barge_cache.remove_quiet(entry)
+        return None
+
+
+def save(path: str, sheet: str, index: MonthBlockIndex) -> None:
+    """Simpan indeks; dipakai ulang selama signature dan fingerprint/checkpoint cocok."""
+    meta = {
+        "version": INDEX_VERSION,
+        "signature": index.signature,
+        "fingerprint": list(index.fingerprint),
+        "checkpoint": list(index.checkpoint),
+        "keep_idx": index.keep_idx,
+        "header_row": index.header_row,
+        "stop": index.stop,
+        "blocks": [list(b) for b in index.blocks],
+    }
+    barge_cache.atomic_write(index_path(path, sheet), lambda fh: fh.write(json.dumps(meta).encode("utf-8")))
+
+
+def reset(path: Optional[str] = None, sheet: Optional[str] = None) -> int:
+    """Hapus indeks (semua, satu workbook, atau satu sheet)."""
+    prefix = "" if path is None else barge_cache.entry_prefix(path, sheet)
+    return barge_cache.remove_entries(index_dir(), prefix, ".json")
@@ -0,0 +1,86 @@
+# app/numparse.py — parser angka ActualLoaded (per-sel & per-kolom)
+from __future__ import annotations
+import re
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def to_float(x) -> float:
+    """Versi per-sel (referensi). Aturan ribuan/desimal di bawah juga dipakai parse_amounts."""
+    if isinstance(x, (int, float)):
+        return float(x)
+    s = str(x).strip().replace("\u00A0", " ")  # non-breaking space → space
+    s = s.replace(" ", "")                     # buang spasi
+    # Jika ada titik & koma: anggap titik = pemisah ribuan, koma = desimal
+    if "." in s and "," in s:
+        s = s.replace(".", "").replace(",", ".")
+    else:
+        # Hanya koma → tentukan apakah ribuan atau desimal
+        if "," in s:
+            part = s.split(",")[-1]
+            # jika 3 digit di belakang koma, ini ribuan (1,234) ⇒ hilangkan koma
+            if len(part) == 3:
+                s = s.replace(",", "")
+            else:
+                s = s.replace(",", ".")
+        # Hanya titik → biarkan (asumsikan US style 1234.56)
+    s = re.sub(r"[^0-9.]", "", s)  # sisakan digit & titik
+    return float(s) if s else 0.0
+
+
+# bentuk yang diterima float() setelah pembersihan (hanya digit & titik)
+_FLOAT_SHAPE = r"^(?:\d+\.?\d*|\.\d+)$"
+
+
+def parse_amounts(values) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Versi kolom dari to_float. Return (float64 array, mask_gagal).
+    - kolom numerik (float/int/bool) langsung di-cast, tanpa lewat string
+    - sel int/float di kolom object juga langsung
+    - sisanya diproses sebagai string dengan aturan yang sama persis seperti to_float
+    Baris di mask_gagal bernilai NaN (di to_float baris itu raise ValueError).
+    """
+    ser = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    n = len(ser)
+    bad = np.zeros(n, dtype=bool)
+    if pd.api.types.is_numeric_dtype(ser.dtype) or pd.api.types.is_bool_dtype(ser.dtype):
+        return ser.to_numpy(dtype=np.float64, na_value=np.nan), bad
+
+    arr = ser.to_numpy(dtype=object)
+    out = np.full(n, np.nan, dtype=np.float64)
+    native = np.fromiter((isinstance(v, (int, float)) for v in arr), dtype=bool, count=n)
+    if native.any():
+        out[native] = [float(v) for v in arr[native]]
+    rest = np.flatnonzero(~native)
+    if not len(rest):
+        return out, bad
+
+    s = pd.Series([str(v) for v in arr[rest]], dtype=object)
+    s = s.str.strip().str.replace("\u00A0", " ", regex=False).str.replace(" ", "", regex=False)
+    has_dot = s.str.contains(".", regex=False)
+    has_comma = s.str.contains(",", regex=False)
+
+    both = has_dot & has_comma
+    s[both] = s[both].str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+
+    only_comma = has_comma & ~has_dot
+    if only_comma.any():
+        sub = s[only_comma]
+        tail_len = sub.str.len() - sub.str.rfind(",") - 1
+        thousands = tail_len == 3
+        s[only_comma & thousands.reindex(s.index, fill_value=False)] = sub[thousands].str.replace(",", "", regex=False)
+        s[only_comma & ~thousands.reindex(s.index, fill_value=True)] = sub[~thousands].str.replace(",", ".", regex=False)
+
+    s = s.str.replace(r"[^0-9.]", "", regex=True)
+    empty = (s == "").to_numpy()
+    shaped = s.str.match(_FLOAT_SHAPE).to_numpy()
+
+    vals = np.full(len(s), np.nan, dtype=np.float64)
+    vals[empty] = 0.0
+    vals[shaped] = s[shaped].to_numpy(dtype=str).astype(np.float64)
+    out[rest] = vals
+    bad[rest] = ~(empty | shaped)
+    return out, bad
+
@@ -0,0 +1,186 @@
+# app/perf.py — instrumentasi per tahap pipeline: waktu wall/CPU, memori puncak, jumlah baris/sel
+from __future__ import annotations
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+_MB = 1024 * 1024
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """High-water mark RSS proses (bukan per tahap — naik terus). None kalau tidak tersedia."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return _peak_rss_windows()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux: KiB, macOS: byte
+
+
+def _peak_rss_windows() -> Optional[int]:
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class _Counters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        kernel32, psapi = ctypes.windll.kernel32, ctypes.windll.psapi
+        kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(_Counters), wintypes.DWORD]
+        counters = _Counters()
+        counters.cb = ctypes.sizeof(_Counters)
+        if not psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return None
+        return int(counters.PeakWorkingSetSize)
+    except Exception:
+        return None
+
+
+@dataclass
+class StageRecord:
+    stage: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0                     # CPU thread ini saja (pipeline jalan di satu thread)
+    peak_rss_mb: Optional[float] = None    # high-water mark proses di akhir tahap
+    peak_alloc_mb: Optional[float] = None  # puncak alokasi selama tahap (hanya kalau trace_memory)
+    rows: Optional[int] = None
+    cells: Optional[int] = None
+    job: Optional[int] = None              # nomor job (run_batch), 1-based
+
+
+class RunReport:
+    """
+    Kumpulan StageRecord untuk satu run. Pakai:
+        perf = RunReport()
+        with perf.stage("read") as st:
+            ...
+            st.rows = len(view)
+    enabled=False → stage() tidak mengukur apa pun (dipakai sebagai default di fungsi level bawah).
+    trace_memory=True → tracemalloc aktif selama run (puncak alokasi per tahap; pipeline jadi lebih lambat).
+    """
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = False) -> None:
+        self.enabled = enabled
+        self.stages: List[StageRecord] = []
+        self.profile_path: Optional[str] = None
+        self._started_tracing = False
+        if enabled and trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    @contextmanager
+    def stage(self, name: str, job: Optional[int] = None) -> Iterator[StageRecord]:
+        rec = StageRecord(name, job=job)
+        if not self.enabled:
+            yield rec
+            return
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield rec
+        finally:
+            rec.wall_s = round(time.perf_counter() - wall, 6)
+            rec.cpu_s = round(time.thread_time() - cpu, 6)
+            if tracing:
+                rec.peak_alloc_mb = round(tracemalloc.get_traced_memory()[1] / _MB, 2)
+            rss = peak_rss_bytes()
+            rec.peak_rss_mb = round(rss / _MB, 1) if rss else None
+            self.stages.append(rec)
+
+    def close(self) -> None:
+        """Hentikan tracemalloc kalau RunReport ini yang menyalakannya."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        rss = [s.peak_rss_mb for s in self.stages if s.peak_rss_mb is not None]
+        return {
+            "stages": [asdict(s) for s in self.stages],
+            "total": {
+                "wall_s": round(sum(s.wall_s for s in self.stages), 6),
+                "cpu_s": round(sum(s.cpu_s for s in self.stages), 6),
+                "peak_rss_mb": max(rss) if rss else None,
+            },
+            "profile": self.profile_path,
+        }
+
+    def lines(self) -> List[str]:
+        """Ringkasan satu baris per tahap, untuk log GUI / CLI."""
+        out: List[str] = []
+        for s in self.stages:
+            parts = [f"{s.wall_s:.3f}s (cpu {s.cpu_s:.3f}s)"]
+            if s.rows is not None:
+                parts.append(f"rows {s.rows:,}")
+            if s.cells is not None:
+                parts.append(f"cells {s.cells:,}")
+            if s.peak_alloc_mb is not None:
+                parts.append(f"alloc peak {s.peak_alloc_mb:,.1f} MB")
+            if s.peak_rss_mb is not None:
+                parts.append(f"RSS peak {s.peak_rss_mb:,.1f} MB")
+            tag = f"{s.stage}#{s.job}" if s.job is not None else s.stage
+            out.append(f"[PERF] {tag}: " + " | ".join(parts))
+        if self.stages:
+            total = self.to_dict()["total"]
+            out.append(f"[PERF] total: {total['wall_s']:.3f}s (cpu {total['cpu_s']:.3f}s)")
+        if self.profile_path:
+            out.append(f"[PERF] cProfile stats saved to: {self.profile_path}")
+        return out
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+@contextmanager
+def profiled(report: RunReport, path: Optional[str]) -> Iterator[None]:
+    """cProfile untuk satu run (opt-in). Stats disimpan ke `path` (buka dengan pstats / snakeviz)."""
+    if not path:
+        yield
+        return
+    prof = cProfile.Profile()
+    try:
+        prof.enable()
+    except ValueError:  # profiler lain sedang aktif
+        yield
+        return
+    try:
+        yield
+    finally:
+        prof.disable()
+        prof.dump_stats(path)
+        report.profile_path = path
+
+
+def finish_report(report: RunReport) -> List[str]:
+    """Tutup report; simpan JSON kalau FLF_PERF_REPORT berisi path file. Return baris [PERF] untuk log."""
+    report.close()
+    lines = report.lines()
+    path = os.environ.get("FLF_PERF_REPORT")
+    if path and report.stages:
+        try:
+            report.dump(path)
+            lines.append(f"[PERF] Report saved to: {path}")
+        except OSError as e:
+            lines.append(f"[WARN] Skip perf report: {e}")
+    return lines
@@ -67,15 +67,97 @@ class DataConfirmDialog(QtWidgets.QDialog):
         # (styles kamu boleh tetap seperti semula)
         # self.setStyleSheet(""" ... """)
 
-def confirm_summary(parent: QtWidgets.QWidget, text: str,
-                    icon_path: str = ":/img/logo-side.jpg") -> bool:
+class DiffConfirmDialog(QtWidgets.QDialog):
+    """Tabel sel master yang akan berubah (hasil dry-run diff) sebelum benar-benar ditulis."""
+
+    HEADERS = ("Month", "FLF", "Cell", "Old", "New", "Delta")
+
+    def __init__(self, parent=None, diff=(), window_icon_path: str = ":/img/logo-side.jpg"):
+        super().__init__(parent)
+        self.setObjectName("ConfirmDialog")
+        self.setWindowIcon(QtGui.QIcon(window_icon_path))
+        self.setWindowFlag(QtCore.Qt.WindowContextHelpButtonHint, False)
+        self.setWindowFlag(QtCore.Qt.WindowMinimizeButtonHint, True)
+        self.setWindowFlag(QtCore.Qt.WindowSystemMenuHint, True)
+        self.resize(640, 480)
+        self.setMinimumSize(QtCore.QSize(480, 400))
+        self.setWindowTitle("Preview Changes")
+        self.setModal(True)
+
+        changed = [d for d in diff if d.changed]
+        v = QtWidgets.QVBoxLayout(self)
+        v.setContentsMargins(20, 20, 20, 14)
+
+        self.label = QtWidgets.QLabel(self)
+        self.label.setObjectName("titleLabel")
+        same = len(diff) - len(changed)
+        self.label.setText(
+            f"{len(changed)} cell(s) will change in the master"
+            + (f" ({same} unchanged)" if same else "") + ". Write now?"
+        )
+        v.addWidget(self.label)
+
+        self.table = QtWidgets.QTableWidget(len(changed), len(self.HEADERS), self)
+        self.table.setObjectName("diffTable")
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        right = QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter
+        for i, d in enumerate(changed):
+            cells = (d.month, d.flf, d.cell, _fmt(d.old), _fmt(d.new), _fmt(d.delta, signed=True))
+            for j, text in enumerate(cells):
+                item = QtWidgets.QTableWidgetItem(text)
+                if j >= 3:
+                    item.setTextAlignment(right)
+                self.table.setItem(i, j, item)
+        self.table.resizeColumnsToContents()
+        self.table.horizontalHeader().setStretchLastSection(True)
+        v.addWidget(self.table, 1)
+
+        buttons = QtWidgets.QHBoxLayout()
+        buttons.addStretch(1)
+        self.btn_cancel = QtWidgets.QPushButton("Cancel", self)
+        self.btn_cancel.setObjectName("btn_cancel")
+        self.btn_cancel.setFixedSize(120, 36)
+        self.btn_cancel.clicked.connect(self.reject)
+        self.btn_ok = QtWidgets.QPushButton("Write", self)
+        self.btn_ok.setObjectName("btn_ok")
+        self.btn_ok.setFixedSize(120, 36)
+        self.btn_ok.clicked.connect(self.accept)
+        self.btn_ok.setDefault(True)
+        buttons.addWidget(self.btn_cancel)
+        buttons.addWidget(self.btn_ok)
+        buttons.addStretch(1)
+        v.addLayout(buttons)
+
+
+def _fmt(val, signed: bool = False) -> str:
+    if val is None:
+        return ""
+    if val != val:  # NaN
+        return "NaN"
+    return f"{val:+,.0f}" if signed else f"{val:,.0f}"
+
+
+def _exec_with_normal_font(make_dialog) -> bool:
+    # dialog dibuat SESUDAH font diganti, supaya widget-nya ikut font normal
     app = QtWidgets.QApplication.instance()
     old_font = app.font()
     normal = QtGui.QFont(old_font); normal.setBold(False); normal.setPointSize(10)
     app.setFont(normal)
     try:
-        dlg = DataConfirmDialog(parent=parent, text=text, window_icon_path=icon_path)
-        return dlg.exec_() == QtWidgets.QDialog.Accepted
+        return make_dialog().exec_() == QtWidgets.QDialog.Accepted
     finally:
         app.setFont(old_font)
 
+
+def confirm_summary(parent: QtWidgets.QWidget, text: str,
+                    icon_path: str = ":/img/logo-side.jpg") -> bool:
+    return _exec_with_normal_font(lambda: DataConfirmDialog(parent=parent, text=text, window_icon_path=icon_path))
+
+
+def confirm_diff(parent: QtWidgets.QWidget, diff, icon_path: str = ":/img/logo-side.jpg") -> bool:
+    """diff: list CellDiff dari main_logic.preview_pipeline. True = user setuju menulis."""
+    return _exec_with_normal_font(lambda: DiffConfirmDialog(parent=parent, diff=diff, window_icon_path=icon_path))
+
@@ -0,0 +1,160 @@
+# app/session.py — state runtime satu sesi (GUI / --watch): override volatile + cache hangat di memori (tanpa import berat)
+from __future__ import annotations
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+Stamp = Optional[Tuple[int, int]]  # (size, mtime_ns) file; None kalau tidak bisa di-stat
+
+
+def _key(path: str, sheet: str) -> Tuple[str, str]:
+    return os.path.normcase(os.path.abspath(path)), sheet
+
+
+def file_stamp(path: str) -> Stamp:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class _VersionedLru:
+    """{(path, sheet): (stamp, nilai)} dengan batas jumlah entri; entri dengan stamp lain dianggap basi."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[Tuple[str, str], Tuple[Stamp, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str], stamp: Stamp) -> Any:
+        hit = self.entries.get(key)
+        if hit is None or stamp is None or hit[0] != stamp:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return hit[1]
+
+    def put(self, key: Tuple[str, str], stamp: Stamp, value: Any) -> None:
+        if stamp is None or self.maxsize <= 0:
+            return
+        self.entries[key] = (stamp, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def evict(self, path: Optional[str] = None) -> int:
+        if path is None:
+            n = len(self.entries)
+            self.entries.clear()
+            return n
+        norm = os.path.normcase(os.path.abspath(path))
+        gone = [k for k in self.entries if k[0] == norm]
+        for k in gone:
+            del self.entries[k]
+        return len(gone)
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "maxsize": self.maxsize}
+
+
+class Session:
+    """
+    Pengganti importlib.reload antar-run. Menyimpan:
+      - override volatile: month_override (mengalahkan config.FORCE_MONTH_OVERRIDE; "" = tidak ada);
+      - sheet Barge yang sudah diparse (ParsedSheet) per workbook+sheet, valid selama size/mtime file sama —
+        run berikutnya tidak menghitung hash file dan tidak membaca npz cache disk lagi;
+      - indeks bulan sheet master (MasterMonthIndex), ikut diperbarui saat pipeline sendiri menyimpan master;
+      - FLF resolver (mapping.get_resolver(), memo canonicalize).
+    Cache dibatasi jumlah entri (LRU) dan selalu dicek terhadap versi file, jadi aman dipakai lintas run;
+    reset() membersihkan override (dan cache kalau diminta), evict() membuang cache satu file atau semua.
+    Aman dipakai dari beberapa thread (Worker GUI, indeks bulan di background).
+    """
+
+    def __init__(self, max_sheets: int = 2, max_masters: int = 8) -> None:
+        self.month_override = ""
+        self._lock = threading.RLock()
+        self._sheets = _VersionedLru(max_sheets)
+        self._masters = _VersionedLru(max_masters)
+
+    # ----- sheet Barge -----
+    def parsed_sheet(self, path: str, sheet: str, build: Callable[[], Any]) -> Any:
+        """
+        ParsedSheet dari memori kalau file belum berubah; kalau tidak, build() (mis. barge_cache.load_or_build).
+        build() boleh return None (cache lazy belum dibangun) — tidak disimpan.
+        """
+        key, stamp = _key(path, sheet), file_stamp(path)
+        with self._lock:
+            hit = self._sheets.get(key, stamp)
+        if hit is not None:
+            return hit
+        value = build()  # di luar lock: parse bisa lama dan bisa Cancelled (tidak ada yang disimpan)
+        if value is not None and file_stamp(path) == stamp:  # file berubah selama dibaca → jangan simpan
+            with self._lock:
+                self._sheets.put(key, stamp, value)
+        return value
+
+    # ----- master -----
+    def master_months(self, path: str, sheet: str, build: Callable[[], Any]) -> Any:
+        """MasterMonthIndex dari memori kalau file master belum berubah; kalau tidak, build()."""
+        key, stamp = _key(path, sheet), file_stamp(path)
+        with self._lock:
+            hit = self._masters.get(key, stamp)
+        if hit is not None:
+            return hit
+        value = build()
+        with self._lock:
+            self._masters.put(key, stamp, value)
+        return value
+
+    def master_saved(self, path: str, before: Stamp) -> None:
+        """
+        Pipeline menyimpan master yang tadi dibaca pada versi `before`. Kolom Month/Year tidak ditulis,
+        jadi indeks versi itu tetap benar untuk file baru.
+        """
+        norm, after = os.path.normcase(os.path.abspath(path)), file_stamp(path)
+        with self._lock:
+            for key, (stamp, value) in list(self._masters.entries.items()):
+                if key[0] == norm and stamp == before:
+                    self._masters.put(key, after, value)
+
+    # ----- mapping -----
+    @property
+    def resolver(self):
+        from .mapping import get_resolver
+        return get_resolver()
+
+    # ----- reset / eviction -----
+    def evict(self, path: Optional[str] = None) -> int:
+        """Buang cache memori satu workbook (Barge atau master) atau semua. Return jumlah entri."""
+        with self._lock:
+            n = self._sheets.evict(path) + self._masters.evict(path)
+            if path is None:
+                self.resolver.clear()
+            return n
+
+    def reset(self, caches: bool = False) -> None:
+        """Bersihkan override volatile; caches=True juga membuang semua cache memori (mulai dingin)."""
+        with self._lock:
+            self.month_override = ""
+            if caches:
+                self.evict()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                "sheets": self._sheets.stats(),
+                "masters": self._masters.stats(),
+                "resolver": self.resolver.stats(),
+            }
+
+
+_SESSION = Session()
+
+
+def current() -> Session:
+    """Session proses ini (satu per proses; worker ProcessPool punya session sendiri)."""
+    return _SESSION
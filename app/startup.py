@@ -0,0 +1,98 @@
+# app/startup.py — ukur waktu startup GUI + prewarm import berat di background (tanpa import Qt)
+from __future__ import annotations
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Modul yang tidak dibutuhkan untuk menampilkan jendela; di-import setelah paint pertama
+HEAVY_MODULES = ("numpy", "pandas", "openpyxl", "app.main_logic")
+
+
+class StartupTimer:
+    """
+    Catat titik-titik waktu startup relatif ke t0 (panggil sedini mungkin di run.py).
+    Aman dipanggil dari thread lain (prewarm).
+    """
+
+    def __init__(self, t0: Optional[float] = None) -> None:
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self._marks: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def mark(self, name: str) -> float:
+        elapsed = time.perf_counter() - self.t0
+        with self._lock:
+            self._marks.append((name, elapsed))
+        return elapsed
+
+    def marks(self) -> List[Tuple[str, float]]:
+        with self._lock:
+            return list(self._marks)
+
+    def breakdown(self) -> List[Dict[str, float | str]]:
+        """[{stage, at_ms, took_ms}] — took_ms = selisih dengan titik sebelumnya di thread yang sama."""
+        out: List[Dict[str, float | str]] = []
+        prev = 0.0
+        prev_bg = None
+        for name, at in self.marks():
+            if name.startswith("prewarm"):
+                # prewarm jalan paralel; ukur dari titik mulainya sendiri
+                base = prev_bg if prev_bg is not None else at
+                prev_bg = at
+                took = at - base
+            else:
+                took = at - prev
+                prev = at
+            out.append({"stage": name, "at_ms": round(at * 1000, 1), "took_ms": round(took * 1000, 1)})
+        return out
+
+    def report(self) -> str:
+        parts = [f"{row['stage']} {row['took_ms']:.0f}ms" for row in self.breakdown()]
+        return "Startup: " + " | ".join(parts)
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"breakdown": self.breakdown()}, f, indent=2)
+
+
+def prewarm(
+    timer: Optional[StartupTimer] = None,
+    modules: Tuple[str, ...] = HEAVY_MODULES,
+    on_done: Optional[Callable[[], None]] = None,
+) -> threading.Thread:
+    """
+    Import modul berat di thread daemon supaya Submit/Start tidak menunggu.
+    Error diabaikan di sini — import yang sebenarnya nanti akan melaporkan error yang sama.
+    """
+
+    def work() -> None:
+        if timer:
+            timer.mark("prewarm start")
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except Exception:
+                break
+        if timer:
+            timer.mark("prewarm done")
+        if on_done:
+            on_done()
+
+    th = threading.Thread(target=work, name="flf-prewarm", daemon=True)
+    th.start()
+    return th
+
+
+def report_startup(timer: StartupTimer) -> None:
+    """Cetak ringkasan startup; simpan JSON kalau FLF_STARTUP_REPORT berisi path file."""
+    print(timer.report(), file=sys.stderr if sys.stderr else sys.stdout)
+    path = os.environ.get("FLF_STARTUP_REPORT")
+    if path:
+        try:
+            timer.dump(path)
+        except OSError as e:
+            print("Skip startup report:", e)
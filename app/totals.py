@@ -0,0 +1,218 @@
+# app/totals.py — totals bulan × FLF sebagai satu matriks float64 (pengganti dict bersarang)
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import mapping
+from .config import MASTER_COLUMNS
+
+TotalsLike = Union["TotalsMatrix", Mapping[str, Mapping[str, float]]]
+
+
+def flf_axis() -> Tuple[str, ...]:
+    """Sumbu FLF default = MASTER_KEYS saat ini (dibaca saat dipanggil, ikut reload mapping)."""
+    return tuple(mapping.MASTER_KEYS)
+
+
+class TotalsMatrix(Mapping[str, Mapping[str, float]]):
+    """
+    Hasil agregasi: values[i, j] = total bulan months[i] untuk FLF flf[j].
+      - flf: sumbu tetap (MASTER_KEYS), jadi kolom sama untuk semua run/worker;
+      - months: urut kemunculan (sama seperti urutan dict lama);
+      - present[i, j]: sel itu punya baris. Sel tanpa baris tidak ditulis ke master (beda dengan total 0.0);
+        values di sel itu selalu 0.0.
+    Sebagai Mapping perilakunya sama dengan {bulan: {FLF: nilai}} lama (hanya sel present, FLF urut sumbu),
+    jadi pemanggil lama (totals[m][flf], .items(), len) tetap jalan. Objek tidak diubah di tempat;
+    merge/scale/diff mengembalikan matriks baru.
+    """
+
+    __slots__ = ("months", "flf", "values", "present", "_row_of", "_col_of")
+
+    def __init__(
+        self,
+        months: Sequence[str],
+        values: np.ndarray,
+        present: np.ndarray,
+        flf: Optional[Sequence[str]] = None,
+    ) -> None:
+        self.months: List[str] = list(months)
+        self.flf: Tuple[str, ...] = tuple(flf) if flf is not None else flf_axis()
+        shape = (len(self.months), len(self.flf))
+        self.values = np.asarray(values, dtype=np.float64).reshape(shape)
+        self.present = np.asarray(present, dtype=bool).reshape(shape)
+        self._row_of = {m: i for i, m in enumerate(self.months)}
+        self._col_of = {k: j for j, k in enumerate(self.flf)}
+        if len(self._row_of) != len(self.months):
+            raise ValueError("Duplicate month in totals axis.")
+
+    # ----- pembuatan -----
+    @classmethod
+    def empty(cls, flf: Optional[Sequence[str]] = None) -> "TotalsMatrix":
+        axis = tuple(flf) if flf is not None else flf_axis()
+        return cls([], np.zeros((0, len(axis))), np.zeros((0, len(axis)), dtype=bool), axis)
+
+    @classmethod
+    def from_dict(cls, totals: Mapping[str, Mapping[str, float]], flf: Optional[Sequence[str]] = None) -> "TotalsMatrix":
+        """Dari {bulan: {FLF: nilai}}. FLF di luar sumbu → ValueError."""
+        axis = tuple(flf) if flf is not None else flf_axis()
+        col_of = {k: j for j, k in enumerate(axis)}
+        months = list(totals)
+        values = np.zeros((len(months), len(axis)), dtype=np.float64)
+        present = np.zeros(values.shape, dtype=bool)
+        for i, m in enumerate(months):
+            for name, val in totals[m].items():
+                j = col_of.get(name)
+                if j is None:
+                    raise ValueError(f"Unknown FLF {name!r} (not in MASTER_KEYS).")
+                values[i, j] = val
+                present[i, j] = True
+        return cls(months, values, present, axis)
+
+    @classmethod
+    def coerce(cls, totals: Optional[TotalsLike]) -> "TotalsMatrix":
+        """TotalsMatrix apa adanya; dict lama/None dikonversi."""
+        if isinstance(totals, TotalsMatrix):
+            return totals
+        return cls.empty() if totals is None else cls.from_dict(totals)
+
+    # ----- Mapping (tampilan dict lama) -----
+    def __getitem__(self, month: str) -> "_MonthView":
+        return _MonthView(self, self._row_of[month])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.months)
+
+    def __len__(self) -> int:
+        return len(self.months)
+
+    def __contains__(self, month: object) -> bool:
+        return month in self._row_of
+
+    def __repr__(self) -> str:
+        return f"TotalsMatrix({len(self.months)} month(s) x {len(self.flf)} FLF, {self.cells} cell(s))"
+
+    def __reduce__(self):
+        return (type(self), (self.months, self.values, self.present, self.flf))
+
+    @property
+    def cells(self) -> int:
+        """Jumlah sel yang akan ditulis (sel present)."""
+        return int(self.present.sum())
+
+    @property
+    def master_columns(self) -> List[Optional[str]]:
+        """Huruf kolom master per FLF di sumbu (None kalau FLF tidak punya kolom di MASTER_COLUMNS)."""
+        return [MASTER_COLUMNS.get(k) for k in self.flf]
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """{bulan: {FLF: nilai}} biasa (mis. untuk JSON)."""
+        return {m: dict(self[m]) for m in self.months}
+
+    # ----- operasi vektor -----
+    def _aligned(self, months: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """values/present dipetakan ke sumbu bulan `months` (superset dari self.months)."""
+        if list(months) == self.months:
+            return self.values, self.present
+        idx = {m: i for i, m in enumerate(months)}
+        rows = np.array([idx[m] for m in self.months], dtype=np.intp)
+        values = np.zeros((len(months), len(self.flf)), dtype=np.float64)
+        present = np.zeros(values.shape, dtype=bool)
+        values[rows] = self.values
+        present[rows] = self.present
+        return values, present
+
+    @classmethod
+    def merge(cls, parts: Iterable[TotalsLike]) -> "TotalsMatrix":
+        """
+        Jumlahkan totals parsial (run/worker): satu penjumlahan array per bagian, berurutan sesuai `parts`
+        (bukan urutan worker selesai), jadi hasil float selalu sama untuk input yang sama.
+        Bulan: gabungan, urut kemunculan.
+        """
+        mats = [cls.coerce(p) for p in parts]
+        if not mats:
+            return cls.empty()
+        axis = mats[0].flf
+        if any(m.flf != axis for m in mats):
+            raise ValueError("Cannot merge totals with different FLF axes.")
+        months: List[str] = []
+        seen: set = set()
+        for mat in mats:
+            for m in mat.months:
+                if m not in seen:
+                    seen.add(m)
+                    months.append(m)
+        values = np.zeros((len(months), len(axis)), dtype=np.float64)
+        present = np.zeros(values.shape, dtype=bool)
+        for mat in mats:
+            v, p = mat._aligned(months)
+            values += v
+            present |= p
+        return cls(months, values, present, axis)
+
+    def __add__(self, other: TotalsLike) -> "TotalsMatrix":
+        return TotalsMatrix.merge([self, other])
+
+    def scale(self, factor: Union[float, Sequence[float], np.ndarray]) -> "TotalsMatrix":
+        """Kalikan semua sel (skalar) atau per FLF (array sepanjang sumbu flf). Sel kosong tetap kosong."""
+        scaled = np.where(self.present, self.values * np.asarray(factor, dtype=np.float64), 0.0)
+        return TotalsMatrix(self.months, scaled, self.present.copy(), self.flf)
+
+    def diff(self, other: TotalsLike) -> "TotalsMatrix":
+        """self − other di gabungan bulan; sel present kalau ada di salah satunya (sel kosong dihitung 0)."""
+        other = TotalsMatrix.coerce(other)
+        if other.flf != self.flf:
+            raise ValueError("Cannot diff totals with different FLF axes.")
+        months = self.months + [m for m in other.months if m not in self._row_of]
+        a, pa = self._aligned(months)
+        b, pb = other._aligned(months)
+        return TotalsMatrix(months, a - b, pa | pb, self.flf)
+
+    def select(self, months: Iterable[str]) -> "TotalsMatrix":
+        """Sub-matriks untuk bulan-bulan ini, urut sesuai argumen (bulan yang tidak ada diabaikan)."""
+        rows = [self._row_of[m] for m in months if m in self._row_of]
+        return TotalsMatrix([self.months[i] for i in rows], self.values[rows], self.present[rows], self.flf)
+
+    # ----- serialisasi (npz, tanpa pickle) -----
+    def to_arrays(self, prefix: str = "") -> Dict[str, np.ndarray]:
+        return {
+            f"{prefix}months": np.array(self.months, dtype=str),
+            f"{prefix}flf": np.array(self.flf, dtype=str),
+            f"{prefix}values": self.values,
+            f"{prefix}present": self.present,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: Mapping[str, Any], prefix: str = "") -> "TotalsMatrix":
+        return cls(
+            [str(m) for m in arrays[f"{prefix}months"]],
+            arrays[f"{prefix}values"],
+            arrays[f"{prefix}present"],
+            [str(k) for k in arrays[f"{prefix}flf"]],
+        )
+
+
+class _MonthView(Mapping[str, float]):
+    """Satu baris TotalsMatrix sebagai {FLF: nilai} (hanya sel present, urut sumbu FLF)."""
+
+    __slots__ = ("_mat", "_i")
+
+    def __init__(self, mat: TotalsMatrix, i: int) -> None:
+        self._mat = mat
+        self._i = i
+
+    def __getitem__(self, flf: str) -> float:
+        j = self._mat._col_of.get(flf)
+        if j is None or not self._mat.present[self._i, j]:
+            raise KeyError(flf)
+        return float(self._mat.values[self._i, j])
+
+    def __iter__(self) -> Iterator[str]:
+        flf = self._mat.flf
+        return (flf[j] for j in np.flatnonzero(self._mat.present[self._i]))
+
+    def __len__(self) -> int:
+        return int(self._mat.present[self._i].sum())
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
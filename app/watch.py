@@ -0,0 +1,328 @@
+# app/watch.py — service tanpa GUI: pantau file Barge, jalankan pipeline otomatis setelah file selesai disimpan
+from __future__ import annotations
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, replace
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from . import barge_cache
+from .config import RunOptions
+
+# Event inotify yang menandai file selesai ditulis / diganti (Excel menyimpan lewat file sementara + rename)
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_Q_OVERFLOW = 0x4000
+_WATCH_MASK = _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (lalu nama, len byte)
+
+Runner = Callable[[List[RunOptions], Callable[[str], None]], List[str]]
+
+
+def _norm(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class _InotifySource:
+    """Event inotify (Linux) untuk folder-folder file yang dipantau. OSError kalau tidak tersedia."""
+
+    def __init__(self, paths: Iterable[str]) -> None:
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._fd = fd
+        self._paths = set(paths)
+        self._dirs: Dict[int, str] = {}
+        try:
+            for folder in sorted({os.path.dirname(p) for p in self._paths}):
+                wd = libc.inotify_add_watch(fd, os.fsencode(folder), _WATCH_MASK)
+                if wd < 0:
+                    raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {folder}")
+                self._dirs[wd] = folder
+        except BaseException:
+            os.close(fd)
+            raise
+
+    def read(self, timeout: float) -> Set[str]:
+        """File terpantau yang berubah (tunggu paling lama `timeout` detik)."""
+        ready, _, _ = select.select([self._fd], [], [], max(timeout, 0.0))
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed: Set[str] = set()
+        pos = 0
+        while pos + _EVENT.size <= len(data):
+            wd, mask, _, n = _EVENT.unpack_from(data, pos)
+            name = data[pos + _EVENT.size:pos + _EVENT.size + n].rstrip(b"\0")
+            pos += _EVENT.size + n
+            if mask & _IN_Q_OVERFLOW:
+                return set(self._paths)  # event hilang → anggap semua berubah
+            folder = self._dirs.get(wd)
+            if folder is not None and name:
+                path = _norm(os.path.join(folder, os.fsdecode(name)))
+                if path in self._paths:
+                    changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            fd, self._fd = self._fd, -1
+            os.close(fd)
+
+
+class _PollSource:
+    """Fallback tanpa inotify (Windows/macOS, share jaringan): bandingkan size/mtime tiap `interval` detik."""
+
+    def __init__(self, paths: Iterable[str], interval: float = 1.0) -> None:
+        self._interval = interval
+        self._seen = {p: _stat_key(p) for p in paths}
+        self._wake = threading.Event()
+
+    def read(self, timeout: float) -> Set[str]:
+        self._wake.wait(min(max(timeout, 0.0), self._interval))
+        changed = set()
+        for path, old in self._seen.items():
+            key = _stat_key(path)
+            if key != old:
+                self._seen[path] = key
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        self._wake.set()
+
+
+@dataclass
+class WatchRun:
+    """Satu run otomatis. Waktu dalam detik; latency = event pertama → run selesai."""
+    at: float  # time.time() saat run selesai
+    jobs: int
+    events: int  # event yang digabung ke run ini
+    debounce_s: float  # event pertama → run mulai
+    run_s: float
+    latency_s: float
+    ok: bool
+
+
+class WatchMetrics:
+    """Penghitung + latency run terakhir (dibatasi `keep`), untuk log dan file metrics JSON."""
+
+    def __init__(self, keep: int = 200) -> None:
+        self.runs = 0
+        self.failed = 0
+        self.events = 0
+        self.recent: Deque[WatchRun] = deque(maxlen=keep)
+
+    def add(self, run: WatchRun) -> None:
+        self.runs += 1
+        self.failed += not run.ok
+        self.recent.append(run)
+
+    @staticmethod
+    def _pct(values: List[float], q: float) -> Optional[float]:
+        if not values:
+            return None
+        values = sorted(values)
+        return round(values[min(len(values) - 1, int(q * len(values)))], 3)
+
+    def to_dict(self) -> Dict[str, object]:
+        lat = [r.latency_s for r in self.recent]
+        return {
+            "runs": self.runs,
+            "failed": self.failed,
+            "events": self.events,
+            "latency_s": {"p50": self._pct(lat, 0.5), "p95": self._pct(lat, 0.95), "max": self._pct(lat, 1.0)},
+            "recent": [asdict(r) for r in self.recent],
+        }
+
+    def save(self, path: str) -> None:
+        barge_cache.atomic_write(path, lambda fh: fh.write(json.dumps(self.to_dict(), indent=2).encode("utf-8")))
+
+
+def run_jobs(jobs: List[RunOptions], progress: Callable[[str], None]) -> List[str]:
+    """Runner default: satu job → run_pipeline, beberapa → run_batch per master (incremental berlaku di keduanya)."""
+    from .main_logic import run_batch, run_pipeline
+
+    logs: List[str] = []
+    by_master: Dict[str, List[RunOptions]] = {}
+    for job in jobs:
+        by_master.setdefault(_norm(job.master_path), []).append(job)
+    for group in by_master.values():
+        if len(group) == 1:
+            _, job_logs = run_pipeline(group[0], progress=progress)
+            logs.extend(job_logs)
+        else:
+            results, batch_logs = run_batch(group, progress=progress)
+            for _, job_logs in results:
+                logs.extend(job_logs)
+            logs.extend(batch_logs)
+    return logs
+
+
+class Watcher:
+    """
+    Pantau barge_path semua job; setiap file berubah, tunggu sampai tenang `debounce` detik
+    (paling lama `max_delay` sejak event pertama), lalu jalankan job untuk file-file itu SEKALI.
+    Simpan beruntun dari Excel/sync folder jadi satu run; file yang berubah lagi selama run dijalankan
+    di run berikutnya.
+      - inotify kalau tersedia (Linux), selain itu polling size/mtime tiap `poll_interval` detik;
+      - job dijalankan dengan incremental=True (juga di run_batch): proses tetap hidup dan state incremental/
+        cache parse/indeks bulan dipakai ulang, jadi run sesudah baris ditambahkan hanya membaca baris baru
+        (totals tetap sama dengan run penuh). State incremental satu per workbook+sheet: dua job pada sheet
+        yang sama dengan jendela berbeda saling menimpa dan selalu dibaca penuh;
+      - run gagal dicatat (metrics + log) dan service tetap jalan.
+    step() memproses satu putaran (dipakai run(), dan untuk uji dengan folder sementara).
+    """
+
+    def __init__(
+        self,
+        jobs: List[RunOptions],
+        debounce: float = 2.0,
+        max_delay: float = 30.0,
+        poll_interval: float = 1.0,
+        use_inotify: bool = True,
+        progress: Callable[[str], None] = lambda *_: None,
+        metrics_path: Optional[str] = None,
+        runner: Optional[Runner] = None,
+    ) -> None:
+        if not jobs:
+            raise ValueError("No jobs to watch.")
+        self.jobs = [replace(j, incremental=True) for j in jobs]
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.progress = progress
+        self.metrics_path = metrics_path
+        self.metrics = WatchMetrics()
+        self._runner = runner or run_jobs
+        self._stop = threading.Event()
+        self._pending: Dict[str, float] = {}  # path → waktu event pertama
+        self._pending_events = 0
+        self._last_event = 0.0
+        paths = {_norm(j.barge_path) for j in self.jobs}
+        self.source: _InotifySource | _PollSource
+        try:
+            if not use_inotify:
+                raise OSError("disabled")
+            self.source = _InotifySource(paths)
+            self.mode = "inotify"
+        except OSError:
+            self.source = _PollSource(paths, poll_interval)
+            self.mode = "poll"
+
+    @property
+    def pending(self) -> List[str]:
+        return sorted(self._pending)
+
+    def stop(self) -> None:
+        """Hentikan run() (aman dari thread/signal handler lain); run yang sedang jalan diselesaikan."""
+        self._stop.set()
+        if isinstance(self.source, _PollSource):
+            self.source.close()
+
+    def _timeout(self) -> float:
+        if not self._pending:
+            return self.poll_interval
+        now = time.monotonic()
+        first = min(self._pending.values())
+        return max(0.0, min(self._last_event + self.debounce, first + self.max_delay) - now)
+
+    def step(self, timeout: Optional[float] = None) -> Optional[WatchRun]:
+        """Tunggu event (paling lama `timeout`), lalu jalankan job kalau file sudah tenang. Return WatchRun atau None."""
+        changed = self.source.read(self._timeout() if timeout is None else timeout)
+        now = time.monotonic()
+        for path in changed:
+            self._pending.setdefault(path, now)
+        if changed:
+            self._last_event = now
+            self._pending_events += len(changed)
+            self.metrics.events += len(changed)
+        if not self._pending:
+            return None
+        first = min(self._pending.values())
+        if now - self._last_event < self.debounce and now - first < self.max_delay:
+            return None
+        return self._run(first)
+
+    def _run(self, first: float) -> WatchRun:
+        paths = set(self._pending)
+        events = self._pending_events
+        self._pending.clear()
+        self._pending_events = 0
+        jobs = [j for j in self.jobs if _norm(j.barge_path) in paths]
+        names = ", ".join(sorted({os.path.basename(j.barge_path) for j in jobs}))
+        self.progress(f"[WATCH] {names} changed ({events} event(s)); running {len(jobs)} job(s) …")
+
+        start = time.monotonic()
+        ok = True
+        try:
+            logs = self._runner(jobs, self.progress)
+        except Exception as e:  # service tetap hidup; file yang setengah tersimpan biasanya beres di event berikutnya
+            ok = False
+            logs = [f"[ERROR] {type(e).__name__}: {e}"]
+        end = time.monotonic()
+        ok = ok and not any(line.startswith("[ERROR]") for line in logs)
+        for line in logs:
+            self.progress(line)
+
+        run = WatchRun(
+            at=round(time.time(), 3),
+            jobs=len(jobs),
+            events=events,
+            debounce_s=round(start - first, 3),
+            run_s=round(end - start, 3),
+            latency_s=round(end - first, 3),
+            ok=ok,
+        )
+        self.metrics.add(run)
+        self.progress(
+            f"[WATCH] run #{self.metrics.runs} {'ok' if ok else 'FAILED'}: debounce {run.debounce_s:.2f}s, "
+            f"run {run.run_s:.2f}s, latency {run.latency_s:.2f}s"
+        )
+        if self.metrics_path:
+            try:
+                self.metrics.save(self.metrics_path)
+            except OSError as e:
+                self.progress(f"[WARN] Watch metrics not saved: {e}")
+        return run
+
+    def run(self) -> None:
+        """Loop sampai stop() (atau KeyboardInterrupt)."""
+        from . import main_logic  # noqa: F401  (import berat sekali di awal, bukan saat run pertama)
+
+        folders = sorted({os.path.dirname(_norm(j.barge_path)) for j in self.jobs})
+        self.progress(f"[WATCH] Watching {len(self.jobs)} job(s) in {', '.join(folders)} ({self.mode}); Ctrl+C to stop.")
+        try:
+            while not self._stop.is_set():
+                self.step()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        try:
+            self.source.close()
+        except OSError:
+            pass
@@ -0,0 +1,433 @@
+# app/xlsx_patch.py — tulis beberapa sel langsung di XML sheet (tanpa load/save openpyxl)
+from __future__ import annotations
+import copy
+import io
+import math
+import os
+import re
+import struct
+import tempfile
+import zipfile
+from dataclasses import dataclass, field
+from html import unescape
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from openpyxl.utils import get_column_letter
+
+from .xlsx_stream import XlsxBook, split_ref
+
+
+class PatchUnsafe(Exception):
+    """Sel/sheet tidak bisa di-patch dengan aman → caller pakai openpyxl."""
+
+
+_ROW_OPEN = re.compile(r"<row\b([^>]*?)(/?)>")
+_C_OPEN = re.compile(r"<c\b([^>]*?)(/?)>")
+_ATTR = re.compile(r"([\w:]+)=(\"[^\"]*\"|'[^']*')")
+_V = re.compile(r"<v>(.*?)</v>", re.S)
+_IS_T = re.compile(r"<t\b[^>]*>(.*?)</t>", re.S)
+_RPH = re.compile(r"<rPh\b.*?</rPh>", re.S)
+_T_ATTR = re.compile(r"\st=(\"[^\"]*\"|'[^']*')")
+_SPANS_ATTR = re.compile(r"\sspans=(\"[^\"]*\"|'[^']*')")
+
+
+def _attrs(s: str) -> Dict[str, str]:
+    return {k: v[1:-1] for k, v in _ATTR.findall(s)}
+
+
+@dataclass
+class _Cell:
+    start: int          # offset absolut di XML sheet
+    end: int
+    attrs: str          # teks atribut mentah, mis. ' r="C5" s="3" t="s"'
+    inner: Optional[str]
+
+
+@dataclass
+class _Row:
+    start: int
+    end: int
+    open_end: int       # offset setelah tag pembuka <row ...>
+    attrs: str
+    self_closing: bool
+    cells: Dict[int, _Cell] = field(default_factory=dict)   # kolom 1-based → sel
+
+
+class SheetPatcher:
+    """
+    Baca satu sheet dari xlsx sebagai teks XML, ganti sel tertentu, lalu tulis ulang zip:
+    hanya XML sheet tsb yang berubah; member lain disalin apa adanya (data terkompresi mentah).
+    Nilai lama dibaca dengan semantik openpyxl (load_workbook biasa, bukan data_only).
+    """
+
+    def __init__(self, path: str, sheet_name: str, book: Optional[XlsxBook] = None) -> None:
+        self.path = path
+        self.sheet_name = sheet_name
+        # book dari WorkbookPatcher dipakai bersama dan ditutup oleh pemiliknya
+        self._owns_book = book is None
+        self._book = XlsxBook(path) if book is None else book
+        try:
+            if sheet_name not in self._book.sheetnames:
+                raise ValueError(f"Sheet {sheet_name!r} not found in master.")
+            self.part = self._book.sheet_part(sheet_name)
+            try:
+                self.xml = self._book.read_part(self.part).decode("utf-8")
+            except UnicodeDecodeError as e:
+                raise PatchUnsafe(f"sheet XML is not UTF-8 ({e})") from e
+            self.rows = self._parse_rows()
+        except BaseException:
+            self.close()
+            raise
+        self._writes: Dict[Tuple[int, int], Optional[float]] = {}
+
+    def close(self) -> None:
+        if self._owns_book:
+            self._book.close()
+
+    def __enter__(self) -> "SheetPatcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------- parsing ----------
+    def _parse_rows(self) -> Dict[int, _Row]:
+        xml = self.xml
+        lo = xml.find("<sheetData")
+        if lo < 0:
+            raise PatchUnsafe("no <sheetData> (namespace prefix?)")
+        hi = xml.find("</sheetData>", lo)
+        hi = len(xml) if hi < 0 else hi
+        rows: Dict[int, _Row] = {}
+        pos = lo
+        while True:
+            m = _ROW_OPEN.search(xml, pos, hi)
+            if not m:
+                break
+            a = _attrs(m.group(1))
+            if "r" not in a:
+                raise PatchUnsafe("row without r attribute")
+            if m.group(2):
+                row = _Row(m.start(), m.end(), m.end(), m.group(1), True)
+            else:
+                close = xml.find("</row>", m.end(), hi)
+                if close < 0:
+                    raise PatchUnsafe("unterminated <row>")
+                row = _Row(m.start(), close + len("</row>"), m.end(), m.group(1), False)
+                self._parse_cells(row, m.end(), close)
+            rows[int(a["r"])] = row
+            pos = row.end
+        return rows
+
+    def _parse_cells(self, row: _Row, lo: int, hi: int) -> None:
+        xml = self.xml
+        pos = lo
+        while True:
+            m = _C_OPEN.search(xml, pos, hi)
+            if not m:
+                break
+            ref = _attrs(m.group(1)).get("r")
+            if not ref:
+                raise PatchUnsafe("cell without r attribute")
+            if m.group(2):
+                cell = _Cell(m.start(), m.end(), m.group(1), None)
+            else:
+                close = xml.find("</c>", m.end(), hi)
+                if close < 0:
+                    raise PatchUnsafe("unterminated <c>")
+                cell = _Cell(m.start(), close + len("</c>"), m.group(1), xml[m.end():close])
+            row.cells[split_ref(ref)[1] + 1] = cell
+            pos = cell.end
+
+    # ---------- baca ----------
+    def _cell_value(self, cell: Optional[_Cell]) -> Any:
+        if cell is None or cell.inner is None:
+            return None
+        inner = cell.inner
+        if "<f" in inner:
+            return "="  # openpyxl (bukan data_only) memberi teks formula
+        a = _attrs(cell.attrs)
+        t = a.get("t", "n")
+        if t == "inlineStr":
+            return unescape("".join(_IS_T.findall(_RPH.sub("", inner))))
+        m = _V.search(inner)
+        if not m:
+            return None
+        v = unescape(m.group(1))
+        if t == "s":
+            return self._book.shared_string(int(v))
+        if t in ("str", "e"):
+            return v
+        if t == "b":
+            return v.strip() in ("1", "true")
+        if t == "d":
+            return v  # tanggal ISO; bagi caller cukup "bukan angka"
+        style = int(a.get("s", "0"))
+        if self._book.is_date_style(style):
+            return self._book.excel_to_datetime(float(v), style)
+        return float(v) if ("." in v or "E" in v or "e" in v) else int(v)
+
+    def value(self, r: int, c: int) -> Any:
+        """Nilai sel (1-based), termasuk perubahan yang sudah di-set()."""
+        if (r, c) in self._writes:
+            return self._writes[(r, c)]
+        row = self.rows.get(r)
+        return self._cell_value(row.cells.get(c) if row else None)
+
+    def column_values(self, c: int) -> Iterator[Tuple[int, Any]]:
+        for r in sorted(self.rows):
+            cell = self.rows[r].cells.get(c)
+            if cell is not None:
+                yield r, self._cell_value(cell)
+
+    # ---------- tulis ----------
+    def set(self, r: int, c: int, value: Optional[float]) -> None:
+        if value is not None and not math.isfinite(value):
+            raise PatchUnsafe(f"non-finite value for {get_column_letter(c)}{r}")
+        row = self.rows.get(r)
+        if row is None:
+            raise PatchUnsafe(f"row {r} has no <row> element")
+        cell = row.cells.get(c)
+        if cell is not None and cell.inner is not None and "<f" in cell.inner:
+            raise PatchUnsafe(f"{get_column_letter(c)}{r} holds a formula")
+        if cell is not None and ({"cm", "vm"} & set(_attrs(cell.attrs))):
+            raise PatchUnsafe(f"{get_column_letter(c)}{r} has cell/value metadata")
+        self._writes[(r, c)] = value
+
+    @staticmethod
+    def _cell_xml(attrs: str, value: Optional[float]) -> str:
+        attrs = _T_ATTR.sub("", attrs).rstrip()
+        if value is None:
+            return f"<c{attrs}/>"
+        return f"<c{attrs}><v>{float(value)!r}</v></c>"
+
+    def _patched_row(self, r: int, row: _Row, writes: Dict[int, Optional[float]]) -> str:
+        xml = self.xml
+        attrs = row.attrs
+        # sel yang belum ada dan dikosongkan → tidak perlu dibuat
+        writes = {c: v for c, v in writes.items() if c in row.cells or v is not None}
+        new_cols = [c for c in writes if c not in row.cells]
+        if not writes:
+            return xml[row.start:row.end]
+        if new_cols:
+            # sel baru di luar "spans" → buang hint spans (opsional di spesifikasi)
+            attrs = _SPANS_ATTR.sub("", attrs)
+        attrs = attrs.rstrip()
+        if row.self_closing:
+            body_parts: List[str] = []
+            for c in sorted(writes):
+                body_parts.append(self._cell_xml(f' r="{get_column_letter(c)}{r}"', writes[c]))
+            return f"<row{attrs}>" + "".join(body_parts) + "</row>"
+
+        out: List[str] = [f"<row{attrs}>"]
+        pos = row.open_end
+        pending = sorted(new_cols)
+        for c in sorted(row.cells):
+            cell = row.cells[c]
+            while pending and pending[0] < c:
+                nc = pending.pop(0)
+                out.append(xml[pos:cell.start])
+                pos = cell.start
+                out.append(self._cell_xml(f' r="{get_column_letter(nc)}{r}"', writes[nc]))
+            if c in writes:
+                out.append(xml[pos:cell.start])
+                out.append(self._cell_xml(cell.attrs, writes[c]))
+                pos = cell.end
+        close = row.end - len("</row>")
+        out.append(xml[pos:close])
+        for nc in pending:
+            out.append(self._cell_xml(f' r="{get_column_letter(nc)}{r}"', writes[nc]))
+        out.append("</row>")
+        return "".join(out)
+
+    def patched_xml(self) -> str:
+        by_row: Dict[int, Dict[int, Optional[float]]] = {}
+        for (r, c), v in self._writes.items():
+            by_row.setdefault(r, {})[c] = v
+        parts: List[str] = []
+        pos = 0
+        for r in sorted(by_row, key=lambda rr: self.rows[rr].start):
+            row = self.rows[r]
+            parts.append(self.xml[pos:row.start])
+            parts.append(self._patched_row(r, row, by_row[r]))
+            pos = row.end
+        parts.append(self.xml[pos:])
+        return "".join(parts)
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._writes)
+
+    def save(self, path: Optional[str] = None, check: Optional[Callable[[], None]] = None) -> None:
+        """
+        Tulis ke file sementara lalu os.replace (master lama utuh kalau gagal di tengah).
+        check: dipanggil di antara member zip dan tepat sebelum os.replace; exception-nya membatalkan simpan.
+        """
+        _write_patched(self._book, self.path, path or self.path, [self], check)
+
+
+class WorkbookPatcher:
+    """
+    Master dibuka sekali untuk beberapa sheet: tiap sheet di-patch lewat sheet(name),
+    lalu semua XML sheet yang berubah ditulis dalam satu kali tulis ulang zip.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._book = XlsxBook(path)
+        self._sheets: Dict[str, SheetPatcher] = {}
+
+    def close(self) -> None:
+        self._book.close()
+
+    def __enter__(self) -> "WorkbookPatcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return self._book.sheetnames
+
+    def sheet(self, name: str) -> SheetPatcher:
+        sp = self._sheets.get(name)
+        if sp is None:
+            sp = self._sheets[name] = SheetPatcher(self.path, name, book=self._book)
+        return sp
+
+    def save(self, path: Optional[str] = None, check: Optional[Callable[[], None]] = None) -> None:
+        dirty = [sp for sp in self._sheets.values() if sp.dirty]
+        _write_patched(self._book, self.path, path or self.path, dirty, check)
+
+
+def _write_patched(
+    book: XlsxBook,
+    source: str,
+    target: str,
+    patchers: List[SheetPatcher],
+    check: Optional[Callable[[], None]] = None,
+) -> None:
+    check = check or (lambda: None)
+    replace = {sp.part: sp.patched_xml().encode("utf-8") for sp in patchers}
+    if any(sp.dirty for sp in patchers):
+        # formula di sheet mana pun (Summary, pivot, calcChain) bisa bergantung pada sel yang ditulis;
+        # seperti save openpyxl, selalu minta Excel menghitung ulang saat dibuka
+        wb_xml = book.read_part("xl/workbook.xml").decode("utf-8")
+        flagged = _full_calc_on_load(wb_xml)
+        if flagged is not None:
+            replace["xl/workbook.xml"] = flagged.encode("utf-8")
+
+    fd, tmp = tempfile.mkstemp(prefix=".~flf", suffix=".xlsx", dir=os.path.dirname(os.path.abspath(target)))
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(source) as zin, zipfile.ZipFile(tmp, "w") as zout:
+            for info in zin.infolist():
+                check()
+                if info.filename in replace:
+                    out = copy.copy(info)
+                    zout.writestr(out, replace[info.filename], compress_type=info.compress_type)
+                else:
+                    _copy_member_raw(zin, zout, info)
+        check()
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+# elemen <workbook> yang menurut skema datang sesudah <calcPr>
+_AFTER_CALC_PR = re.compile(
+    r"<(?:\w+:)?(?:oleSize|customWorkbookViews|pivotCaches|smartTagPr|smartTagTypes|webPublishing"
+    r"|fileRecoveryPr|webPublishObjects|extLst)\b"
+)
+
+
+def _full_calc_on_load(wb_xml: str) -> Optional[str]:
+    """
+    workbook.xml dengan calcPr fullCalcOnLoad="1" (nilai formula yang tersimpan jadi basi → Excel hitung ulang
+    saat dibuka). Tanpa <calcPr>: elemen baru disisipkan di posisi skema. None kalau XML tidak dikenali.
+    """
+    m = re.search(r"<((?:\w+:)?)calcPr\b([^>]*?)(/?)>", wb_xml)
+    if m:
+        attrs = re.sub(r"\sfullCalcOnLoad=(\"[^\"]*\"|'[^']*')", "", m.group(2)).rstrip()
+        tag = f'<{m.group(1)}calcPr{attrs} fullCalcOnLoad="1"{m.group(3)}>'
+        return wb_xml[:m.start()] + tag + wb_xml[m.end():]
+    end = re.search(r"</((?:\w+:)?)workbook\s*>", wb_xml)
+    if not end:
+        return None
+    after = _AFTER_CALC_PR.search(wb_xml)
+    pos = after.start() if after and after.start() < end.start() else end.start()
+    return wb_xml[:pos] + f'<{end.group(1)}calcPr fullCalcOnLoad="1"/>' + wb_xml[pos:]
+
+
+_RAW_COPY_OK: Optional[bool] = None  # hasil _raw_copy_supported(), dicek sekali per proses
+
+
+def _raw_copy_supported() -> bool:
+    """
+    _copy_member_raw memakai internal zipfile yang tidak terdokumentasi (ZipFile.fp/start_dir/filelist/NameToInfo,
+    ZipInfo.FileHeader). Dicek sekali: atribut-atributnya ada dan zip kecil di memori yang disalin mentah
+    terbaca ulang identik (termasuk CRC). Kalau tidak, semua member disalin lewat writestr biasa.
+    """
+    global _RAW_COPY_OK
+    if _RAW_COPY_OK is None:
+        _RAW_COPY_OK = _probe_raw_copy()
+    return _RAW_COPY_OK
+
+
+def _probe_raw_copy() -> bool:
+    members = {"a.xml": b"<a>" + b"x" * 4096 + b"</a>", "b.bin": bytes(range(256))}
+    try:
+        if not callable(getattr(zipfile.ZipInfo, "FileHeader", None)):
+            return False
+        src, dst = io.BytesIO(), io.BytesIO()
+        with zipfile.ZipFile(src, "w") as z:
+            z.writestr("a.xml", members["a.xml"], compress_type=zipfile.ZIP_DEFLATED)
+            z.writestr("b.bin", members["b.bin"], compress_type=zipfile.ZIP_STORED)
+        with zipfile.ZipFile(src) as zin, zipfile.ZipFile(dst, "w") as zout:
+            if not all(hasattr(zout, a) for a in ("start_dir", "fp", "filelist", "NameToInfo")):
+                return False
+            for info in zin.infolist():
+                _copy_member_raw(zin, zout, info, raw=True)
+        with zipfile.ZipFile(dst) as z:
+            return z.testzip() is None and {n: z.read(n) for n in z.namelist()} == members
+    except Exception:
+        return False
+
+
+def _copy_member_raw(
+    zin: zipfile.ZipFile, zout: zipfile.ZipFile, info: zipfile.ZipInfo, raw: Optional[bool] = None
+) -> None:
+    """
+    Salin member zip tanpa dekompresi/rekompresi; fallback ke writestr kalau tidak memungkinkan
+    (zip64, extra field, terenkripsi, atau internal zipfile versi Python ini tidak lolos _raw_copy_supported).
+    """
+    raw_ok = (
+        info.file_size < zipfile.ZIP64_LIMIT
+        and info.compress_size < zipfile.ZIP64_LIMIT
+        and not info.extra
+        and not info.flag_bits & 0x01  # terenkripsi
+        and (_raw_copy_supported() if raw is None else raw)
+    )
+    if not raw_ok:
+        zout.writestr(copy.copy(info), zin.read(info.filename), compress_type=info.compress_type)
+        return
+    fp = zin.fp
+    fp.seek(info.header_offset)
+    header = fp.read(30)
+    if header[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"bad local header for {info.filename}")
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    fp.seek(info.header_offset + 30 + name_len + extra_len)
+    data = fp.read(info.compress_size)
+
+    out = copy.copy(info)
+    out.flag_bits &= ~0x08  # ukuran & CRC ditulis di header lokal, tanpa data descriptor
+    out.header_offset = zout.fp.tell()
+    zout.fp.write(out.FileHeader(zip64=False))
+    zout.fp.write(data)
+    zout.filelist.append(out)
+    zout.NameToInfo[out.filename] = out
+    zout.start_dir = zout.fp.tell()
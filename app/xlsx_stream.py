@@ -0,0 +1,506 @@
+# app/xlsx_stream.py — pembaca xlsx streaming (zip + XML, tanpa load_workbook)
+from __future__ import annotations
+import hashlib
+import io
+import math
+import posixpath
+import re
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from xml.etree import ElementTree as ET
+
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_ROW = f"{{{NS_MAIN}}}row"
+_C = f"{{{NS_MAIN}}}c"
+_V = f"{{{NS_MAIN}}}v"
+_IS = f"{{{NS_MAIN}}}is"
+_T = f"{{{NS_MAIN}}}t"
+_R = f"{{{NS_MAIN}}}r"
+_SI = f"{{{NS_MAIN}}}si"
+_SHEET_DATA = f"{{{NS_MAIN}}}sheetData"
+
+# String yang dianggap NaN oleh pd.read_excel (default na_values pandas)
+NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+})
+
+_REF_RE = re.compile(r"([A-Z]+)(\d+)")
+
+# (col_idx_0_based, tipe, teks mentah, indeks style) — belum dikonversi jadi nilai
+RawCell = Tuple[int, Optional[str], Optional[str], int]
+
+
+def col_letters_to_idx0(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + (ord(ch) - 64)
+    return n - 1
+
+
+def split_ref(ref: str) -> Tuple[int, int]:
+    """'BQ12' -> (row_0_based, col_0_based)."""
+    m = _REF_RE.match(ref)
+    if not m:
+        raise ValueError(f"Invalid cell reference: {ref!r}")
+    return int(m.group(2)) - 1, col_letters_to_idx0(m.group(1))
+
+
+def _text_of(node) -> str:
+    # gabung semua <t> (rich text <r><t>), abaikan phonetic <rPh>
+    if node is None:
+        return ""
+    parts: List[str] = []
+    for child in node:
+        if child.tag == _T:
+            parts.append(child.text or "")
+        elif child.tag == _R:
+            t = child.find(_T)
+            if t is not None:
+                parts.append(t.text or "")
+    return "".join(parts)
+
+
+def _rels_of(zf: zipfile.ZipFile, part: str) -> Dict[str, Tuple[str, str]]:
+    folder, base = posixpath.split(part)
+    rels_part = posixpath.join(folder, "_rels", base + ".rels")
+    out: Dict[str, Tuple[str, str]] = {}
+    if rels_part not in zf.namelist():
+        return out
+    root = ET.fromstring(zf.read(rels_part))
+    for rel in root.iter(f"{{{NS_PKG_REL}}}Relationship"):
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            target = target.lstrip("/")
+        else:
+            target = posixpath.normpath(posixpath.join(folder, target))
+        out[rel.get("Id", "")] = (rel.get("Type", ""), target)
+    return out
+
+
+def _read_workbook_xml(zf: zipfile.ZipFile) -> Tuple[bool, Dict[str, Tuple[str, str]], List[Tuple[str, str, str]]]:
+    """Return (date1904, rels workbook, [(nama sheet, part, state), ...]) sesuai urutan tab."""
+    part = "xl/workbook.xml"
+    root = ET.fromstring(zf.read(part))
+    pr = root.find(f"{{{NS_MAIN}}}workbookPr")
+    date1904 = pr is not None and pr.get("date1904") in ("1", "true")
+    rels = _rels_of(zf, part)
+    sheets: List[Tuple[str, str, str]] = []
+    for sh in root.iter(f"{{{NS_MAIN}}}sheet"):
+        rid = sh.get(f"{{{NS_REL}}}id", "")
+        if rid in rels:
+            sheets.append((sh.get("name", ""), rels[rid][1], sh.get("state", "visible")))
+    return date1904, rels, sheets
+
+
+_DIMENSION_RE = re.compile(r"<(?:\w+:)?dimension\s+ref=\"([A-Z]+\d+)(?::([A-Z]+\d+))?\"")
+
+
+def _read_dimension(zf: zipfile.ZipFile, part: str) -> Optional[Tuple[int, int, int, int]]:
+    # <dimension> ada di awal XML sheet; cukup dekompresi 4KB pertama
+    with zf.open(part) as fh:
+        head = fh.read(4096).decode("utf-8", "ignore")
+    m = _DIMENSION_RE.search(head)
+    if not m:
+        return None
+    r0, c0 = split_ref(m.group(1))
+    r1, c1 = split_ref(m.group(2) or m.group(1))
+    return r0, c0, r1, c1
+
+
+class SheetInfo(NamedTuple):
+    name: str
+    state: str                    # "visible" / "hidden" / "veryHidden"
+    used_range: Optional[str]     # mis. "A1:BQ5000" (dari <dimension>), None kalau tidak ada
+    max_row: Optional[int]        # baris terakhir (1-based) menurut <dimension> — perkiraan jumlah baris
+    max_col: Optional[int]
+
+
+def probe_workbook(path: str) -> List[SheetInfo]:
+    """
+    Metadata workbook tanpa memuat isinya: hanya xl/workbook.xml (+ rels) dan record
+    <dimension> di awal tiap XML sheet. File zip selalu ditutup sebelum return.
+    <dimension> ditulis oleh aplikasi pembuat file, jadi max_row bisa berbeda dari isi sebenarnya.
+    """
+    with zipfile.ZipFile(path) as zf:
+        _, _, sheets = _read_workbook_xml(zf)
+        out: List[SheetInfo] = []
+        for name, part, state in sheets:
+            try:
+                dim = _read_dimension(zf, part)
+            except (KeyError, ValueError):
+                dim = None
+            if dim is None:
+                out.append(SheetInfo(name, state, None, None, None))
+                continue
+            r0, c0, r1, c1 = dim
+            used = f"{_col_letters(c0)}{r0 + 1}:{_col_letters(c1)}{r1 + 1}"
+            out.append(SheetInfo(name, state, used, r1 + 1, c1 + 1))
+        return out
+
+
+def _col_letters(idx0: int) -> str:
+    s = ""
+    n = idx0 + 1
+    while n:
+        n, rem = divmod(n - 1, 26)
+        s = chr(65 + rem) + s
+    return s
+
+
+class _SharedStrings:
+    """sharedStrings.xml yang di-parse malas: hanya sampai indeks tertinggi yang diminta."""
+
+    def __init__(self, zf: zipfile.ZipFile, part: Optional[str]) -> None:
+        self._items: List[str] = []
+        self._it = None
+        self._fh = None
+        if part and part in zf.namelist():
+            self._fh = zf.open(part)
+            self._it = ET.iterparse(self._fh, events=("end",))
+
+    def get(self, i: int) -> str:
+        while i >= len(self._items) and self._it is not None:
+            try:
+                _, elem = next(self._it)
+            except StopIteration:
+                self.close()
+                break
+            if elem.tag == _SI:
+                self._items.append(_text_of(elem))
+                elem.clear()
+        return self._items[i]
+
+    def close(self) -> None:
+        self._it = None
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+def _rows_of(events, require_ref: bool = False) -> Iterator[Tuple[int, List[RawCell]]]:
+    """(event, elem) dari iterparse → (row_0_based, [RawCell, ...]); elemen baris dibuang setelah dibaca."""
+    sheet_data = None
+    next_row = 0
+    for event, elem in events:
+        if event == "start":
+            if elem.tag == _SHEET_DATA:
+                sheet_data = elem
+            continue
+        if elem.tag != _ROW:
+            continue
+        rattr = elem.get("r")
+        if not rattr and require_ref:
+            raise ValueError("row without r attribute")
+        r0 = int(rattr) - 1 if rattr else next_row
+        next_row = r0 + 1
+        cells: List[RawCell] = []
+        next_col = 0
+        for c in elem.iter(_C):
+            ref = c.get("r")
+            c0 = split_ref(ref)[1] if ref else next_col
+            next_col = c0 + 1
+            t = c.get("t")
+            if t == "inlineStr":
+                text = _text_of(c.find(_IS))
+            else:
+                v = c.find(_V)
+                text = v.text if v is not None else None
+            cells.append((c0, t, text, int(c.get("s", "0"))))
+        if sheet_data is not None:
+            sheet_data.remove(elem)
+        else:
+            elem.clear()
+        yield r0, cells
+
+
+# ---- checkpoint byte sheetData (mode incremental) ----
+_SD_OPEN_RE = re.compile(rb"<(?:[A-Za-z_][\w.-]*:)?sheetData\b[^>]*?(/?)>")
+_SD_CLOSE_RE = re.compile(rb"</(?:[A-Za-z_][\w.-]*:)?sheetData\s*>")
+_SST_REF_RE = re.compile(rb"<(?:[A-Za-z_][\w.-]*:)?c\b[^>]*?\bt=[\"']s[\"'][^>]*>\s*<(?:[A-Za-z_][\w.-]*:)?v>(\d+)<")
+_CHUNK = 1 << 16
+
+
+class SheetCheckpoint(NamedTuple):
+    """
+    Sidik isi <sheetData> pada satu waktu: panjang byte (sesudah tag pembuka) + hash-nya,
+    jumlah shared string yang dirujuk (indeks tertinggi + 1) + hash string-string itu,
+    dan hash format tanggal (date1904 + style tanggal di antara style_count cellXfs pertama).
+    Cukup untuk memastikan baris lama tidak berubah; style baru yang ditambahkan di akhir tidak memengaruhinya.
+    """
+    length: int
+    digest: str
+    sst_count: int
+    sst_digest: str
+    style_count: int
+    format_digest: str
+
+
+def _chunks(fh, first: bytes) -> Iterator[bytes]:
+    if first:
+        yield first
+    while True:
+        chunk = fh.read(_CHUNK)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _chunks_after(first: bytes, rest: Iterator[bytes]) -> Iterator[bytes]:
+    if first:
+        yield first
+    yield from rest
+
+
+def _hash_exact(chunks: Iterator[bytes], n: int, h) -> Optional[bytes]:
+    """Hash tepat n byte pertama. Return sisa chunk terakhir, atau None kalau stream lebih pendek."""
+    while n > 0:
+        chunk = next(chunks, None)
+        if chunk is None:
+            return None
+        if len(chunk) > n:
+            h.update(chunk[:n])
+            return chunk[n:]
+        h.update(chunk)
+        n -= len(chunk)
+    return b""
+
+
+def _scan_sheet_data(chunks: Iterator[bytes], h, keep: Optional[List[bytes]] = None) -> Tuple[int, int, bytes]:
+    """
+    Hash isi <sheetData> sampai tag penutupnya sambil mencari indeks shared string tertinggi yang dirujuk.
+    Potongan selalu dipotong sebelum sel terakhir yang mungkin belum lengkap.
+    Return (panjang, indeks_sst_maks atau -1, sisa byte mulai dari tag penutup). keep menampung byte isi.
+    """
+    n, max_sst, carry = 0, -1, b""
+    for chunk in chunks:
+        buf = carry + chunk
+        m = _SD_CLOSE_RE.search(buf)
+        if m:
+            cut = m.start()
+        else:
+            cut = buf.rfind(b"<c")
+            if cut <= 0:
+                cut = max(0, len(buf) - 64)
+        part = buf[:cut]
+        h.update(part)
+        n += len(part)
+        if keep is not None:
+            keep.append(part)
+        refs = _SST_REF_RE.findall(part)
+        if refs:
+            max_sst = max(max_sst, max(map(int, refs)))
+        if m:
+            return n, max_sst, buf[cut:]
+        carry = buf[cut:]
+    raise ValueError("</sheetData> not found")
+
+
+class XlsxBook:
+    """
+    Akses baca-saja ke workbook xlsx langsung dari zip.
+    Baris dibaca bertahap (iterparse); nilai sel baru dikonversi saat diminta lewat value().
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self.date1904 = False
+        self._sheets: Dict[str, str] = {}
+        try:
+            self._load_workbook_xml()
+            self._date_styles, self._timedelta_styles, self._style_count = self._load_date_styles()
+            self._sst = _SharedStrings(self._zip, self._find_part("sharedStrings"))
+        except BaseException:
+            self._zip.close()
+            raise
+
+    # ---- konteks ----
+    def __enter__(self) -> "XlsxBook":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._sst.close()
+        self._zip.close()
+
+    # ---- metadata ----
+    @property
+    def sheetnames(self) -> List[str]:
+        return list(self._sheets)
+
+    def sheet_part(self, name: str) -> str:
+        if name not in self._sheets:
+            raise ValueError(f"Worksheet named {name!r} not found")
+        return self._sheets[name]
+
+    def _rels_of(self, part: str) -> Dict[str, Tuple[str, str]]:
+        return _rels_of(self._zip, part)
+
+    def _load_workbook_xml(self) -> None:
+        self.date1904, self._wb_rels, sheets = _read_workbook_xml(self._zip)
+        self._sheets = {name: target for name, target, _ in sheets}
+
+    def _find_part(self, kind: str) -> Optional[str]:
+        for rtype, target in self._wb_rels.values():
+            if rtype.endswith("/" + kind):
+                return target
+        return None
+
+    def _load_date_styles(self) -> Tuple[set, set, int]:
+        part = self._find_part("styles")
+        if not part or part not in self._zip.namelist():
+            return set(), set(), 0
+        root = ET.fromstring(self._zip.read(part))
+        custom: Dict[int, str] = {}
+        fmts = root.find(f"{{{NS_MAIN}}}numFmts")
+        if fmts is not None:
+            for nf in fmts:
+                custom[int(nf.get("numFmtId", "0"))] = nf.get("formatCode", "")
+        dates, deltas = set(), set()
+        xfs = root.find(f"{{{NS_MAIN}}}cellXfs")
+        if xfs is not None:
+            for i, xf in enumerate(xfs):
+                fid = int(xf.get("numFmtId", "0"))
+                code = custom.get(fid, BUILTIN_FORMATS.get(fid, "General"))
+                if is_timedelta_format(code):
+                    deltas.add(i)
+                elif is_date_format(code):
+                    dates.add(i)
+        return dates, deltas, 0 if xfs is None else len(xfs)
+
+    def dimension(self, sheet: str) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Baca <dimension ref="A1:BQ500"> dari awal XML sheet saja.
+        Return (min_row0, min_col0, max_row0, max_col0) atau None kalau tidak ada.
+        """
+        return _read_dimension(self._zip, self.sheet_part(sheet))
+
+    def read_part(self, part: str) -> bytes:
+        return self._zip.read(part)
+
+    def shared_string(self, i: int) -> str:
+        return self._sst.get(i)
+
+    def is_date_style(self, s: int) -> bool:
+        return s in self._date_styles or s in self._timedelta_styles
+
+    def excel_to_datetime(self, num: float, s: int) -> Any:
+        epoch = CALENDAR_MAC_1904 if self.date1904 else CALENDAR_WINDOWS_1900
+        return from_excel(num, epoch, timedelta=s in self._timedelta_styles)
+
+    # ---- baris & nilai ----
+    def iter_rows(self, sheet: str) -> Iterator[Tuple[int, List[RawCell]]]:
+        """
+        Yield (row_0_based, [RawCell, ...]) sesuai urutan di XML.
+        Baris kosong yang tidak ada di XML dilewati (caller lihat loncatan indeks).
+        """
+        fh = self._zip.open(self.sheet_part(sheet))
+        try:
+            yield from _rows_of(ET.iterparse(fh, events=("start", "end")))
+        finally:
+            fh.close()
+
+    # ---- checkpoint (mode incremental) ----
+    def _open_sheet_data(self, sheet: str):
+        """Buka XML sheet sampai tag pembuka <sheetData>. Return (fh, head, sisa_chunk, sheetData_kosong)."""
+        fh = self._zip.open(self.sheet_part(sheet))
+        buf = b""
+        while True:
+            chunk = fh.read(_CHUNK)
+            buf += chunk
+            m = _SD_OPEN_RE.search(buf)
+            if m:
+                return fh, buf[:m.end()], buf[m.end():], m.group(1) == b"/"
+            if not chunk:
+                fh.close()
+                raise ValueError(f"Worksheet {sheet!r} has no sheetData")
+
+    def _sst_digest(self, count: int) -> Optional[str]:
+        h = hashlib.blake2b(digest_size=16)
+        try:
+            for i in range(count):
+                h.update(self._sst.get(i).encode("utf-8"))
+                h.update(b"\0")
+        except IndexError:
+            return None
+        return h.hexdigest()
+
+    def format_digest(self, style_count: Optional[int] = None) -> str:
+        """Hash date1904 + indeks style tanggal/durasi (hanya style < style_count kalau diberikan)."""
+        n = self._style_count if style_count is None else style_count
+        text = repr((self.date1904, sorted(i for i in self._date_styles if i < n),
+                     sorted(i for i in self._timedelta_styles if i < n)))
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def sheet_checkpoint(self, sheet: str) -> SheetCheckpoint:
+        """Checkpoint isi sheet sekarang (dekompresi + hash saja, tanpa parse XML)."""
+        fh, _, rest, empty = self._open_sheet_data(sheet)
+        h = hashlib.blake2b(digest_size=16)
+        with fh:
+            n, max_sst = (0, -1) if empty else _scan_sheet_data(_chunks(fh, rest), h)[:2]
+        return SheetCheckpoint(n, h.hexdigest(), max_sst + 1, self._sst_digest(max_sst + 1) or "",
+                               self._style_count, self.format_digest())
+
+    def read_tail(
+        self, sheet: str, cp: SheetCheckpoint
+    ) -> Optional[Tuple[List[Tuple[int, List[RawCell]]], SheetCheckpoint]]:
+        """
+        Baris yang ditambahkan sesudah checkpoint — hanya kalau isi <sheetData> sampai cp.length identik
+        byte-per-byte, shared string yang dirujuk dan format tanggal juga sama (artinya: baris lama tidak berubah,
+        hanya ada baris baru di akhir). Hanya byte sesudah checkpoint yang di-parse.
+        Return ([(row_0_based, cells)], checkpoint_baru), atau None kalau syarat itu tidak terpenuhi.
+        """
+        if self._style_count < cp.style_count or self.format_digest(cp.style_count) != cp.format_digest:
+            return None
+        if self._sst_digest(cp.sst_count) != cp.sst_digest:
+            return None
+        fh, head, rest, empty = self._open_sheet_data(sheet)
+        with fh:
+            if empty:
+                return ([], cp) if cp.length == 0 else None
+            chunks = _chunks(fh, rest)
+            h = hashlib.blake2b(digest_size=16)
+            leftover = _hash_exact(chunks, cp.length, h)
+            if leftover is None or h.hexdigest() != cp.digest:
+                return None
+            body: List[bytes] = []
+            n, max_sst, closing = _scan_sheet_data(_chunks_after(leftover, chunks), h, keep=body)
+            doc = b"".join([head, *body, closing, *chunks])
+        rows = list(_rows_of(ET.iterparse(io.BytesIO(doc), events=("start", "end")), require_ref=True))
+        count = max(cp.sst_count, max_sst + 1)
+        new_cp = SheetCheckpoint(cp.length + n, h.hexdigest(), count, self._sst_digest(count) or "",
+                                 self._style_count, self.format_digest())
+        return rows, new_cp
+
+    def value(self, cell: RawCell) -> Any:
+        """Konversi RawCell ke nilai Python seperti hasil pd.read_excel (kosong/'NA' → NaN)."""
+        _, t, text, s = cell
+        if text is None:
+            return math.nan
+        if t == "s":
+            out: Any = self._sst.get(int(text))
+        elif t in ("str", "inlineStr"):
+            out = text
+        elif t == "b":
+            return text.strip() in ("1", "true")
+        elif t == "e":
+            return math.nan
+        elif t == "d":
+            return datetime.fromisoformat(text)
+        else:
+            num = float(text)
+            if self.is_date_style(s):
+                return self.excel_to_datetime(num, s)
+            return int(num) if num.is_integer() else num
+        return math.nan if out in NA_STRINGS else out
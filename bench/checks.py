@@ -0,0 +1,274 @@
+# bench/checks.py — cek kebenaran jalur cepat vs referensi (tanpa data produksi); exit 1 kalau ada yang gagal
+"""
+Pemakaian (dari root repo):
+    python -m bench.checks            # semua cek
+    python -m bench.checks numparse   # cek tertentu saja
+
+Setiap cek mengembalikan daftar kegagalan (kosong = lulus). File sementara dibuat di tempdir dan dihapus lagi.
+"""
+from __future__ import annotations
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import zipfile
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Sampel string "berantakan" dari laporan barge; parse_amounts harus identik dengan to_float.
+CONFORMANCE_CORPUS: List[Any] = [
+    # format umum
+    "1234", "1234.5", "1,234", "1,234,567", "1.234,56", "1.234.567,89", "12,5", "12,50", "1,2345",
+    "1,23", "1,234,56", "7,500.25", "0", "00012", "0,001", "1.", ".5", "5.", ".",
+    # spasi & NBSP
+    " 7500 ", "7 500", "1\u00A0234,5", "\u00A012,345\u00A0", "\t12\t", "12\n", "1 234 567,8",
+    # satuan / simbol
+    "12 MT", "12MT", "Rp 1.234.567,89", "USD 1,234", "1,234 kg", "(1,234)", "-1,234", "+5", "~300",
+    "1e3", "1E-2", "50%", "3/4",
+    # tidak bisa diparse oleh float() → gagal
+    "1.2.3", "1..2", "..", "1,2,3", "12.34.56,7",
+    # kosong / teks
+    "", "-", "N/A", "nan", "None", "TBA", "—",
+    # nilai non-string
+    None, float("nan"), True, False, 3, 2.5, -7, np.float64(1.1), np.float32(0.1), np.int64(7),
+    Decimal("1.5"), datetime(2025, 8, 1), pd.NaT,
+]
+
+
+def check_numparse() -> List[str]:
+    """parse_amounts (per kolom) harus sama persis dengan to_float (per sel) untuk CONFORMANCE_CORPUS."""
+    from app.numparse import parse_amounts, to_float
+
+    vals, bad = parse_amounts(pd.Series(CONFORMANCE_CORPUS, dtype=object))
+    fails = []
+    for x, v, b in zip(CONFORMANCE_CORPUS, vals, bad):
+        try:
+            ref: Any = to_float(x)
+        except ValueError:
+            ref = "error"
+        got: Any = "error" if b else float(v)
+        if isinstance(ref, float) and isinstance(got, float):
+            same = np.float64(ref).tobytes() == np.float64(got).tobytes() or (ref != ref and got != got)
+        else:
+            same = ref == got
+        if not same:
+            fails.append(f"{x!r}: to_float={ref!r} parse_amounts={got!r}")
+    return fails
+
+
+def _raw_member(z: zipfile.ZipFile, info: zipfile.ZipInfo) -> Tuple[int, int, bytes]:
+    """(compress_type, CRC, data terkompresi) satu member, dibaca dari header lokal."""
+    z.fp.seek(info.header_offset)
+    header = z.fp.read(30)
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    z.fp.seek(info.header_offset + 30 + name_len + extra_len)
+    return info.compress_type, info.CRC, z.fp.read(info.compress_size)
+
+
+def check_xlsx_patch() -> List[str]:
+    """
+    Patch satu sel master lewat SheetPatcher, dengan salinan mentah (internal zipfile) dan dengan fallback writestr:
+    member yang tidak disentuh harus identik (isi; pada salinan mentah juga byte terkompresi), sel terbaca openpyxl.
+    Plus formula lintas sheet: patch sheet tanpa formula tetap memaksa hitung ulang (fullCalcOnLoad).
+    """
+    import openpyxl
+
+    from app import xlsx_patch
+    from app.config import MASTER_COLUMNS, MASTER_SHEET_NAMES
+    from app.main_logic import excel_col_to_idx
+    from bench.synth import make_master
+
+    fails: List[str] = []
+    sheet = next(iter(MASTER_SHEET_NAMES.values()))
+    col = excel_col_to_idx(next(v for k, v in MASTER_COLUMNS.items() if k != "Month/Year"))
+    with tempfile.TemporaryDirectory() as tmp:
+        master = os.path.join(tmp, "master.xlsx")
+        make_master(master, years=list(MASTER_SHEET_NAMES)[:1])
+        wb = openpyxl.load_workbook(master)
+        wb.save(master)  # zip seperti buatan Excel/openpyxl (deflate, docProps, styles)
+        wb.close()
+
+        saved = xlsx_patch._RAW_COPY_OK
+        try:
+            for raw in (True, False):
+                mode = "raw" if raw else "writestr"
+                if raw and not xlsx_patch._raw_copy_supported():
+                    fails.append("raw copy disabled: zipfile internals probe failed on this Python")
+                    continue
+                xlsx_patch._RAW_COPY_OK = raw
+                out = os.path.join(tmp, f"out_{mode}.xlsx")
+                with xlsx_patch.SheetPatcher(master, sheet) as sp:
+                    touched = {sp.part, "xl/workbook.xml"}
+                    sp.set(5, col, 123.5)
+                    sp.save(out)
+                with zipfile.ZipFile(master) as zin, zipfile.ZipFile(out) as zout:
+                    if zout.testzip() is not None:
+                        fails.append(f"{mode}: CRC error in output")
+                    if zin.namelist() != zout.namelist():
+                        fails.append(f"{mode}: member list changed")
+                    for info in zin.infolist():
+                        if info.filename in touched or info.filename not in zout.NameToInfo:
+                            continue
+                        other = zout.getinfo(info.filename)
+                        if zin.read(info) != zout.read(other):
+                            fails.append(f"{mode}: {info.filename} content differs")
+                        elif raw and _raw_member(zin, info) != _raw_member(zout, other):
+                            fails.append(f"{mode}: {info.filename} compressed bytes differ")
+                got = openpyxl.load_workbook(out)[sheet].cell(5, col).value
+                if got != 123.5:
+                    fails.append(f"{mode}: patched cell reads back as {got!r}")
+        finally:
+            xlsx_patch._RAW_COPY_OK = saved
+        fails.extend(_check_cross_sheet_recalc(tmp, sheet, col))
+    return fails
+
+
+def _check_cross_sheet_recalc(tmp: str, sheet: str, col: int) -> List[str]:
+    """
+    Sheet tahun tanpa formula + sheet Summary =SUM('<tahun>'!...), workbook.xml seperti simpanan Excel
+    (calcPr tanpa fullCalcOnLoad, atau tanpa calcPr sama sekali): setelah patch, Excel harus diminta hitung ulang.
+    """
+    import re
+
+    import openpyxl
+    from openpyxl.utils import get_column_letter
+
+    from app import xlsx_patch
+
+    fails: List[str] = []
+    formula = f"=SUM('{sheet}'!{get_column_letter(col)}4:{get_column_letter(col)}15)"
+    base = os.path.join(tmp, "cross.xlsx")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = sheet
+    for r in range(4, 16):
+        ws.cell(r, col, float(r))
+    wb.create_sheet("Summary")["A1"] = formula
+    wb.save(base)
+    wb.close()
+
+    for label, calc_pr in (("calcPr", '<calcPr calcId="191029"/>'), ("no calcPr", "")):
+        master = os.path.join(tmp, f"cross_{label.replace(' ', '_')}.xlsx")
+        with zipfile.ZipFile(base) as zin, zipfile.ZipFile(master, "w", zipfile.ZIP_DEFLATED) as zout:
+            for info in zin.infolist():
+                data = zin.read(info)
+                if info.filename == "xl/workbook.xml":
+                    data = re.sub(rb"<calcPr\b[^>]*/>", calc_pr.encode("utf-8"), data)
+                zout.writestr(info.filename, data)
+        out = os.path.join(tmp, f"cross_out_{label.replace(' ', '_')}.xlsx")
+        with xlsx_patch.SheetPatcher(master, sheet) as sp:
+            if "<f" in sp.xml:
+                fails.append(f"cross-sheet ({label}): year sheet unexpectedly holds formulas")
+            sp.set(5, col, 99.0)
+            sp.save(out)
+        with zipfile.ZipFile(out) as z:
+            wb_xml = z.read("xl/workbook.xml").decode("utf-8")
+        if len(re.findall(r'<calcPr\b[^>]*\bfullCalcOnLoad="1"', wb_xml)) != 1:
+            fails.append(f"cross-sheet ({label}): workbook.xml not flagged for recalculation: {wb_xml[-160:]!r}")
+        try:
+            check = openpyxl.load_workbook(out)
+            if check["Summary"]["A1"].value != formula or check[sheet].cell(5, col).value != 99.0:
+                fails.append(f"cross-sheet ({label}): formula or patched cell changed")
+        except Exception as e:
+            fails.append(f"cross-sheet ({label}): output does not load ({type(e).__name__}: {e})")
+    return fails
+
+
+def check_watch() -> List[str]:
+    """
+    Watcher di folder sementara, dengan inotify dan polling: beberapa simpan beruntun ke dua file harus jadi
+    SATU run berisi kedua job, dan metrics (memori + file JSON) mencatat satu run.
+    """
+    import json
+    import time
+
+    from app.config import RunOptions
+    from app.watch import Watcher
+
+    fails: List[str] = []
+    for use_inotify in (True, False):
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [os.path.join(tmp, name) for name in ("a.xlsx", "b.xlsx")]
+            for path in paths:
+                with open(path, "wb") as fh:
+                    fh.write(b"x")
+            jobs = [RunOptions("master.xlsx", path, "VLU 2025", 2025, 6, 0) for path in paths]
+            calls: List[List[str]] = []
+
+            def runner(batch: List[RunOptions], progress: Callable[[str], None]) -> List[str]:
+                calls.append(sorted(os.path.basename(j.barge_path) for j in batch))
+                return []
+
+            metrics = os.path.join(tmp, "metrics.json")
+            watcher = Watcher(jobs, debounce=0.3, poll_interval=0.05, use_inotify=use_inotify,
+                              metrics_path=metrics, runner=runner)
+            mode = "inotify" if use_inotify else "poll"
+            if use_inotify and watcher.mode != "inotify":
+                watcher.close()
+                if sys.platform.startswith("linux"):
+                    fails.append("inotify: not available on Linux, fell back to polling")
+                continue
+            runs = []
+
+            def steps(seconds: float, until_run: bool = False) -> None:
+                end = time.monotonic() + seconds
+                while time.monotonic() < end and not (until_run and runs):
+                    run = watcher.step(timeout=0.02)
+                    if run is not None:
+                        runs.append(run)
+
+            try:
+                for path in (paths[0], paths[1], paths[0], paths[0]):  # simpan beruntun, seperti Excel/sync folder
+                    with open(path, "ab") as fh:
+                        fh.write(b"x")
+                    steps(0.1)  # loop service tetap jalan di antara simpan
+                steps(5.0, until_run=True)
+                steps(0.6)  # tidak boleh ada run kedua tanpa perubahan baru
+            finally:
+                watcher.close()
+            if len(runs) != 1 or calls != [["a.xlsx", "b.xlsx"]]:
+                fails.append(f"{mode}: expected one run with both jobs, got {len(runs)} run(s): {calls}")
+            if watcher.metrics.runs != 1 or watcher.metrics.events < 2:
+                fails.append(f"{mode}: metrics runs={watcher.metrics.runs} events={watcher.metrics.events}")
+            try:
+                with open(metrics, "r", encoding="utf-8") as fh:
+                    saved = json.load(fh)
+                if saved.get("runs") != 1 or saved.get("failed") != 0:
+                    fails.append(f"{mode}: metrics file runs={saved.get('runs')} failed={saved.get('failed')}")
+            except (OSError, ValueError) as e:
+                fails.append(f"{mode}: metrics file not written ({e})")
+    return fails
+
+
+CHECKS: Dict[str, Callable[[], List[str]]] = {
+    "numparse": check_numparse,
+    "xlsx_patch": check_xlsx_patch,
+    "watch": check_watch,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m bench.checks", description="Cek kebenaran FLF (jalur cepat vs referensi).")
+    p.add_argument("names", nargs="*", metavar="CHECK", help=f"cek yang dijalankan (default: semua: {', '.join(CHECKS)})")
+    args = p.parse_args(argv)
+    unknown = [n for n in args.names if n not in CHECKS]
+    if unknown:
+        p.error(f"unknown check(s): {', '.join(unknown)}")
+
+    failed = 0
+    for name in args.names or list(CHECKS):
+        fails = CHECKS[name]()
+        print(f"{name:<12} {'OK' if not fails else f'FAIL ({len(fails)})'}", file=sys.stderr)
+        for line in fails:
+            print(f"  {line}", file=sys.stderr)
+        failed += bool(fails)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+# bench/run_bench.py — ukur waktu per tahap pipeline pada workbook sintetis, simpan JSON untuk dibandingkan
+"""
+Pemakaian (dari root repo):
+    python -m bench.run_bench --sizes 1k,10k,100k --repeat 3 --out bench_results.json
+    python -m bench.run_bench --sizes 1M --repeat 1
+    python -m bench.run_bench --compare bench_results_lama.json --threshold 1.25
+
+Workbook sintetis dibuat sekali per ukuran di --workdir dan dipakai ulang (hapus / --regen untuk membuat ulang).
+Cache parse Barge diarahkan ke <workdir>/cache supaya tidak menyentuh cache pengguna.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+from dataclasses import replace
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+STAGES = (
+    "read",          # streaming baca sheet Barge tanpa cache (header + kolom terpakai)
+    "read_cold",     # jendela satu bulan dengan use_cache=True, cache kosong (versi file baru, run pertama)
+    "cache_build",   # parse penuh + simpan cache (run pertama)
+    "read_cached",   # baca dari cache yang sudah hangat
+    "header_detect", # _detect_barge_columns pada area scan header
+    "slice_filter",  # potong jendela satu bulan dari sheet terparse + filter Status
+    "aggregate",     # aggregate_barge pada seluruh baris
+    "master_lookup", # buka sheet master + indeks baris bulan + cari 12 bulan
+    "write_save",    # apply_to_master (patch XML + simpan) ke salinan master
+)
+SYNTH_VERSION = 1   # naikkan kalau isi workbook sintetis berubah (nama file ikut berubah)
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    mult = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    return int(float(text[:-1] if mult > 1 else text) * mult)
+
+
+def _timed(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    runs: List[float] = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - t)
+    return {
+        "runs": [round(x, 6) for x in runs],
+        "best": round(min(runs), 6),
+        "median": round(statistics.median(runs), 6),
+    }
+
+
+def prepare(workdir: str, rows: int, regen: bool = False) -> Dict[str, Any]:
+    """Buat (atau pakai ulang) workbook Barge + Master sintetis untuk satu ukuran."""
+    from bench.synth import make_barge, make_master, month_windows
+
+    barge = os.path.join(workdir, f"barge_{rows}_v{SYNTH_VERSION}.xlsx")
+    master = os.path.join(workdir, f"master_v{SYNTH_VERSION}.xlsx")
+    gen_s = 0.0
+    t = time.perf_counter()
+    if regen or not os.path.exists(master):
+        make_master(master)
+    if regen or not os.path.exists(barge):
+        meta = make_barge(barge, rows=rows)
+        gen_s = time.perf_counter() - t
+    else:
+        meta = {"path": barge, "sheet": "VLU 2025", "year": 2025, "rows": rows,
+                "header_row": 5, "first_data_row": 6, "months": month_windows(rows)}
+    meta.update(master=master, generate_s=round(gen_s, 3), barge_bytes=os.path.getsize(barge))
+    return meta
+
+
+def bench_size(meta: Dict[str, Any], repeat: int, workdir: str, progress=lambda *_: None) -> Dict[str, Any]:
+    import pandas as pd
+
+    from app import barge_cache, session
+    from app.config import MASTER_COLUMNS, MASTER_SHEET_NAMES, RunOptions
+    from app.main_logic import (
+        MasterMonthIndex, _detect_barge_columns, _parse_full_sheet, _window_from_parsed,
+        aggregate_barge, apply_to_master, excel_col_to_idx, filter_completed, read_barge_rows,
+    )
+    from app.xlsx_patch import SheetPatcher
+    from app.xlsx_stream import XlsxBook
+
+    path, sheet, year = meta["path"], meta["sheet"], meta["year"]
+    opts = RunOptions(
+        master_path=meta["master"], barge_path=path, barge_sheet=sheet, target_year=year,
+        start_row=meta["first_data_row"], row_count=0, only_completed=False, use_cache=False,
+    )
+    out: Dict[str, Any] = {}
+
+    def build() -> barge_cache.ParsedSheet:
+        with XlsxBook(path) as book:
+            return _parse_full_sheet(book, sheet)
+
+    progress("read")
+    holder: Dict[str, Any] = {}
+
+    def read() -> None:
+        holder["view"], holder["hm"] = read_barge_rows(opts)
+    out["read"] = _timed(read, repeat)
+
+    progress("read_cold")
+    first_month, (first_start, first_count) = min(meta["months"].items(), key=lambda kv: kv[1][0])
+    cold = replace(opts, use_cache=True, start_row=first_start, row_count=first_count)
+
+    def forget() -> None:
+        barge_cache.invalidate(path, sheet)
+        session.current().evict()
+    out["read_cold"] = _timed(lambda: read_barge_rows(cold), repeat, setup=forget)
+    out["read_cold"]["month"] = first_month
+
+    progress("cache_build")
+    out["cache_build"] = _timed(
+        lambda: barge_cache.load_or_build(path, sheet, build), repeat,
+        setup=lambda: barge_cache.invalidate(path, sheet),
+    )
+    progress("read_cached")
+    cached = replace(opts, use_cache=True)
+    out["read_cached"] = _timed(lambda: read_barge_rows(cached), repeat)
+
+    progress("header_detect")
+    # area scan header sebagai DataFrame (dibangun di luar pengukuran)
+    head: Dict[int, Dict[int, Any]] = {}
+    with XlsxBook(path) as book:
+        for r0, cells in book.iter_rows(sheet):
+            if r0 >= 1400:
+                break
+            head[r0] = {cell[0]: book.value(cell) for cell in cells}
+    df_head = pd.DataFrame.from_dict(head, orient="index").sort_index()
+    df_head = df_head.reindex(columns=range(int(df_head.columns.max()) + 1))
+    hint = meta["first_data_row"] - 1
+    out["header_detect"] = _timed(lambda: _detect_barge_columns(df_head, hint), repeat)
+
+    progress("slice_filter")
+    parsed = barge_cache.load_or_build(path, sheet, build)
+    month, (start, count) = max(meta["months"].items(), key=lambda kv: kv[1][1])
+
+    def slice_filter() -> None:
+        view = _window_from_parsed(parsed, start - 1, start - 1, count)[0]
+        filter_completed(view)
+    out["slice_filter"] = _timed(slice_filter, repeat)
+    out["slice_filter"]["month"] = month
+
+    progress("aggregate")
+    view = holder["view"]
+    out["aggregate"] = _timed(lambda: holder.__setitem__("totals", aggregate_barge(view, year)), repeat)
+    totals = holder["totals"]
+
+    progress("master_lookup")
+    master_sheet = MASTER_SHEET_NAMES.get(year, str(year))
+    month_col = excel_col_to_idx(MASTER_COLUMNS["Month/Year"])
+
+    def lookup() -> None:
+        with SheetPatcher(meta["master"], master_sheet) as sp:
+            idx = MasterMonthIndex.from_values(sp.column_values(month_col))
+            for key in totals:
+                idx.find(key)
+    out["master_lookup"] = _timed(lookup, repeat)
+
+    progress("write_save")
+    target = os.path.join(workdir, "master_run.xlsx")
+    out["write_save"] = _timed(
+        lambda: apply_to_master(target, master_sheet, totals, clear_value=None), repeat,
+        setup=lambda: shutil.copyfile(meta["master"], target),
+    )
+    out["_info"] = {
+        "rows_read": len(view),
+        "months": len(totals),
+        "cells": totals.cells,
+        "barge_bytes": meta["barge_bytes"],
+        "generate_s": meta["generate_s"],
+    }
+    return out
+
+
+def _meta() -> Dict[str, Any]:
+    import numpy as np
+    import openpyxl
+    import pandas as pd
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "openpyxl": openpyxl.__version__,
+        "synth_version": SYNTH_VERSION,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Baris laporan regresi: tahap yang best-nya > threshold × baseline (ukuran yang sama)."""
+    regressions: List[str] = []
+    for size, stages in current["results"].items():
+        base = baseline.get("results", {}).get(size)
+        if not base:
+            continue
+        for stage in STAGES:
+            if stage not in stages or stage not in base:
+                continue
+            now, old = stages[stage]["best"], base[stage]["best"]
+            ratio = now / old if old > 0 else float("inf")
+            flag = "REGRESSION" if ratio > threshold else ""
+            print(f"{size:>9} {stage:<14} {old * 1000:10.1f}ms → {now * 1000:10.1f}ms  x{ratio:5.2f} {flag}",
+                  file=sys.stderr)
+            if flag:
+                regressions.append(f"{size} {stage}: x{ratio:.2f}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m bench.run_bench", description="Benchmark per tahap pipeline FLF.")
+    p.add_argument("--sizes", default="1k,10k,100k", help="jumlah baris Barge, dipisah koma (mis. 1k,10k,100k,1M)")
+    p.add_argument("--repeat", type=int, default=3, help="ulangan per tahap (dilaporkan best & median)")
+    p.add_argument("--workdir", default=os.path.join("bench", "_work"), help="folder workbook sintetis + cache")
+    p.add_argument("--regen", action="store_true", help="buat ulang workbook sintetis")
+    p.add_argument("--out", metavar="JSON", help="simpan hasil ke file JSON")
+    p.add_argument("--compare", metavar="JSON", help="bandingkan dengan hasil sebelumnya")
+    p.add_argument("--threshold", type=float, default=1.25, help="rasio best/baseline yang dianggap regresi")
+    args = p.parse_args(argv)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    os.environ["FLF_CACHE_DIR"] = os.path.join(os.path.abspath(args.workdir), "cache")
+
+    report: Dict[str, Any] = {"meta": _meta(), "results": {}}
+    for size in [parse_size(s) for s in args.sizes.split(",") if s.strip()]:
+        print(f"[{size} rows] generating …", file=sys.stderr, flush=True)
+        meta = prepare(args.workdir, size, args.regen)
+        res = bench_size(meta, max(1, args.repeat), args.workdir,
+                         progress=lambda s, n=size: print(f"[{n} rows] {s}", file=sys.stderr, flush=True))
+        report["results"][str(size)] = res
+        print("  " + " | ".join(f"{s} {res[s]['best'] * 1000:.1f}ms" for s in STAGES), file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print("Regressions: " + "; ".join(regressions), file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
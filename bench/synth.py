@@ -0,0 +1,342 @@
+# bench/synth.py — generator workbook Barge & Master sintetis (untuk benchmark, tanpa data produksi)
+from __future__ import annotations
+import random
+import zipfile
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from openpyxl.utils import column_index_from_string, get_column_letter
+
+from app.config import BARGE_COLUMNS, MASTER_COLUMNS, MASTER_MONTH_FORMAT, MASTER_SHEET_NAMES
+
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# Ejaan FLF seperti di laporan (termasuk gabungan & sinonim di mapping.py)
+FLF_SPELLINGS = [
+    "Apollo", "APOLLO", "Zeus", "ZEUS", "Mara", "mara", "August", "Eagle", "EAGLE", "Mutiara Jawa",
+    "WHS", "WHS ISKANDAR", "WHS-Iskandar", "Bulk Java", "BULKJAVA", "Ratu Dewata", "Labor",
+    "Green Calypso", "FC Sumber", "FC SUMBER 1001", "Zeus-Apollo", "ZEUS/APOLLO", "Apollo - Zeus",
+    "TBA", "",
+]
+STATUSES = ["Complete", "COMPLETED", "Complete", "complete ", "Loading", "Cancel", ""]
+HEADER_TEXT = {
+    "No": "NO.",
+    "Month": "MONTH",
+    "Status": "STATUS",
+    "ActualLoaded": "QTY ACTUAL LOADED",
+    "LoadingFacilities": "LOADING FACILITIES",
+    "FLFNominate": "FLF/FC NOMINATE",
+}
+FILLER_HEADERS = {"D": "VESSEL", "E": "BARGE", "F": "TUG", "G": "JETTY", "H": "ETA", "BO": "REMARKS"}
+
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+
+
+class Formula(str):
+    """Isi sel berupa formula (tanpa '=')."""
+
+
+class _XlsxWriter:
+    """
+    Penulis xlsx minimal & streaming: sheet ditulis baris demi baris langsung ke zip
+    (cukup untuk 1 juta baris tanpa menahan semuanya di memori). String lewat sharedStrings.
+    Style 0 = General, 1 = tanggal (d-mmm-yy), 2 = bulan (mmm-yy).
+    """
+
+    def __init__(self, path: str) -> None:
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=1)
+        self._sheets: List[str] = []
+        self._sst: Dict[str, int] = {}
+
+    def _si(self, s: str) -> int:
+        idx = self._sst.get(s)
+        if idx is None:
+            idx = self._sst[s] = len(self._sst)
+        return idx
+
+    def _cell(self, ref: str, v: Any) -> str:
+        if isinstance(v, Formula):
+            return f'<c r="{ref}"><f>{escape(v)}</f></c>'
+        if isinstance(v, str):
+            return f'<c r="{ref}" t="s"><v>{self._si(v)}</v></c>'
+        if isinstance(v, datetime):
+            serial = (v - _EXCEL_EPOCH).total_seconds() / 86400
+            style = 2 if v.day == 1 and not (v.hour or v.minute) else 1
+            return f'<c r="{ref}" s="{style}"><v>{serial:g}</v></c>'
+        if isinstance(v, bool):
+            return f'<c r="{ref}" t="b"><v>{int(v)}</v></c>'
+        return f'<c r="{ref}"><v>{v!r}</v></c>'
+
+    def add_sheet(
+        self,
+        name: str,
+        rows: Iterable[Tuple[int, Dict[int, Any]]],
+        max_row: int,
+        max_col: int,
+    ) -> None:
+        """rows: (nomor_baris_1_based, {kolom_1_based: nilai}) urut naik; None = sel kosong."""
+        self._sheets.append(name)
+        part = f"xl/worksheets/sheet{len(self._sheets)}.xml"
+        letters = [""] + [get_column_letter(c) for c in range(1, max_col + 1)]
+        with self._zip.open(part, "w", force_zip64=True) as fh:
+            fh.write(
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                f'<dimension ref="A1:{letters[max_col]}{max(max_row, 1)}"/><sheetData>'.encode("utf-8")
+            )
+            buf: List[str] = []
+            for r, cells in rows:
+                parts = [self._cell(f"{letters[c]}{r}", cells[c]) for c in sorted(cells) if cells[c] is not None]
+                buf.append(f'<row r="{r}">{"".join(parts)}</row>')
+                if len(buf) >= 2000:
+                    fh.write("".join(buf).encode("utf-8"))
+                    buf.clear()
+            fh.write(("".join(buf) + "</sheetData></worksheet>").encode("utf-8"))
+
+    def close(self) -> None:
+        z = self._zip
+        n = len(self._sheets)
+        overrides = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, n + 1)
+        )
+        z.writestr("[Content_Types].xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            '<Override PartName="/xl/sharedStrings.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+            f'{overrides}</Types>'
+        ))
+        z.writestr("_rels/.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>'
+        ))
+        sheets = "".join(
+            f'<sheet name="{escape(name, {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, name in enumerate(self._sheets, 1)
+        )
+        z.writestr("xl/workbook.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{sheets}</sheets><calcPr calcId="191029"/></workbook>'
+        ))
+        rels = "".join(
+            f'<Relationship Id="rId{i}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, n + 1)
+        )
+        z.writestr("xl/_rels/workbook.xml.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{rels}'
+            f'<Relationship Id="rId{n + 1}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+            f'<Relationship Id="rId{n + 2}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" '
+            'Target="sharedStrings.xml"/></Relationships>'
+        ))
+        z.writestr("xl/styles.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            '<numFmts count="1"><numFmt numFmtId="164" formatCode="mmm\\-yy"/></numFmts>'
+            '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+            '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+            '<fill><patternFill patternType="gray125"/></fill></fills>'
+            '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+            '<xf numFmtId="15" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+            '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+            '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+            '</styleSheet>'
+        ))
+        sst = "".join(f'<si><t xml:space="preserve">{escape(s)}</t></si>' for s in self._sst)
+        z.writestr("xl/sharedStrings.xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            f'count="{len(self._sst)}" uniqueCount="{len(self._sst)}">{sst}</sst>'
+        ))
+        z.close()
+
+
+def _amount(rng: random.Random) -> Any:
+    """ActualLoaded dengan campuran format angka yang muncul di laporan."""
+    x = rng.randint(500, 12000)
+    frac = rng.randint(0, 99)
+    pick = rng.random()
+    if pick < 0.45:
+        return float(x) if rng.random() < 0.5 else x + frac / 100
+    if pick < 0.55:
+        return f"{x // 1000},{x % 1000:03d}" if x >= 1000 else str(x)        # 1,234
+    if pick < 0.65:
+        return f"{x // 1000}.{x % 1000:03d},{frac:02d}" if x >= 1000 else f"{x},{frac:02d}"  # 1.234,56
+    if pick < 0.72:
+        return f"{x // 1000} {x % 1000:03d}" if x >= 1000 else str(x)        # 7 500
+    if pick < 0.77:
+        return f"{x // 1000} {x % 1000:03d}" if x >= 1000 else str(x)   # NBSP
+    if pick < 0.82:
+        return f"{x} MT"
+    if pick < 0.86:
+        return f"{x}.{frac:02d}"
+    if pick < 0.90:
+        return "NA"
+    if pick < 0.93:
+        return "-"
+    return None
+
+
+def _month_value(rng: random.Random, month: int, year: int) -> Any:
+    name = MONTHS[month - 1]
+    pick = rng.random()
+    if pick < 0.35:
+        return name
+    if pick < 0.55:
+        return name.upper()
+    if pick < 0.70:
+        return f"1 {name} {year}"
+    if pick < 0.90:
+        return datetime(year, month, rng.randint(1, 28))
+    if pick < 0.95:
+        return f"{name}-{year % 100:02d}"
+    return None
+
+
+def barge_rows(
+    rows: int,
+    header_row: int = 5,
+    year: int = 2025,
+    seed: int = 0,
+    blank_every: int = 97,
+) -> Iterator[Tuple[int, Dict[int, Any]]]:
+    """
+    Baris sheet Barge: judul di atas header, header di `header_row` (1-based) sesuai BARGE_COLUMNS,
+    lalu `rows` baris data berurutan per bulan (Jan → Dec). Baris kosong disisipkan tiap ~blank_every baris.
+    """
+    rng = random.Random(seed)
+    col = {k: column_index_from_string(v) for k, v in BARGE_COLUMNS.items()}
+    filler = {column_index_from_string(k): v for k, v in FILLER_HEADERS.items()}
+    if header_row > 2:
+        yield 2, {2: f"VESSEL LOADING UPDATE {year}"}
+    header = {col[k]: HEADER_TEXT[k] for k in col}
+    header.update(filler)
+    yield header_row, header
+
+    r = header_row + 1
+    for i in range(rows):
+        if blank_every and i and i % blank_every == 0:
+            r += 1  # baris kosong (tidak ditulis)
+        month = min(12, i * 12 // max(rows, 1) + 1)
+        status = rng.choice(STATUSES)
+        amount = _amount(rng)
+        if amount in (None, "NA") and status.strip().upper().startswith("COMPLETE"):
+            # sel kosong/NA terbaca NaN dan ikut dijumlah; di laporan asli hanya muncul di baris belum selesai
+            amount = "-"
+        cells: Dict[int, Any] = {
+            col["No"]: i + 1,
+            col["Month"]: _month_value(rng, month, year),
+            col["Status"]: status or None,
+            col["ActualLoaded"]: amount,
+            col["LoadingFacilities"]: "FLF",
+            col["FLFNominate"]: rng.choice(FLF_SPELLINGS) or None,
+            column_index_from_string("D"): f"MV SYN {rng.randint(1, 400)}",
+            column_index_from_string("E"): f"BG {rng.randint(1, 3000)}",
+            column_index_from_string("H"): datetime(year, month, rng.randint(1, 28), rng.randint(0, 23)),
+        }
+        if rng.random() < 0.2:
+            cells[column_index_from_string("BO")] = rng.choice(["delay rain", "shift change", "OK"])
+        yield r, cells
+        r += 1
+
+
+def month_windows(rows: int, header_row: int = 5, blank_every: int = 97) -> Dict[str, Tuple[int, int]]:
+    """{'Jan': (start_row_1_based, row_count)} untuk data yang dihasilkan barge_rows dengan parameter sama."""
+    out: Dict[str, Tuple[int, int]] = {}
+    r = header_row + 1
+    for i in range(rows):
+        if blank_every and i and i % blank_every == 0:
+            r += 1
+        name = MONTHS[min(12, i * 12 // max(rows, 1) + 1) - 1]
+        start, _ = out.get(name, (r, 0))
+        out[name] = (start, r - start + 1)
+        r += 1
+    return out
+
+
+def make_barge(
+    path: str,
+    rows: int = 10_000,
+    header_row: int = 5,
+    sheet: str = "VLU 2025",
+    year: int = 2025,
+    seed: int = 0,
+    extra_sheets: Tuple[str, ...] = ("Summary",),
+) -> Dict[str, Any]:
+    """Tulis workbook Barge sintetis. Return metadata (sheet, header_row, jendela per bulan)."""
+    blank_every = 97
+    n_blank = (rows - 1) // blank_every if rows > 1 else 0
+    max_row = header_row + rows + n_blank
+    w = _XlsxWriter(path)
+    try:
+        w.add_sheet(sheet, barge_rows(rows, header_row, year, seed, blank_every),
+                    max_row, column_index_from_string("BQ"))
+        for name in extra_sheets:
+            w.add_sheet(name, iter([(1, {1: "x"})]), 1, 1)
+    finally:
+        w.close()
+    return {
+        "path": path,
+        "sheet": sheet,
+        "year": year,
+        "rows": rows,
+        "header_row": header_row,
+        "first_data_row": header_row + 1,
+        "months": month_windows(rows, header_row, blank_every),
+    }
+
+
+def master_rows(year: int, header_row: int = 3, seed: int = 0) -> Iterator[Tuple[int, Dict[int, Any]]]:
+    """Sheet master: header MASTER_COLUMNS, 12 baris bulan (teks 'Aug-25' / tanggal mmm-yy), baris Total berformula."""
+    rng = random.Random(seed + year)
+    col = {k: column_index_from_string(v) for k, v in MASTER_COLUMNS.items()}
+    yield 1, {2: f"FLF MONTHLY {year}"}
+    yield header_row, {c: name for name, c in col.items()}
+    first = header_row + 1
+    for m in range(1, 13):
+        dt = datetime(year, m, 1)
+        cells: Dict[int, Any] = {col["Month/Year"]: dt if m % 3 == 0 else dt.strftime(MASTER_MONTH_FORMAT)}
+        for name, c in col.items():
+            if name != "Month/Year":
+                cells[c] = float(rng.randint(0, 50_000))
+        yield first + m - 1, cells
+    total: Dict[int, Any] = {col["Month/Year"]: "Total"}
+    for name, c in col.items():
+        if name != "Month/Year":
+            L = get_column_letter(c)
+            total[c] = Formula(f"SUM({L}{first}:{L}{first + 11})")
+    yield first + 12, total
+
+
+def make_master(path: str, years: Optional[Iterable[int]] = None, header_row: int = 3, seed: int = 0) -> Dict[str, Any]:
+    """Tulis workbook master sintetis dengan satu sheet per tahun (nama dari MASTER_SHEET_NAMES)."""
+    years = list(years or MASTER_SHEET_NAMES)
+    max_col = max(column_index_from_string(v) for v in MASTER_COLUMNS.values())
+    w = _XlsxWriter(path)
+    try:
+        for y in years:
+            w.add_sheet(MASTER_SHEET_NAMES.get(y, str(y)), master_rows(y, header_row, seed), header_row + 13, max_col)
+    finally:
+        w.close()
+    return {"path": path, "years": years, "header_row": header_row}
@@ -1,9 +1,17 @@
 # run.py
+import time
+_T0 = time.perf_counter()
+
 import sys
+from app.startup import StartupTimer, prewarm, report_startup
+timer = StartupTimer(_T0)
+
 from PyQt5 import QtWidgets, QtGui, QtCore
-from app.main_gui_modern import create_window
+timer.mark("qt import")
+from app.main_gui_modern import create_window, call_after_first_paint
 import ui.resources_rc  
 import os
+timer.mark("gui module + resources")
 
 def apply_theme(app, fname="theme.qss"):
     # load theme setelah resources diimport
@@ -25,8 +33,17 @@ if __name__ == "__main__":
 
 
     apply_theme(app, "theme.qss")
+    timer.mark("app + theme")
 
     win = create_window()
     win.setWindowTitle("FLF Automation System ")
+    timer.mark("window built")
+
+    def on_first_paint():
+        timer.mark("first paint")
+        # pandas/openpyxl/main_logic dipanaskan di background; Submit tidak perlu menunggu
+        prewarm(timer, on_done=lambda: report_startup(timer))
+
+    call_after_first_paint(win, on_first_paint)
     win.show()
     sys.exit(app.exec_())